@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, events, tickets, orders, admin
+from app.api.v1.endpoints import auth, users, events, tickets, orders, admin, queue
 
 api_router = APIRouter()
 
@@ -8,4 +8,5 @@ api_router.include_router(users.router, prefix="/users", tags=["Users"])
 api_router.include_router(events.router, prefix="/events", tags=["Events"])
 api_router.include_router(tickets.router, prefix="/tickets", tags=["Tickets"])
 api_router.include_router(orders.router, prefix="/orders", tags=["Orders"])
+api_router.include_router(queue.router, prefix="/queue", tags=["Waiting Room"])
 api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
\ No newline at end of file
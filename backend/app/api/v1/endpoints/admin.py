@@ -1,54 +1,40 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import desc
 from datetime import datetime
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.crud.order import order as order_crud
+from app.crud.sales_rollup import sales_rollup as sales_rollup_crud
+from app.crud.event_stats import event_stats as event_stats_crud
 from app.crud.ticket import ticket as ticket_crud
 from app.schemas.order import OrderResponse
 from app.schemas.user import UserResponse
-from app.schemas.common import PaginatedResponse
+from app.schemas.common import PaginatedResponse, CursorPage
 # from app.api.deps import require_admin  # Temporarily disabled for testing
 from app.models.user import User
 from app.models.order import Order, OrderStatus, PaymentStatus
-from app.models.ticket import Ticket, TicketStatus
+from app.models.ticket import TicketStatus
 from app.models.event import Event
-from app.utils.pagination import paginate
+from app.services.booking import BookingService
+from app.services.sales_stats import SalesStatsService
+from app.utils.pagination import paginate, keyset_paginate
 
 router = APIRouter()
 
 @router.get("/dashboard")
 def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     # current_user: User = Depends(require_admin)  # Temporarily disabled for testing
 ):
     """Get dashboard statistics"""
-    # Total orders
-    total_orders = db.query(Order).count()
-    
-    # Total revenue
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
-        Order.payment_status.ilike(PaymentStatus.COMPLETED.value)
-    ).scalar() or 0
-    
-    # Total tickets sold
-    total_tickets = db.query(Ticket).filter(
-        Ticket.status.in_([TicketStatus.ACTIVE, TicketStatus.USED])
-    ).count()
-    
-    # Orders today
+    # Order, ticket and revenue totals come from the daily rollups, not the raw orders
     today = datetime.now().date()
-    orders_today = db.query(Order).filter(
-        func.date(Order.created_at) == today
-    ).count()
-    
-    # Revenue this month
-    this_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0)
-    revenue_this_month = db.query(func.sum(Order.total_amount)).filter(
-        Order.payment_status.ilike(PaymentStatus.COMPLETED.value),
-        Order.created_at >= this_month_start
-    ).scalar() or 0
+    totals = sales_rollup_crud.get_dashboard_totals(
+        db,
+        today=today,
+        month_start=today.replace(day=1)
+    )
     
     # Upcoming events
     upcoming_events = db.query(Event).filter(
@@ -62,19 +48,17 @@ def get_dashboard_stats(
     ).limit(10).all()
     
     return {
-        "total_orders": total_orders,
-        "total_revenue": float(total_revenue),
-        "total_tickets": total_tickets,
-        "orders_today": orders_today,
-        "revenue_this_month": float(revenue_this_month),
+        **totals,
         "upcoming_events": upcoming_events,
         "recent_orders": recent_orders
     }
 
-@router.get("/orders", response_model=PaginatedResponse[OrderResponse])
+@router.get("/orders", response_model=Union[PaginatedResponse[OrderResponse], CursorPage[OrderResponse]])
 def get_all_orders(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset pagination; send an empty cursor for the first page"),
+    include_total: bool = False,
     status: Optional[OrderStatus] = None,
     payment_status: Optional[PaymentStatus] = None,
     db: Session = Depends(get_db),
@@ -83,14 +67,17 @@ def get_all_orders(
     """Get all orders with filters (Admin only)"""
     skip = (page - 1) * size
     
-    query = db.query(Order)
+    query = order_crud.query_with_items(db)
     
     if status:
         status_val = status.value if isinstance(status, OrderStatus) else str(status).lower()
-        query = query.filter(Order.order_status.ilike(status_val))
+        query = query.filter(Order.order_status == status_val)
     if payment_status:
         payment_status_val = payment_status.value if isinstance(payment_status, PaymentStatus) else str(payment_status).lower()
-        query = query.filter(Order.payment_status.ilike(payment_status_val))
+        query = query.filter(Order.payment_status == payment_status_val)
+    
+    if cursor is not None:
+        return keyset_paginate(query, [Order.created_at, Order.order_id], cursor, size, with_total=include_total)
     
     total = query.count()
     orders = query.order_by(desc(Order.created_at)).offset(skip).limit(size).all()
@@ -114,23 +101,41 @@ def update_order_status(
             detail="Order not found"
         )
     
-    order.order_status = order_status.value if isinstance(order_status, OrderStatus) else str(order_status).lower()
+    if order.order_status_enum == OrderStatus.CANCELLED:
+        if order_status != OrderStatus.CANCELLED:
+            # Its tickets and seats have been released and may be sold again
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A cancelled order cannot be reopened"
+            )
+    elif order_status == OrderStatus.CANCELLED:
+        # Same path as a customer cancellation: tickets, seats, inventory and stats are all released
+        order = BookingService.cancel_order(db, order_id)
+    else:
+        order.order_status = order_status.value if isinstance(order_status, OrderStatus) else str(order_status).lower()
     if payment_status:
+        old_payment_status = order.payment_status
         order.payment_status = payment_status.value if isinstance(payment_status, PaymentStatus) else str(payment_status).lower()
+        SalesStatsService.on_payment_status_changed(db, order, old_payment_status)
     
     db.commit()
     db.refresh(order)
     
     return order
 
-@router.get("/users", response_model=PaginatedResponse[UserResponse])
+@router.get("/users", response_model=Union[PaginatedResponse[UserResponse], CursorPage[UserResponse]])
 def get_all_users(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset pagination; send an empty cursor for the first page"),
+    include_total: bool = False,
     db: Session = Depends(get_db),
     # current_user: User = Depends(require_admin)  # Temporarily disabled for testing
 ):
     """Get all users (Admin only)"""
+    if cursor is not None:
+        return keyset_paginate(db.query(User), [User.user_id], cursor, size, descending=False, with_total=include_total)
+    
     skip = (page - 1) * size
     
     total = db.query(User).count()
@@ -141,7 +146,7 @@ def get_all_users(
 @router.get("/events/stats/{event_id}")
 def get_event_stats(
     event_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     # current_user: User = Depends(require_admin)  # Temporarily disabled for testing
 ):
     """Get statistics for a specific event"""
@@ -153,29 +158,26 @@ def get_event_stats(
             detail="Event not found"
         )
     
-    # Total tickets sold
-    tickets_sold = db.query(Ticket).filter(
-        Ticket.event_id == event_id,
-        Ticket.status.in_([TicketStatus.ACTIVE, TicketStatus.USED])
-    ).count()
+    # Counters maintained by booking, payment, cancel and check-in
+    stats = event_stats_crud.get(db, id=event_id)
+    counters = {name: getattr(stats, name) if stats else 0 for name in event_stats_crud.COUNTERS}
     
-    # Total revenue
-    revenue = db.query(func.sum(Order.total_amount)).filter(
-        Order.event_id == event_id,
-        Order.payment_status.ilike(PaymentStatus.COMPLETED.value)
-    ).scalar() or 0
-    
-    # Tickets by status
-    tickets_by_status = db.query(
-        Ticket.status, func.count(Ticket.ticket_id)
-    ).filter(
-        Ticket.event_id == event_id
-    ).group_by(Ticket.status).all()
+    tickets_sold = counters["tickets_active"] + counters["tickets_used"]
+    tickets_by_status = {
+        ticket_status.value: counters[f"tickets_{ticket_status.value}"]
+        for ticket_status in TicketStatus
+        if counters[f"tickets_{ticket_status.value}"]
+    }
+    revenue_by_payment_status = {
+        payment_status.value: float(counters[f"revenue_{payment_status.value}"])
+        for payment_status in PaymentStatus
+    }
     
     return {
         "event": event,
         "tickets_sold": tickets_sold,
-        "total_revenue": float(revenue),
+        "total_revenue": revenue_by_payment_status[PaymentStatus.COMPLETED.value],
         "capacity_percentage": (tickets_sold / event.total_capacity * 100) if event.total_capacity > 0 else 0,
-        "tickets_by_status": {status: count for status, count in tickets_by_status}
+        "tickets_by_status": tickets_by_status,
+        "revenue_by_payment_status": revenue_by_payment_status
     }
\ No newline at end of file
@@ -1,26 +1,70 @@
-from typing import List, Optional
-from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.cache import cache, event_key, event_slug_key, ticket_types_key
+from app.core.config import settings
+from app.core.database import get_db, get_async_read_db, get_read_db
+from app.crud.async_crud import async_event
 from app.crud.event import event as event_crud
 from app.crud.ticket_type import ticket_type as ticket_type_crud
 from app.crud.seat import seat as seat_crud
 from app.schemas.event import EventCreate, EventUpdate, EventResponse, EventList
 from app.schemas.ticket_type import TicketTypeResponse, TicketTypeCreate, TicketTypeUpdate
-from app.schemas.seat import SeatResponse, SeatCreate, SeatUpdate
-from app.schemas.common import PaginatedResponse
+from app.schemas.seat import (
+    SeatResponse, SeatCreate, SeatUpdate, SeatHoldCreate, SeatHoldResponse,
+    SeatMapResponse, SeatMapDeltaResponse
+)
+from app.schemas.common import PaginatedResponse, CursorPage
 # from app.api.deps import require_admin  # Temporarily disabled for testing, get_optional_current_user
 from app.models.event import EventCategory, EventStatus
 from app.models.user import User
+from app.services.seat_hold import SeatHoldService
+from app.services.seat_layout import SeatLayoutService
+from app.services.seat_map import seat_map_cache
+from app.utils.http_cache import make_etag, not_modified, validator_headers
 from app.utils.pagination import paginate
 
 router = APIRouter()
 
-@router.get("/", response_model=PaginatedResponse[EventList])
-def get_events(
+# Seat map versions are per process; every map and delta carries this tag, so a version
+# from another worker or from before a restart is never compared against this history
+_SEAT_MAP_EPOCH = uuid.uuid4().hex[:8]
+
+def _cached_json(request: Request, key: str, load: Callable[[], Any]) -> Response:
+    """Serve a serialized body from the cache, loading and storing it on a miss.
+    
+    Entries are stored as "etag\nlast-modified\nbody" so hits can be revalidated without parsing the body.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        payload = load()
+        items = payload if isinstance(payload, list) else [payload]
+        last_modified = max((item.updated_at for item in items if item.updated_at), default=None)
+        body = json.dumps(jsonable_encoder(payload))
+        etag = make_etag(len(items), last_modified, body)
+        entry = "\n".join([etag, last_modified.isoformat() if last_modified else "", body])
+        cache.set(key, entry)
+    etag, modified, body = entry.split("\n", 2)
+    last_modified = datetime.fromisoformat(modified) if modified else None
+    
+    return not_modified(request, etag, last_modified) or Response(
+        content=body,
+        media_type="application/json",
+        headers=validator_headers(etag, last_modified)
+    )
+
+@router.get("/", response_model=Union[PaginatedResponse[EventList], CursorPage[EventList]])
+async def get_events(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset pagination; send an empty cursor for the first page"),
+    include_total: Optional[bool] = Query(None, description="Defaults to true for page/size and false for cursor paging"),
     category: Optional[str] = None,
     city: Optional[str] = None,
     status: Optional[str] = "published",
@@ -28,9 +72,9 @@ def get_events(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get list of events with filters and pagination"""
+    """Get list of events with filters and pagination (page/size, or cursor for keyset paging)"""
     try:
         skip = (page - 1) * size
         
@@ -57,21 +101,27 @@ def get_events(
                 except (KeyError, AttributeError):
                     category_enum = None
         
-        events = event_crud.get_multi_with_filters(
+        if cursor is not None:
+            return await async_event.get_page_by_cursor(
+                db,
+                cursor=cursor,
+                limit=size,
+                with_total=bool(include_total),
+                category=category_enum,
+                city=city,
+                status=status_enum,
+                is_featured=is_featured,
+                from_date=from_date,
+                to_date=to_date,
+                search=search
+            )
+        
+        events, total = await async_event.get_page_with_total(
             db,
             skip=skip,
             limit=size,
-            category=category_enum,
-            city=city,
-            status=status_enum,
-            is_featured=is_featured,
-            from_date=from_date,
-            to_date=to_date,
-            search=search
-        )
-        
-        total = event_crud.count_with_filters(
-            db,
+            with_count=include_total is not False,
+            window_count=settings.EVENT_LIST_WINDOW_COUNT,
             category=category_enum,
             city=city,
             status=status_enum,
@@ -99,36 +149,44 @@ def get_events(
 @router.get("/{event_id}", response_model=EventResponse)
 def get_event(
     event_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Get event by ID"""
-    event = db.query(event_crud.model).filter(
-        event_crud.model.event_id == event_id
-    ).first()
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found"
-        )
+    def load():
+        event = db.query(event_crud.model).filter(
+            event_crud.model.event_id == event_id
+        ).first()
+        
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        
+        return EventResponse.model_validate(event)
     
-    return event
+    return _cached_json(request, event_key(event_id), load)
 
 @router.get("/slug/{slug}", response_model=EventResponse)
 def get_event_by_slug(
     slug: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Get event by slug"""
-    event = event_crud.get_by_slug(db, slug=slug)
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found"
-        )
+    def load():
+        event = event_crud.get_by_slug(db, slug=slug)
+        
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        
+        return EventResponse.model_validate(event)
     
-    return event
+    return _cached_json(request, event_slug_key(slug), load)
 
 @router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
 def create_event(
@@ -184,22 +242,26 @@ def delete_event(
 @router.get("/{event_id}/ticket-types", response_model=List[TicketTypeResponse])
 def get_event_ticket_types(
     event_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     """Get all ticket types for an event"""
-    # Check if event exists
-    event = db.query(event_crud.model).filter(
-        event_crud.model.event_id == event_id
-    ).first()
-    
-    if not event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found"
-        )
+    def load():
+        # Check if event exists
+        event = db.query(event_crud.model).filter(
+            event_crud.model.event_id == event_id
+        ).first()
+        
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+        
+        ticket_types = ticket_type_crud.get_by_event(db, event_id=event_id)
+        return [TicketTypeResponse.model_validate(t) for t in ticket_types]
     
-    ticket_types = ticket_type_crud.get_by_event(db, event_id=event_id)
-    return ticket_types
+    return _cached_json(request, ticket_types_key(event_id), load)
 
 @router.post("/{event_id}/ticket-types", response_model=TicketTypeResponse, status_code=status.HTTP_201_CREATED)
 def create_ticket_type(
@@ -284,8 +346,10 @@ def delete_ticket_type(
 @router.get("/{event_id}/seats", response_model=List[SeatResponse])
 def get_event_seats(
     event_id: int,
+    request: Request,
+    response: Response,
     section: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get seats for an event"""
     # Check if event exists
@@ -299,6 +363,14 @@ def get_event_seats(
             detail="Event not found"
         )
     
+    # Revalidate against an aggregate before loading any seat rows
+    count, last_modified, checksum = seat_crud.get_version(db, event_id=event_id, section=section)
+    etag = make_etag(event_id, section, count, last_modified, *checksum)
+    unchanged = not_modified(request, etag, last_modified)
+    if unchanged:
+        return unchanged
+    response.headers.update(validator_headers(etag, last_modified))
+    
     if section:
         seats = seat_crud.get_by_section(db, event_id=event_id, section=section)
     else:
@@ -306,6 +378,79 @@ def get_event_seats(
     
     return seats
 
+def _get_seat_map(db: Session, event_id: int):
+    seat_map = seat_map_cache.get(db, event_id)
+    if not seat_map.seat_count:
+        # Only an empty map needs the event existence check
+        event = db.query(event_crud.model).filter(
+            event_crud.model.event_id == event_id
+        ).first()
+        if not event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found"
+            )
+    return seat_map
+
+@router.get("/{event_id}/seats/map", response_model=SeatMapResponse)
+def get_event_seat_map(
+    event_id: int,
+    request: Request,
+    response: Response,
+    include_layout: bool = True,
+    db: Session = Depends(get_db)
+):
+    """Get packed seat availability: base64, 2 bits per seat (0 available, 1 reserved, 2 booked, 3 blocked)"""
+    seat_map = _get_seat_map(db, event_id)
+    etag = make_etag(_SEAT_MAP_EPOCH, event_id, seat_map.layout_id, seat_map.version, include_layout)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    response.headers.update(validator_headers(etag))
+    return {
+        "event_id": event_id,
+        "epoch": _SEAT_MAP_EPOCH,
+        "version": seat_map.version,
+        "layout_id": seat_map.layout_id,
+        "seat_count": seat_map.seat_count,
+        "states": seat_map.packed_states(),
+        "layout": seat_map.layout if include_layout else None
+    }
+
+@router.get("/{event_id}/seats/map/delta", response_model=SeatMapDeltaResponse)
+def get_event_seat_map_delta(
+    event_id: int,
+    since: int = Query(..., ge=0),
+    epoch: Optional[str] = None,
+    layout_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Get seat state changes as [index, state] pairs since a map version, or the full map if too old.
+    
+    `epoch` must echo the one the version came from; any other (or none) gets the full map.
+    """
+    seat_map = _get_seat_map(db, event_id)
+    changes = None
+    if epoch == _SEAT_MAP_EPOCH and (layout_id is None or layout_id == seat_map.layout_id):
+        changes = seat_map.changes_since(since)
+    if changes is None:
+        return {
+            "event_id": event_id,
+            "epoch": _SEAT_MAP_EPOCH,
+            "version": seat_map.version,
+            "layout_id": seat_map.layout_id,
+            "full": True,
+            "states": seat_map.packed_states()
+        }
+    return {
+        "event_id": event_id,
+        "epoch": _SEAT_MAP_EPOCH,
+        "version": seat_map.version,
+        "layout_id": seat_map.layout_id,
+        "full": False,
+        "changes": changes
+    }
+
 @router.post("/{event_id}/seats", response_model=SeatResponse, status_code=status.HTTP_201_CREATED)
 def create_seat(
     event_id: int,
@@ -327,6 +472,7 @@ def create_seat(
     seat_data = seat_in.dict()
     seat_data['event_id'] = event_id
     seat = seat_crud.create(db, obj_in=SeatCreate(**seat_data))
+    seat_map_cache.invalidate(event_id)
     return seat
 
 @router.post("/{event_id}/seats/bulk", response_model=List[SeatResponse], status_code=status.HTTP_201_CREATED)
@@ -354,8 +500,62 @@ def create_seats_bulk(
         seats_data.append(SeatCreate(**seat_data))
     
     seats = seat_crud.bulk_create(db, seats_data=seats_data)
+    seat_map_cache.invalidate(event_id)
     return seats
 
+@router.post("/{event_id}/seats/generate")
+def generate_seats(
+    event_id: int,
+    db: Session = Depends(get_db),
+):
+    """Create the seats described by the event's seat_map_config, streaming NDJSON progress; safe to re-run"""
+    # Check if event exists
+    event = db.query(event_crud.model).filter(
+        event_crud.model.event_id == event_id
+    ).first()
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    layout = SeatLayoutService.parse(event.seat_map_config)
+    return StreamingResponse(
+        SeatLayoutService.generate(event_id, layout),
+        media_type="application/x-ndjson"
+    )
+
+@router.post("/{event_id}/seats/hold", response_model=SeatHoldResponse, status_code=status.HTTP_201_CREATED)
+def hold_seats(
+    event_id: int,
+    hold_in: SeatHoldCreate,
+    db: Session = Depends(get_db),
+):
+    """Hold seats for a limited time before checkout"""
+    # Check if event exists
+    event = db.query(event_crud.model).filter(
+        event_crud.model.event_id == event_id
+    ).first()
+    
+    if not event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found"
+        )
+    
+    return SeatHoldService.hold_seats(db, event_id=event_id, hold_in=hold_in)
+
+@router.delete("/{event_id}/seats/hold/{holder_id}", status_code=status.HTTP_204_NO_CONTENT)
+def release_seat_hold(
+    event_id: int,
+    holder_id: str,
+    db: Session = Depends(get_db),
+):
+    """Release held seats"""
+    SeatHoldService.release_hold(db, event_id=event_id, holder_id=holder_id)
+    return None
+
 @router.put("/{event_id}/seats/{seat_id}", response_model=SeatResponse)
 def update_seat(
     event_id: int,
@@ -383,6 +583,7 @@ def update_seat(
         )
     
     seat = seat_crud.update(db, db_obj=seat, obj_in=seat_in)
+    seat_map_cache.invalidate(event_id)
     return seat
 
 @router.delete("/{event_id}/seats/{seat_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -411,4 +612,5 @@ def delete_seat(
         )
     
     seat_crud.delete(db, id=seat_id)
+    seat_map_cache.invalidate(event_id)
     return None
\ No newline at end of file
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Header
+from app.schemas.queue import QueueStatus
+from app.services.waiting_room import WaitingRoomService
+
+router = APIRouter()
+
+@router.post("/{event_id}/join", response_model=QueueStatus)
+def join_queue(event_id: int):
+    """Join an event's waiting room; buyers within the burst are admitted immediately"""
+    return WaitingRoomService.join(event_id)
+
+@router.get("/{event_id}/status", response_model=QueueStatus)
+def get_queue_status(
+    event_id: int,
+    queue_token: str = Header(..., alias="Queue-Token")
+):
+    """Poll position and ETA; includes the admission token for POST /orders once admitted"""
+    return WaitingRoomService.status(event_id, queue_token)
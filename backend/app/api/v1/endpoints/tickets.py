@@ -1,13 +1,15 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.crud.ticket import ticket as ticket_crud
-from app.schemas.ticket import TicketResponse, TicketCheckIn
+from app.schemas.ticket import TicketResponse, TicketCheckIn, TicketCheckInBatch, TicketCheckInBatchResponse
 from app.schemas.common import MessageResponse
 # from app.api.deps import get_current_active_user, require_admin  # Temporarily disabled for testing
 from app.models.user import User
 from app.models.ticket import Ticket, TicketStatus
+from app.services.checkin import CheckInResult, CheckInService
 
 router = APIRouter()
 
@@ -46,13 +48,22 @@ def get_ticket(
     return ticket
 
 @router.post("/checkin", response_model=TicketResponse)
-def checkin_ticket(
+async def checkin_ticket(
     checkin_data: TicketCheckIn,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     # current_user: User = Depends(require_admin)  # Temporarily disabled for testing
 ):
     """Check-in ticket (Admin only)"""
-    ticket = ticket_crud.check_in(db, ticket_code=checkin_data.ticket_code)
+    def check_in(sync_db: Session) -> Optional[TicketResponse]:
+        result, ticket = CheckInService.check_in(
+            sync_db,
+            checkin_data.ticket_code,
+            event_id=checkin_data.event_id,
+            gate_id=checkin_data.gate_id
+        )
+        return TicketResponse.model_validate(ticket) if ticket else None
+    
+    ticket = await db.run_sync(check_in)
     
     if not ticket:
         raise HTTPException(
@@ -62,6 +73,25 @@ def checkin_ticket(
     
     return ticket
 
+@router.post("/checkin/batch", response_model=TicketCheckInBatchResponse)
+async def checkin_tickets_batch(
+    batch: TicketCheckInBatch,
+    db: AsyncSession = Depends(get_async_db),
+    # current_user: User = Depends(require_admin)  # Temporarily disabled for testing
+):
+    """Sync scans queued by an offline gate scanner (Admin only)"""
+    results = await db.run_sync(
+        CheckInService.check_in_batch,
+        batch.scans,
+        event_id=batch.event_id,
+        gate_id=batch.gate_id
+    )
+    
+    counts = {result.value: 0 for result in CheckInResult}
+    for entry in results:
+        counts[entry["result"]] += 1
+    return {**counts, "results": results}
+
 @router.get("/verify/{ticket_code}", response_model=TicketResponse)
 def verify_ticket(
     ticket_code: str,
@@ -0,0 +1,9 @@
+from typing import Any, Dict, Optional
+
+
+def scope_header(scope: Dict[str, Any], name: bytes) -> Optional[str]:
+    """First value of a request header in an ASGI scope; `name` is the lowercase header name"""
+    for key, value in scope.get("headers") or []:
+        if key == name:
+            return value.decode("latin-1")
+    return None
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.models.event import Event, EventStatus
+from app.models.ticket_type import TicketType, TicketTypeStatus
+
+
+logger = logging.getLogger(__name__)
+
+
+class TierAvailability:
+    __slots__ = ("name", "remaining", "sold_out", "version")
+
+    def __init__(self, name: str, remaining: int, sold_out: bool, version: int = 1) -> None:
+        self.name = name
+        self.remaining = remaining
+        self.sold_out = sold_out
+        self.version = version
+
+
+class AvailabilitySnapshot:
+    """Remaining tickets per ticket_type_id, kept in process so orders for gone tiers fail before touching the DB.
+
+    Local bookings and cancellations patch it after commit; other workers' changes arrive with the periodic
+    reconcile. An unknown tier is always let through, and the reservation UPDATE stays the source of truth.
+    """
+
+    def __init__(self) -> None:
+        self._tiers: Dict[int, TierAvailability] = {}
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.rejected = 0
+        self.reconciles = 0
+        self.last_reconcile: Optional[float] = None
+
+    def first_unavailable(self, quantities: Dict[int, int]) -> Optional[str]:
+        """Name of the first tier known to lack the requested quantity, or None to go ahead"""
+        self.checks += 1
+        for ticket_type_id, quantity in quantities.items():
+            tier = self._tiers.get(ticket_type_id)
+            if tier is not None and (tier.sold_out or tier.remaining < quantity):
+                self.rejected += 1
+                return tier.name
+        return None
+
+    def _set(self, ticket_type_id: int, name: str, remaining: int, sold_out: bool) -> None:
+        tier = self._tiers.get(ticket_type_id)
+        if tier is None:
+            self._tiers[ticket_type_id] = TierAvailability(name, remaining, sold_out)
+        elif (tier.name, tier.remaining, tier.sold_out) != (name, remaining, sold_out):
+            tier.name, tier.remaining, tier.sold_out = name, remaining, sold_out
+            tier.version += 1
+
+    def record(self, ticket_type: TicketType) -> None:
+        """Store a tier from a freshly loaded row"""
+        remaining = ticket_type.quantity_available - (ticket_type.quantity_sold or 0)
+        with self._lock:
+            self._set(
+                ticket_type.ticket_type_id,
+                ticket_type.name,
+                remaining,
+                remaining <= 0 or ticket_type.status == TicketTypeStatus.SOLD_OUT,
+            )
+
+    def apply(self, sold: Dict[int, int]) -> None:
+        """Patch known tiers after a committed booking (positive) or cancellation (negative)"""
+        with self._lock:
+            for ticket_type_id, quantity in sold.items():
+                tier = self._tiers.get(ticket_type_id)
+                if tier is not None:
+                    self._set(ticket_type_id, tier.name, tier.remaining - quantity, tier.remaining - quantity <= 0)
+
+    def invalidate(self, ticket_type_ids: Iterable[int]) -> None:
+        with self._lock:
+            for ticket_type_id in ticket_type_ids:
+                self._tiers.pop(ticket_type_id, None)
+
+    def reconcile(self, db: Session) -> int:
+        """Reload every tier of events on sale; returns the number of tiers tracked"""
+        rows = db.query(
+            TicketType.ticket_type_id,
+            TicketType.name,
+            TicketType.quantity_available - TicketType.quantity_sold,
+            TicketType.status,
+        ).join(
+            Event, Event.event_id == TicketType.event_id
+        ).filter(
+            Event.status.in_([EventStatus.PUBLISHED, EventStatus.ONGOING])
+        ).all()
+        with self._lock:
+            live = set()
+            for ticket_type_id, name, remaining, status in rows:
+                live.add(ticket_type_id)
+                self._set(ticket_type_id, name, remaining, remaining <= 0 or status == TicketTypeStatus.SOLD_OUT)
+            for ticket_type_id in set(self._tiers) - live:
+                del self._tiers[ticket_type_id]
+        self.reconciles += 1
+        self.last_reconcile = time.monotonic()
+        return len(live)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tiers": len(self._tiers),
+            "sold_out_tiers": sum(1 for tier in list(self._tiers.values()) if tier.sold_out),
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "rejection_rate": round(self.rejected / self.checks, 4) if self.checks else 0.0,
+            "reconciles": self.reconciles,
+            "seconds_since_reconcile": (
+                round(time.monotonic() - self.last_reconcile, 1) if self.last_reconcile is not None else None
+            ),
+        }
+
+
+availability = AvailabilitySnapshot()
+metrics.register("availability", availability.stats)
+
+
+def reconcile_availability() -> int:
+    db = SessionLocal()
+    try:
+        return availability.reconcile(db)
+    finally:
+        db.close()
+
+
+async def run_reconciler() -> None:
+    """Background loop that reloads the snapshot every AVAILABILITY_RECONCILE_SECONDS"""
+    while True:
+        try:
+            await run_in_threadpool(reconcile_availability)
+        except Exception:
+            logger.exception("Error reconciling ticket availability")
+        await asyncio.sleep(settings.AVAILABILITY_RECONCILE_SECONDS)
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.read_after_write import RecentKeys
+from app.core.redis import get_redis
+
+
+class CacheBackend:
+    """Key/value cache for serialized response bodies, with hit/miss counters"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+        # With replicas, a reload right after an invalidation may read pre-write rows; don't cache those
+        self.recently_invalidated = RecentKeys(settings.READ_AFTER_WRITE_SECONDS)
+
+    # A cache outage degrades to cache misses instead of failing the reads behind it
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self._get(key)
+        except Exception:
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        try:
+            if settings.SQLALCHEMY_REPLICA_URIS and self._recently_invalidated(key):
+                return
+            self._set(key, value, ttl if ttl is not None else settings.CACHE_TTL_SECONDS)
+        except Exception:
+            self.errors += 1
+
+    def delete(self, *keys: str) -> None:
+        self.invalidations += len(keys)
+        try:
+            if settings.SQLALCHEMY_REPLICA_URIS:
+                self._mark_invalidated(*keys)
+            self._delete(*keys)
+        except Exception:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+    def _recently_invalidated(self, key: str) -> bool:
+        return self.recently_invalidated.is_recent(key)
+
+    def _mark_invalidated(self, *keys: str) -> None:
+        for key in keys:
+            self.recently_invalidated.mark(key)
+
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        raise NotImplementedError
+
+    def _delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU with per-entry TTL.
+
+    Single worker only: invalidations reach this process alone, so other workers would serve stale
+    entries until their TTL runs out. Deployments with several workers use RedisCache.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({"entries": len(self._entries), "evictions": self.evictions})
+        return stats
+
+
+class RedisCache(CacheBackend):
+    """Redis-compatible backend shared by all workers; pass `client` to use a local stand-in such as fakeredis"""
+
+    def __init__(self, client: Any = None, prefix: str = "") -> None:
+        super().__init__()
+        self.client = client if client is not None else get_redis()
+        self.prefix = prefix
+
+    def _get(self, key: str) -> Optional[str]:
+        return self.client.get(self.prefix + key)
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def _delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    # Invalidation marks live in Redis too, so a worker that did not see the write still skips stale reloads
+
+    def _recently_invalidated(self, key: str) -> bool:
+        return bool(self.client.exists(f"{self.prefix}invalidated:{key}"))
+
+    def _mark_invalidated(self, *keys: str) -> None:
+        pipeline = self.client.pipeline()
+        for key in keys:
+            pipeline.set(f"{self.prefix}invalidated:{key}", 1, ex=settings.READ_AFTER_WRITE_SECONDS)
+        pipeline.execute()
+
+
+def build_cache() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(prefix=settings.CACHE_KEY_PREFIX)
+    return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+cache = build_cache()
+metrics.register("cache", cache.stats)
+
+
+def event_key(event_id: int) -> str:
+    return f"event:{event_id}"
+
+
+def event_slug_key(slug: str) -> str:
+    return f"event:slug:{slug}"
+
+
+def ticket_types_key(event_id: int) -> str:
+    return f"event:{event_id}:ticket_types"
+
+
+def invalidate_event(event_id: int, slug: Optional[str] = None) -> None:
+    keys = [event_key(event_id), ticket_types_key(event_id)]
+    if slug:
+        keys.append(event_slug_key(slug))
+    cache.delete(*keys)
+
+
+def invalidate_ticket_types(event_id: int) -> None:
+    cache.delete(ticket_types_key(event_id))
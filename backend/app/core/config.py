@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Optional
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict  # type: ignore[import]
@@ -29,6 +29,98 @@ class Settings(BaseSettings):
         "shuttle.proxy.rlwy.net:53657/railway"
     )
 
+    # Read replicas for read-only endpoints, as a JSON list; empty means reads use the primary
+    SQLALCHEMY_REPLICA_URIS: List[str] = []
+    # Clients read from the primary for this long after their own writes
+    READ_AFTER_WRITE_SECONDS: int = 5
+
+    # Connection pools, per worker process. Sync endpoints (run on the threadpool) and async endpoints have
+    # separate engines, and each replica gets one engine of each kind, so a worker can open up to
+    #   (DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW) * (1 + replicas)
+    # connections: 20 per database with these defaults. Multiply by the worker count to check the server's max_connections.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_ASYNC_POOL_SIZE: int = 5
+    DB_ASYNC_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    # Pre-ping costs a round trip per checkout; recycle below the server's wait_timeout covers idle drops
+    DB_POOL_PRE_PING: bool = True
+    # LIFO reuses warm connections and lets surplus idle ones age out
+    DB_POOL_USE_LIFO: bool = True
+
+    # Event listing totals from COUNT(*) OVER() on the page query instead of a separate COUNT: saves a round trip
+    # but sorts every matching row, so it only pays off where round trips to the database are slow
+    EVENT_LIST_WINDOW_COUNT: bool = False
+
+    # Redis (shared store for the cache, and optionally rate limits and the waiting room)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Kept short: a slow or unreachable Redis turns into cache misses, not stalled requests
+    REDIS_TIMEOUT_SECONDS: float = 0.5
+
+    # Read-through cache for public event reads: "memory" (per process) or "redis" (shared by all workers).
+    # With several workers on "memory" an update reaches only the worker that made it; the others keep
+    # serving the old event for up to CACHE_TTL_SECONDS, so multi-worker deployments should use "redis"
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: int = 30
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_KEY_PREFIX: str = "webticket:"
+
+    # Seat holds
+    SEAT_HOLD_TTL_SECONDS: int = 600
+    SEAT_HOLD_MAX_TTL_SECONDS: int = 1800
+    SEAT_HOLD_SWEEP_INTERVAL_SECONDS: int = 30
+
+    # Ticket codes and order numbers: every process leases its own node id (0-1023) from the database.
+    # CODE_NODE_ID is only the one tried first; processes that find it taken lease another free id
+    CODE_NODE_ID: Optional[int] = None
+    # A lease is renewed every third of this, and no code is minted on a lease older than half of it
+    CODE_NODE_LEASE_SECONDS: int = 300
+
+    # Idempotency-Key handling for order creation
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24
+    # How long an in-flight request holds its key before a retry may take it over
+    IDEMPOTENCY_LEASE_SECONDS: int = 30
+    # How long a concurrent duplicate waits for the in-flight request before getting 409
+    IDEMPOTENCY_WAIT_SECONDS: int = 10
+    IDEMPOTENCY_SWEEP_INTERVAL_SECONDS: int = 300
+
+    # Per-client rate limits by route group: {"<group>": [requests per second, burst]}; groups are in core/rate_limit.py
+    RATE_LIMIT_ENABLED: bool = True
+    # "memory" (per process) or "redis" (shared across workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_RULES: Dict[str, List[float]] = {
+        "events": [10, 50],
+        "seats": [5, 20],
+    }
+    # Addresses or CIDR ranges of the reverse proxies (nginx, ingress) whose X-Forwarded-For is believed;
+    # without them every request behind a proxy would share the proxy's bucket
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []
+
+    # Waiting room for on-sales: when enabled, POST /orders requires an admission token
+    WAITING_ROOM_ENABLED: bool = False
+    WAITING_ROOM_SECRET_KEY: str = "super-waiting-room-secret-key-change-me"
+    # "memory" (single process) or "redis" (shared across processes)
+    WAITING_ROOM_BACKEND: str = "memory"
+    # Buyers admitted per second for each event, with per-event overrides as a JSON object {"<event_id>": rate}
+    WAITING_ROOM_ADMIT_PER_SECOND: float = 20.0
+    WAITING_ROOM_EVENT_RATES: Dict[str, float] = {}
+    # Buyers admitted at once before the queue starts
+    WAITING_ROOM_BURST: int = 50
+    # How long an admission stays valid once its slot opens; each admission is good for one order
+    WAITING_ROOM_ADMISSION_TTL_SECONDS: int = 600
+
+    # Per-tier availability snapshot: how often it is reconciled against the database
+    AVAILABILITY_RECONCILE_SECONDS: int = 5
+
+    # Seat generation from Event.seat_map_config
+    SEAT_GENERATION_CHUNK_SIZE: int = 2000
+    SEAT_GENERATION_MAX_SEATS: int = 100000
+
+    # Seat map availability snapshots
+    SEAT_MAP_REFRESH_SECONDS: int = 5
+    SEAT_MAP_MAX_CHANGES: int = 4096
+
     # CORS - Must specify exact origins when allow_credentials=True
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -39,6 +131,20 @@ class Settings(BaseSettings):
         "http://127.0.0.1:5173",
     ]
 
+    @field_validator("RATE_LIMIT_RULES")
+    def check_rate_limit_rules(cls, value):
+        if any(len(rule) != 2 or rule[0] <= 0 or rule[1] < 1 for rule in value.values()):
+            raise ValueError("rate limit rules must be [requests per second > 0, burst >= 1]")
+        return value
+
+    @field_validator("WAITING_ROOM_ADMIT_PER_SECOND", "WAITING_ROOM_EVENT_RATES")
+    def check_admission_rates(cls, value):
+        # A zero rate would divide by zero in the schedule; turn the waiting room off instead
+        rates = value.values() if isinstance(value, dict) else [value]
+        if any(rate <= 0 for rate in rates):
+            raise ValueError("admission rates must be greater than 0")
+        return value
+
     @field_validator("BACKEND_CORS_ORIGINS", mode="before")
     def split_cors_origins(cls, value):
         if isinstance(value, str):
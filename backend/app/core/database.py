@@ -1,23 +1,131 @@
-from typing import Generator
+import random
+from typing import AsyncGenerator, Generator, List
 
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.pool import instrument_engine, instrumented_pool_class, pool_stats
+from app.core.read_after_write import wrote_recently
 
 
-connect_args = {}
-if settings.SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+def get_pool_options(uri: str, pool_class: type, pool_size: int, max_overflow: int) -> dict:
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if make_url(uri).database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's default pool
+        return options
+    options.update({
+        "poolclass": instrumented_pool_class(pool_class),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    })
+    return options
+
+
+def build_engine(uri: str, metrics_name: str) -> Engine:
+    connect_args = {}
+    if uri.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+
+    db_engine = create_engine(
+        uri,
+        connect_args=connect_args,
+        **get_pool_options(uri, QueuePool, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
+    )
+    instrument_engine(db_engine)
+    metrics.register(metrics_name, lambda: pool_stats(db_engine))
+    return db_engine
+
+
+engine = build_engine(settings.SQLALCHEMY_DATABASE_URI, "db_pool")
+replica_engines = [
+    build_engine(uri, f"db_pool_replica_{i}")
+    for i, uri in enumerate(settings.SQLALCHEMY_REPLICA_URIS)
+]
+
+
+class RoutingSession(Session):
+    """Session that sends read-only sessions' queries to a replica and everything else to the primary"""
+
+    primary: Engine = engine
+    replicas: List[Engine] = replica_engines
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and self.replicas and not self._flushing:
+            return random.choice(self.replicas)
+        return self.primary
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    connect_args=connect_args,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    info={"read_only": True},
+)
+
+# Async drivers for the same databases: aiomysql for MySQL, aiosqlite for SQLite
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_uri(uri: str) -> str:
+    url = make_url(uri)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def build_async_engine(uri: str, metrics_name: str) -> AsyncEngine:
+    db_engine = create_async_engine(
+        get_async_database_uri(uri),
+        **get_pool_options(uri, AsyncAdaptedQueuePool, settings.DB_ASYNC_POOL_SIZE, settings.DB_ASYNC_MAX_OVERFLOW),
+    )
+    instrument_engine(db_engine.sync_engine)
+    metrics.register(metrics_name, lambda: pool_stats(db_engine.sync_engine))
+    return db_engine
+
+
+async_engine = build_async_engine(settings.SQLALCHEMY_DATABASE_URI, "db_pool_async")
+async_replica_engines = [
+    build_async_engine(uri, f"db_pool_async_replica_{i}")
+    for i, uri in enumerate(settings.SQLALCHEMY_REPLICA_URIS)
+]
+
+
+class AsyncRoutingSession(RoutingSession):
+    # AsyncSession drives a sync Session, which must be bound to the async engines' sync facades
+    primary = async_engine.sync_engine
+    replicas = [replica.sync_engine for replica in async_replica_engines]
+
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) reload
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=AsyncRoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+    info={"read_only": True},
+)
 
 Base = declarative_base()
 
@@ -29,3 +137,27 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Session for read-only endpoints: a replica, or the primary right after the client's own writes"""
+    if wrote_recently(request.scope):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    session_factory = AsyncReadSessionLocal
+    if wrote_recently(request.scope):
+        session_factory = AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
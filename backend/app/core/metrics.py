@@ -0,0 +1,17 @@
+from typing import Any, Callable, Dict
+
+
+class MetricsRegistry:
+    """Named metric providers collected into one snapshot for the /metrics endpoint"""
+
+    def __init__(self) -> None:
+        self._providers: Dict[str, Callable[[], Any]] = {}
+
+    def register(self, name: str, provider: Callable[[], Any]) -> None:
+        self._providers[name] = provider
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: provider() for name, provider in self._providers.items()}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+
+class PoolMetrics:
+    """Checkout counters shared by every pool built from one instrumented pool class"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def record_invalidation(self, *args: Any) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+
+def instrumented_pool_class(base: Type[Pool]) -> Type[Pool]:
+    """Subclass of a SQLAlchemy pool class that times every checkout.
+
+    The metrics live on the class so they survive Pool.recreate() after a disconnect.
+    """
+    pool_metrics = PoolMetrics()
+
+    class InstrumentedPool(base):  # type: ignore[valid-type, misc]
+        metrics = pool_metrics
+
+        def _do_get(self) -> Any:
+            # Includes the time spent waiting for a free slot and opening new connections
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                self.metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+                raise
+            self.metrics.record_checkout(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count invalidated connections (disconnects, failed pre-pings) on the engine's pool"""
+    pool_metrics = getattr(engine.pool, "metrics", None)
+    if pool_metrics is not None:
+        event.listen(engine, "invalidate", pool_metrics.record_invalidation)
+        event.listen(engine, "soft_invalidate", pool_metrics.record_invalidation)
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__, "status": pool.status()}
+    pool_metrics = getattr(pool, "metrics", None)
+    if pool_metrics is None:
+        return stats
+    checkouts = pool_metrics.checkouts
+    stats.update({
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # overflow() counts down from -pool_size; only positive values are connections beyond the pool
+        "overflow_in_use": max(pool.overflow(), 0),
+        "checkouts": checkouts,
+        "timeouts": pool_metrics.timeouts,
+        "invalidations": pool_metrics.invalidations,
+        "wait_ms_avg": round(pool_metrics.wait_seconds_total * 1000 / checkouts, 3) if checkouts else 0.0,
+        "wait_ms_max": round(pool_metrics.wait_seconds_max * 1000, 3),
+    })
+    return stats
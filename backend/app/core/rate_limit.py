@@ -0,0 +1,184 @@
+import ipaddress
+import json
+import math
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.asgi import scope_header
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_redis
+from app.core.security import decode_token
+
+
+# (group, method, path pattern); first match wins, unmatched requests are not limited
+ROUTE_GROUPS: List[Tuple[str, str, Pattern]] = [
+    ("seats", "GET", re.compile(rf"^{re.escape(settings.API_V1_STR)}/events/\d+/seats")),
+    ("events", "GET", re.compile(rf"^{re.escape(settings.API_V1_STR)}/events(/|$)")),
+]
+
+
+def route_group(method: str, path: str) -> Optional[str]:
+    for group, group_method, pattern in ROUTE_GROUPS:
+        if method == group_method and pattern.match(path):
+            return group
+    return None
+
+
+def client_address(scope: Dict[str, Any], trusted_proxies: List[Any]) -> str:
+    """The caller's address: the peer, or the last X-Forwarded-For hop added in front of a trusted proxy"""
+    client = scope.get("client")
+    address = client[0] if client else "anonymous"
+
+    def trusted(value: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(value)
+        except ValueError:
+            return False
+        return any(ip in network for network in trusted_proxies)
+
+    if not trusted(address):
+        return address
+    forwarded = scope_header(scope, b"x-forwarded-for")
+    # Hops are appended left to right, so everything left of the first untrusted hop from the right is client-supplied
+    for hop in reversed([hop.strip() for hop in (forwarded or "").split(",") if hop.strip()]):
+        if not trusted(hop):
+            return hop
+        address = hop
+    return address
+
+
+def client_user(scope: Dict[str, Any]) -> Optional[str]:
+    """Subject of a valid bearer access token, if the request carries one"""
+    authorization = scope_header(scope, b"authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    payload = decode_token(authorization[7:].strip())
+    if not payload or payload.get("type") != "access" or payload.get("sub") is None:
+        return None
+    return str(payload["sub"])
+
+
+class RateLimitStore:
+    """Token buckets kept as GCRA: one "theoretical arrival time" per key instead of a token count"""
+
+    async def hit(self, key: str, rate: float, burst: int) -> float:
+        """Take a token; returns 0 when allowed, otherwise seconds until the next token"""
+        raise NotImplementedError
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-process buckets; only the event loop thread touches them, so no lock is taken"""
+
+    def __init__(self, max_keys: int = 100000) -> None:
+        self.max_keys = max_keys
+        self._tats: Dict[str, float] = {}
+
+    async def hit(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        interval = 1.0 / rate
+        tat = max(self._tats.get(key, now), now) + interval
+        wait = tat - now - burst * interval
+        if wait > 0:
+            return wait
+        self._tats[key] = tat
+        if len(self._tats) > self.max_keys:
+            # Drop buckets that have refilled completely
+            self._tats = {k: t for k, t in self._tats.items() if t > now}
+        return 0.0
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Buckets shared by all workers; one Lua script call per request, run off the event loop"""
+
+    SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local interval = 1 / tonumber(ARGV[1])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or '0'), now) + interval
+local wait = tat - now - tonumber(ARGV[2]) * interval
+if wait > 0 then
+    return tostring(wait)
+end
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000))
+return '0'
+"""
+
+    def __init__(self, client: Any = None, prefix: str = "") -> None:
+        self.client = client if client is not None else get_redis()
+        self.prefix = prefix
+        self._script = self.client.register_script(self.SCRIPT)
+
+    async def hit(self, key: str, rate: float, burst: int) -> float:
+        wait = await run_in_threadpool(self._script, keys=[f"{self.prefix}rate_limit:{key}"], args=[rate, burst])
+        return float(wait)
+
+
+def build_rate_limit_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitStore(prefix=settings.CACHE_KEY_PREFIX)
+    return MemoryRateLimitStore()
+
+
+class RateLimitMiddleware:
+    """Per-client token buckets for each route group; over-limit requests get a 429 without reaching the app"""
+
+    def __init__(self, app: Any, store: Optional[RateLimitStore] = None) -> None:
+        self.app = app
+        self.store = store or build_rate_limit_store()
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False) for proxy in settings.RATE_LIMIT_TRUSTED_PROXIES
+        ]
+        self.allowed: Counter = Counter()
+        self.rejected: Counter = Counter()
+        self.store_errors = 0
+        metrics.register("rate_limit", self.stats)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.store).__name__,
+            "allowed": dict(self.allowed),
+            "rejected": dict(self.rejected),
+            "store_errors": self.store_errors,
+        }
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        group = route_group(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        rule = settings.RATE_LIMIT_RULES.get(group) if group else None
+        if not rule:
+            await self.app(scope, receive, send)
+            return
+
+        # Every request spends from its address's bucket, since credentials are free for a scraper to rotate;
+        # signed-in requests also spend from their user's bucket, which follows the user across addresses
+        keys = [f"{group}:ip:{client_address(scope, self.trusted_proxies)}"]
+        user = client_user(scope)
+        if user is not None:
+            keys.append(f"{group}:user:{user}")
+        try:
+            wait = 0.0
+            for key in keys:
+                wait = max(wait, await self.store.hit(key, rule[0], int(rule[1])))
+        except Exception:
+            # A shared store outage must not take the API down with it
+            self.store_errors += 1
+            wait = 0.0
+        if wait <= 0:
+            self.allowed[group] += 1
+            await self.app(scope, receive, send)
+            return
+
+        self.rejected[group] += 1
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(math.ceil(wait)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": json.dumps({"detail": "Too many requests"}).encode()})
@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from http.cookies import CookieError, SimpleCookie
+from typing import Any, Dict
+
+from app.core.asgi import scope_header
+from app.core.config import settings
+
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Carries "read from the primary until <unix time>" back from the write, so any worker can honour it;
+# browsers resend the cookie, other clients echo the response header as a request header
+TOKEN_COOKIE = "read_after_write"
+TOKEN_HEADER = "Read-After-Write"
+
+
+class RecentKeys:
+    """Keys touched within the last `window_seconds`, e.g. clients that just wrote"""
+
+    def __init__(self, window_seconds: float, max_keys: int = 100000) -> None:
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._marked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._marked[key] = now + self.window_seconds
+            if len(self._marked) > self.max_keys:
+                self._marked = {k: until for k, until in self._marked.items() if until > now}
+
+    def is_recent(self, key: str) -> bool:
+        until = self._marked.get(key)
+        return until is not None and until > time.monotonic()
+
+
+recent_writers = RecentKeys(settings.READ_AFTER_WRITE_SECONDS)
+
+
+def _token_until(scope: Dict[str, Any]) -> float:
+    value = scope_header(scope, TOKEN_HEADER.lower().encode())
+    if value is None:
+        cookies = SimpleCookie()
+        try:
+            cookies.load(scope_header(scope, b"cookie") or "")
+        except CookieError:
+            return 0.0
+        value = cookies[TOKEN_COOKIE].value if TOKEN_COOKIE in cookies else None
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def wrote_recently(scope: Dict[str, Any]) -> bool:
+    """Whether the caller's reads should go to the primary: a write on any worker, or on this one, within the window"""
+    now = time.time()
+    # A token further out than one window (plus a second of clock skew between workers) was not issued by us
+    if now < _token_until(scope) <= now + settings.READ_AFTER_WRITE_SECONDS + 1:
+        return True
+    return recent_writers.is_recent(client_key(scope))
+
+
+def client_key(scope: Dict[str, Any]) -> str:
+    """Identify the caller by credentials when sent, otherwise by address"""
+    for name, value in scope.get("headers") or []:
+        if name == b"authorization":
+            return "auth:" + hashlib.sha1(value).hexdigest()
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "anonymous"
+
+
+class ReadAfterWriteMiddleware:
+    """Mark clients after successful writes so their reads stick to the primary for a short window.
+
+    The mark is kept in this process and also handed to the client as a cookie and response header,
+    since its next read may well land on another worker.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_mark(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                recent_writers.mark(client_key(scope))
+                window = settings.READ_AFTER_WRITE_SECONDS
+                until = f"{time.time() + window:.3f}"
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (TOKEN_HEADER.lower().encode(), until.encode()),
+                        (
+                            b"set-cookie",
+                            f"{TOKEN_COOKIE}={until}; Max-Age={window}; Path=/; HttpOnly; SameSite=Lax".encode(),
+                        ),
+                    ],
+                }
+            await send(message)
+
+        await self.app(scope, receive, send_and_mark)
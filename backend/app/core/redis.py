@@ -0,0 +1,22 @@
+from typing import Any, Optional
+
+from app.core.config import settings
+
+_client: Optional[Any] = None
+
+
+def get_redis() -> Any:
+    """Shared Redis client for the optional Redis-backed stores (requires the `redis` package)"""
+    global _client
+    if _client is None:
+        try:
+            import redis  # type: ignore[import]
+        except ImportError as e:
+            raise RuntimeError("Redis backend selected but the 'redis' package is not installed") from e
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=settings.REDIS_TIMEOUT_SECONDS,
+            socket_timeout=settings.REDIS_TIMEOUT_SECONDS,
+        )
+    return _client
@@ -4,5 +4,16 @@ from app.crud.ticket_type import ticket_type
 from app.crud.seat import seat
 from app.crud.order import order
 from app.crud.ticket import ticket
+from app.crud.sales_rollup import sales_rollup
+from app.crud.event_stats import event_stats
+from app.crud.idempotency_key import idempotency_key
+from app.crud.code_node_lease import code_node_lease
+from app.crud.async_crud import (
+    AsyncCRUD, async_user, async_event, async_ticket_type, async_seat, async_order, async_ticket
+)
 
-__all__ = ["user", "event", "ticket_type", "seat", "order", "ticket"]
\ No newline at end of file
+__all__ = [
+    "user", "event", "ticket_type", "seat", "order", "ticket", "sales_rollup", "event_stats", "idempotency_key",
+    "code_node_lease",
+    "AsyncCRUD", "async_user", "async_event", "async_ticket_type", "async_seat", "async_order", "async_ticket"
+]
\ No newline at end of file
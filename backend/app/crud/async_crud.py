@@ -0,0 +1,39 @@
+from typing import Any, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.base import CRUDBase
+from app.crud.event import event
+from app.crud.order import order
+from app.crud.seat import seat
+from app.crud.ticket import ticket
+from app.crud.ticket_type import ticket_type
+from app.crud.user import user
+
+class AsyncCRUD:
+    """Async facade over a CRUD object: every method takes an AsyncSession and is awaited.
+
+    The query code is shared with the sync CRUD and runs through AsyncSession.run_sync, so
+    database I/O goes through the async driver without occupying a threadpool worker.
+    """
+
+    def __init__(self, crud: CRUDBase):
+        self.crud = crud
+        self.model = crud.model
+
+    def __getattr__(self, name: str) -> Callable:
+        method = getattr(self.crud, name)
+        if not callable(method):
+            return method
+
+        async def call(db: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+            return await db.run_sync(method, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+async_user = AsyncCRUD(user)
+async_event = AsyncCRUD(event)
+async_ticket_type = AsyncCRUD(ticket_type)
+async_seat = AsyncCRUD(seat)
+async_order = AsyncCRUD(order)
+async_ticket = AsyncCRUD(ticket)
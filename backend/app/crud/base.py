@@ -1,7 +1,9 @@
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
 from app.core.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -55,4 +57,25 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return None
         db.delete(obj)
         db.commit()
-        return obj
\ No newline at end of file
+        return obj
+
+    def upsert_increment(self, db: Session, *, keys: Dict[str, Any], deltas: Dict[str, Any]) -> None:
+        """Insert a counter row with `deltas` as its values, or add them to the existing row, in one statement"""
+        table = self.model.__table__
+        values = {**keys, **deltas}
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            stmt = mysql.insert(table).values(values)
+            stmt = stmt.on_duplicate_key_update(
+                {name: table.c[name] + stmt.inserted[name] for name in deltas}
+            )
+        elif dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = insert(table).values(values)
+            updates = {name: table.c[name] + stmt.excluded[name] for name in deltas}
+            if "updated_at" in table.c:
+                updates["updated_at"] = func.current_timestamp()
+            stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=updates)
+        else:
+            raise NotImplementedError(f"upsert_increment is not supported on {dialect}")
+        db.execute(stmt)
@@ -0,0 +1,71 @@
+import random
+from typing import Optional
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.code_node_lease import CodeNodeLease
+
+class CRUDCodeNodeLease(CRUDBase[CodeNodeLease, dict, dict]):
+    def _claim(self, db: Session, *, node_id: int, holder: str, now: datetime, lease_seconds: int) -> bool:
+        expires_at = now + timedelta(seconds=lease_seconds)
+        # A lapsed lease is taken over in place; a node id never leased before gets its row
+        taken_over = db.query(CodeNodeLease).filter(
+            CodeNodeLease.node_id == node_id,
+            CodeNodeLease.expires_at <= now
+        ).update(
+            {CodeNodeLease.holder: holder, CodeNodeLease.expires_at: expires_at},
+            synchronize_session=False
+        )
+        if taken_over:
+            db.commit()
+            return True
+        try:
+            db.execute(insert(CodeNodeLease).values(node_id=node_id, holder=holder, expires_at=expires_at))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+        return True
+    
+    def acquire(
+        self,
+        db: Session,
+        *,
+        holder: str,
+        node_count: int,
+        lease_seconds: int,
+        preferred: Optional[int] = None
+    ) -> Optional[int]:
+        """Lease a node id in [0, node_count) that no live process holds, `preferred` first; None if all are held"""
+        now = datetime.utcnow()
+        held = {
+            node_id for (node_id,) in db.query(CodeNodeLease.node_id).filter(CodeNodeLease.expires_at > now)
+        }
+        candidates = [node_id for node_id in range(node_count) if node_id not in held]
+        # Shuffled so processes starting together rarely race for the same row
+        random.shuffle(candidates)
+        if preferred in candidates:
+            candidates.remove(preferred)
+            candidates.insert(0, preferred)
+        for node_id in candidates:
+            if self._claim(db, node_id=node_id, holder=holder, now=now, lease_seconds=lease_seconds):
+                return node_id
+        return None
+    
+    def renew(self, db: Session, *, node_id: int, holder: str, lease_seconds: int) -> bool:
+        """Extend a live lease; False if it lapsed or another process holds the node id now"""
+        now = datetime.utcnow()
+        renewed = db.query(CodeNodeLease).filter(
+            CodeNodeLease.node_id == node_id,
+            CodeNodeLease.holder == holder,
+            CodeNodeLease.expires_at > now
+        ).update(
+            {CodeNodeLease.expires_at: now + timedelta(seconds=lease_seconds)},
+            synchronize_session=False
+        )
+        db.commit()
+        return renewed == 1
+
+code_node_lease = CRUDCodeNodeLease(CodeNodeLease)
@@ -1,11 +1,14 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import func
 from datetime import date
 from slugify import slugify
+from app.core.cache import invalidate_event
 from app.crud.base import CRUDBase
 from app.models.event import Event, EventStatus, EventCategory
 from app.schemas.event import EventCreate, EventUpdate
+from app.services.search import EventSearch
+from app.utils.pagination import keyset_paginate
 
 class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
     def get_by_slug(self, db: Session, *, slug: str) -> Optional[Event]:
@@ -36,12 +39,30 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
         db.refresh(db_obj)
         return db_obj
     
-    def get_multi_with_filters(
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Event,
+        obj_in: Union[EventUpdate, Dict[str, Any]]
+    ) -> Event:
+        old_slug = db_obj.slug
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        invalidate_event(db_obj.event_id, slug=old_slug)
+        if db_obj.slug != old_slug:
+            invalidate_event(db_obj.event_id, slug=db_obj.slug)
+        return db_obj
+    
+    def delete(self, db: Session, *, id: int) -> Optional[Event]:
+        obj = super().delete(db, id=id)
+        if obj:
+            invalidate_event(obj.event_id, slug=obj.slug)
+        return obj
+    
+    def _filtered_query(
         self,
         db: Session,
         *,
-        skip: int = 0,
-        limit: int = 100,
         category: Optional[EventCategory] = None,
         city: Optional[str] = None,
         status: Optional[EventStatus] = None,
@@ -49,19 +70,19 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
         from_date: Optional[date] = None,
         to_date: Optional[date] = None,
         search: Optional[str] = None
-    ) -> List[Event]:
+    ) -> Query:
         query = db.query(Event)
         
         if category:
             # Convert enum to lowercase string for comparison
             category_val = category.value if isinstance(category, EventCategory) else str(category).lower()
-            query = query.filter(Event.category.ilike(category_val))
+            query = query.filter(Event.category == category_val)
         if city:
             query = query.filter(Event.city.ilike(f"%{city}%"))
         if status:
             # Convert enum to lowercase string for comparison
             status_val = status.value if isinstance(status, EventStatus) else str(status).lower()
-            query = query.filter(Event.status.ilike(status_val))
+            query = query.filter(Event.status == status_val)
         if is_featured is not None:
             query = query.filter(Event.is_featured == is_featured)
         if from_date:
@@ -69,53 +90,76 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
         if to_date:
             query = query.filter(Event.event_date <= to_date)
         if search:
-            query = query.filter(
-                or_(
-                    Event.title.contains(search),
-                    Event.description.contains(search)
-                )
-            )
+            query = query.filter(EventSearch.filter(db, search))
         
-        return query.order_by(Event.event_date.desc()).offset(skip).limit(limit).all()
+        return query
     
-    def count_with_filters(
+    def _order_by(self, db: Session, search: Optional[str] = None) -> list:
+        # Relevance first when searching, then the usual newest-date order
+        rank = EventSearch.rank(db, search) if search else None
+        return [rank, Event.event_date.desc()] if rank is not None else [Event.event_date.desc()]
+    
+    def get_multi_with_filters(
         self,
         db: Session,
         *,
-        category: Optional[EventCategory] = None,
-        city: Optional[str] = None,
-        status: Optional[EventStatus] = None,
-        is_featured: Optional[bool] = None,
-        from_date: Optional[date] = None,
-        to_date: Optional[date] = None,
-        search: Optional[str] = None
-    ) -> int:
-        query = db.query(Event)
+        skip: int = 0,
+        limit: int = 100,
+        **filters
+    ) -> List[Event]:
+        query = self._filtered_query(db, **filters)
+        return query.order_by(*self._order_by(db, filters.get("search"))).offset(skip).limit(limit).all()
+    
+    def count_with_filters(self, db: Session, **filters) -> int:
+        return self._filtered_query(db, **filters).count()
+    
+    def get_page_with_total(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        with_count: bool = True,
+        window_count: bool = False,
+        **filters
+    ) -> Tuple[List[Event], Optional[int]]:
+        """One page plus the filtered total.
         
-        if category:
-            # Convert enum to lowercase string for comparison
-            category_val = category.value if isinstance(category, EventCategory) else str(category).lower()
-            query = query.filter(Event.category.ilike(category_val))
-        if city:
-            query = query.filter(Event.city.ilike(f"%{city}%"))
-        if status:
-            # Convert enum to lowercase string for comparison
-            status_val = status.value if isinstance(status, EventStatus) else str(status).lower()
-            query = query.filter(Event.status.ilike(status_val))
-        if is_featured is not None:
-            query = query.filter(Event.is_featured == is_featured)
-        if from_date:
-            query = query.filter(Event.event_date >= from_date)
-        if to_date:
-            query = query.filter(Event.event_date <= to_date)
-        if search:
-            query = query.filter(
-                or_(
-                    Event.title.contains(search),
-                    Event.description.contains(search)
-                )
-            )
+        The total comes from a COUNT query, skipped when a short page already gives it away. With `window_count`
+        it comes from COUNT(*) OVER() on the page query instead: one statement, but it sorts every matching row.
+        """
+        query = self._filtered_query(db, **filters).order_by(*self._order_by(db, filters.get("search")))
+        if not with_count:
+            return query.offset(skip).limit(limit).all(), None
         
-        return query.count()
+        if window_count:
+            rows = query.add_columns(func.count().over().label("total")).offset(skip).limit(limit).all()
+            events = [row[0] for row in rows]
+            total = rows[0][1] if rows else None
+        else:
+            events = query.offset(skip).limit(limit).all()
+            # A short page with rows (or an empty first page) is the last one
+            total = skip + len(events) if len(events) < limit and (events or not skip) else None
+        if total is None:
+            total = query.order_by(None).count()
+        return events, total
+    
+    def get_page_by_cursor(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        with_total: bool = False,
+        **filters
+    ) -> dict:
+        """Seek on (event_date, event_id) instead of OFFSET"""
+        return keyset_paginate(
+            self._filtered_query(db, **filters),
+            [Event.event_date, Event.event_id],
+            cursor,
+            limit,
+            with_total=with_total
+        )
 
 event = CRUDEvent(Event)
\ No newline at end of file
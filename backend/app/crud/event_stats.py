@@ -0,0 +1,65 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.event_stats import EventSalesStats
+from app.models.order import Order, PaymentStatus
+from app.models.ticket import Ticket, TicketStatus
+
+TICKET_COUNTERS = {
+    TicketStatus.ACTIVE: "tickets_active",
+    TicketStatus.USED: "tickets_used",
+    TicketStatus.CANCELLED: "tickets_cancelled",
+    TicketStatus.REFUNDED: "tickets_refunded",
+}
+
+def revenue_counter(payment_status) -> Optional[str]:
+    """Stats column for an order's payment status, or None for unknown values"""
+    value = payment_status.value if isinstance(payment_status, PaymentStatus) else str(payment_status or "").lower()
+    try:
+        return f"revenue_{PaymentStatus(value).value}"
+    except ValueError:
+        return None
+
+def ticket_counter(ticket_status) -> Optional[str]:
+    if not isinstance(ticket_status, TicketStatus):
+        try:
+            ticket_status = TicketStatus(str(ticket_status).lower())
+        except ValueError:
+            return None
+    return TICKET_COUNTERS.get(ticket_status)
+
+class CRUDEventSalesStats(CRUDBase[EventSalesStats, dict, dict]):
+    COUNTERS = list(TICKET_COUNTERS.values()) + [f"revenue_{status.value}" for status in PaymentStatus]
+    
+    def increment(self, db: Session, *, event_id: int, deltas: Dict[str, Any]) -> None:
+        """Add to an event's counters, creating its row on first use"""
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas:
+            return
+        self.upsert_increment(db, keys={"event_id": event_id}, deltas=deltas)
+    
+    def recompute(self, db: Session, *, event_id: Optional[int] = None) -> Dict[int, dict]:
+        """Counters rebuilt from tickets and orders, per event"""
+        counters = defaultdict(lambda: {name: 0 for name in self.COUNTERS})
+        
+        tickets = db.query(Ticket.event_id, Ticket.status, func.count(Ticket.ticket_id))
+        if event_id is not None:
+            tickets = tickets.filter(Ticket.event_id == event_id)
+        for ticket_event_id, ticket_status, count in tickets.group_by(Ticket.event_id, Ticket.status):
+            name = ticket_counter(ticket_status)
+            if name:
+                counters[ticket_event_id][name] += count
+        
+        revenue = db.query(Order.event_id, Order.payment_status, func.sum(Order.total_amount))
+        if event_id is not None:
+            revenue = revenue.filter(Order.event_id == event_id)
+        for order_event_id, payment_status, total in revenue.group_by(Order.event_id, Order.payment_status):
+            name = revenue_counter(payment_status)
+            if name:
+                counters[order_event_id][name] += Decimal(total or 0)
+        return dict(counters)
+
+event_stats = CRUDEventSalesStats(EventSalesStats)
@@ -0,0 +1,112 @@
+import uuid
+from typing import Optional
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+
+class CRUDIdempotencyKey(CRUDBase[IdempotencyKey, dict, dict]):
+    def _filter(self, db: Session, scope: str, key: str):
+        return db.query(IdempotencyKey).filter(
+            IdempotencyKey.scope == scope,
+            IdempotencyKey.idempotency_key == key
+        )
+    
+    def get_by_key(self, db: Session, *, scope: str, key: str) -> Optional[IdempotencyKey]:
+        return self._filter(db, scope, key).populate_existing().first()
+    
+    def claim(
+        self,
+        db: Session,
+        *,
+        scope: str,
+        key: str,
+        request_hash: str,
+        ttl_seconds: int,
+        lease_seconds: int
+    ) -> Optional[str]:
+        """Insert an in-progress record; returns its lease token, or None if the key is already in use"""
+        now = datetime.utcnow()
+        lease_token = uuid.uuid4().hex
+        # An expired record is dead even if the sweeper has not removed it yet
+        self._filter(db, scope, key).filter(
+            IdempotencyKey.expires_at <= now
+        ).delete(synchronize_session=False)
+        statement = insert(IdempotencyKey).values(
+            scope=scope,
+            idempotency_key=key,
+            request_hash=request_hash,
+            status=IdempotencyStatus.IN_PROGRESS,
+            locked_until=now + timedelta(seconds=lease_seconds),
+            lease_token=lease_token,
+            expires_at=now + timedelta(seconds=ttl_seconds)
+        )
+        try:
+            db.execute(statement)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return None
+        return lease_token
+    
+    def take_over(self, db: Session, *, record: IdempotencyKey, lease_seconds: int) -> Optional[str]:
+        """Re-claim an in-progress record whose lease has lapsed; only one caller wins and gets a new lease token"""
+        lease_token = uuid.uuid4().hex
+        taken = self._filter(db, record.scope, record.idempotency_key).filter(
+            IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS,
+            IdempotencyKey.lease_token == record.lease_token
+        ).update(
+            {
+                IdempotencyKey.locked_until: datetime.utcnow() + timedelta(seconds=lease_seconds),
+                IdempotencyKey.lease_token: lease_token
+            },
+            synchronize_session=False
+        )
+        db.commit()
+        return lease_token if taken == 1 else None
+    
+    def complete(
+        self,
+        db: Session,
+        *,
+        scope: str,
+        key: str,
+        lease_token: str,
+        response_status: int,
+        response_body: str,
+        commit: bool = True
+    ) -> bool:
+        """Store the response; False if the lease was taken over, in which case nothing is written"""
+        completed = self._filter(db, scope, key).filter(
+            IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS,
+            IdempotencyKey.lease_token == lease_token
+        ).update(
+            {
+                IdempotencyKey.status: IdempotencyStatus.COMPLETED,
+                IdempotencyKey.response_status: response_status,
+                IdempotencyKey.response_body: response_body
+            },
+            synchronize_session=False
+        )
+        if commit:
+            db.commit()
+        return completed == 1
+    
+    def release(self, db: Session, *, scope: str, key: str, lease_token: str) -> None:
+        """Drop an in-progress record so the request can be retried, unless another run has taken it over"""
+        self._filter(db, scope, key).filter(
+            IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS,
+            IdempotencyKey.lease_token == lease_token
+        ).delete(synchronize_session=False)
+        db.commit()
+    
+    def delete_expired(self, db: Session) -> int:
+        deleted = db.query(IdempotencyKey).filter(
+            IdempotencyKey.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+idempotency_key = CRUDIdempotencyKey(IdempotencyKey)
@@ -1,29 +1,44 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session, selectinload
 from datetime import datetime
-import random
-import string
 from app.crud.base import CRUDBase
 from app.models.order import Order, OrderStatus, PaymentStatus
 from app.schemas.order import OrderCreate
+from app.services.sales_stats import SalesStatsService
+from app.utils.pagination import keyset_paginate
 
 class CRUDOrder(CRUDBase[Order, OrderCreate, dict]):
-    def generate_order_number(self) -> str:
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        return f"ORD-{timestamp}-{random_str}"
+    def query_with_items(self, db: Session) -> Query:
+        """Order query that loads order_items for all rows in one extra SELECT instead of one per order"""
+        return db.query(Order).options(selectinload(Order.order_items))
+    
+    def get_with_items(self, db: Session, *, order_id: int) -> Optional[Order]:
+        return self.query_with_items(db).filter(Order.order_id == order_id).first()
     
     def get_by_user(self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100) -> List[Order]:
-        return db.query(Order).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+        return self.query_with_items(db).filter(Order.user_id == user_id).order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    
+    def get_by_user_cursor(
+        self, db: Session, *, user_id: int, cursor: Optional[str] = None, limit: int = 20, with_total: bool = False
+    ) -> dict:
+        """Seek on (created_at, order_id) instead of OFFSET"""
+        return keyset_paginate(
+            self.query_with_items(db).filter(Order.user_id == user_id),
+            [Order.created_at, Order.order_id],
+            cursor,
+            limit,
+            with_total=with_total
+        )
     
     def get_by_order_number(self, db: Session, *, order_number: str) -> Optional[Order]:
-        return db.query(Order).filter(Order.order_number == order_number).first()
+        return self.query_with_items(db).filter(Order.order_number == order_number).first()
     
     def update_payment_status(
         self, db: Session, *, order_id: int, status: PaymentStatus, transaction_id: Optional[str] = None
     ) -> Optional[Order]:
         order = db.query(Order).filter(Order.order_id == order_id).first()
         if order:
+            old_payment_status = order.payment_status
             status_val = status.value if isinstance(status, PaymentStatus) else str(status).lower()
             order.payment_status = status_val
             if transaction_id:
@@ -31,6 +46,7 @@ class CRUDOrder(CRUDBase[Order, OrderCreate, dict]):
             if status_val.lower() == PaymentStatus.COMPLETED.value.lower():
                 order.paid_at = datetime.utcnow()
                 order.order_status = OrderStatus.CONFIRMED.value
+            SalesStatsService.on_payment_status_changed(db, order, old_payment_status)
             db.commit()
             db.refresh(order)
         return order
@@ -0,0 +1,37 @@
+from datetime import date
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.sales_rollup import DailySalesRollup
+
+class CRUDDailySalesRollup(CRUDBase[DailySalesRollup, dict, dict]):
+    def increment(self, db: Session, *, sales_date: date, event_id: int, **deltas) -> None:
+        """Add to one day's counters for an event, creating the row on first use"""
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas:
+            return
+        self.upsert_increment(
+            db,
+            keys={"sales_date": sales_date, "event_id": event_id},
+            deltas=deltas
+        )
+    
+    def get_dashboard_totals(self, db: Session, *, today: date, month_start: date) -> dict:
+        """All-time, today's and this month's figures in one pass over the rollup rows"""
+        rollup = DailySalesRollup
+        row = db.query(
+            func.coalesce(func.sum(rollup.orders_count), 0),
+            func.coalesce(func.sum(rollup.revenue), 0),
+            func.coalesce(func.sum(rollup.tickets_count), 0),
+            func.coalesce(func.sum(case((rollup.sales_date == today, rollup.orders_count), else_=0)), 0),
+            func.coalesce(func.sum(case((rollup.sales_date >= month_start, rollup.revenue), else_=0)), 0)
+        ).one()
+        return {
+            "total_orders": int(row[0]),
+            "total_revenue": float(row[1]),
+            "total_tickets": int(row[2]),
+            "orders_today": int(row[3]),
+            "revenue_this_month": float(row[4])
+        }
+
+sales_rollup = CRUDDailySalesRollup(DailySalesRollup)
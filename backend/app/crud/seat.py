@@ -1,9 +1,15 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import Integer, or_, and_, case, cast, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 from app.models.seat import Seat, SeatStatus
 from app.schemas.seat import SeatCreate, SeatUpdate
 
+# Mersenne prime 2**31 - 1: row hashes stay below it, so their squares still fit in a signed BIGINT
+_HASH_MODULUS = 2147483647
+
 class CRUDSeat(CRUDBase[Seat, SeatCreate, SeatUpdate]):
     def get_by_event(self, db: Session, *, event_id: int) -> List[Seat]:
         return db.query(Seat).filter(Seat.event_id == event_id).all()
@@ -20,12 +26,42 @@ class CRUDSeat(CRUDBase[Seat, SeatCreate, SeatUpdate]):
             Seat.section == section
         ).all()
     
+    def get_version(
+        self,
+        db: Session,
+        *,
+        event_id: int,
+        section: Optional[str] = None
+    ) -> Tuple[int, Optional[datetime], Tuple[int, int]]:
+        """(count, latest updated_at, checksum) for an event's seats, computed in one aggregate"""
+        state = case(
+            (Seat.status == SeatStatus.RESERVED, 1),
+            (Seat.status == SeatStatus.BOOKED, 2),
+            (Seat.status == SeatStatus.BLOCKED, 3),
+            else_=0
+        )
+        # updated_at only has second precision, so changes within a second are caught by hashing each row's
+        # (seat, status, price) and summing the hashes and their squares: seats swapping states, or several
+        # changes cancelling out in a plain sum, still change the pair
+        row_hash = (
+            (Seat.seat_id * 4 + state) * 2654435761 + cast(Seat.price * 100, Integer)
+        ) % _HASH_MODULUS
+        query = db.query(
+            func.count(Seat.seat_id),
+            func.max(Seat.updated_at),
+            func.coalesce(func.sum(row_hash), 0),
+            func.coalesce(func.sum(row_hash * row_hash % _HASH_MODULUS), 0)
+        ).filter(Seat.event_id == event_id)
+        if section:
+            query = query.filter(Seat.section == section)
+        count, last_modified, hash_sum, square_sum = query.one()
+        return count, last_modified, (int(hash_sum), int(square_sum))
+    
     def book_seat(self, db: Session, *, seat_id: int, order_id: int) -> Optional[Seat]:
         seat = db.query(Seat).filter(Seat.seat_id == seat_id).first()
         if seat and seat.status == SeatStatus.AVAILABLE:
             seat.status = SeatStatus.BOOKED
             seat.order_id = order_id
-            from datetime import datetime
             seat.booked_at = datetime.utcnow()
             db.commit()
             db.refresh(seat)
@@ -34,8 +70,85 @@ class CRUDSeat(CRUDBase[Seat, SeatCreate, SeatUpdate]):
     
     def bulk_create(self, db: Session, *, seats_data: List[SeatCreate]) -> List[Seat]:
         seats = [Seat(**seat_data.dict()) for seat_data in seats_data]
-        db.bulk_save_objects(seats)
+        db.add_all(seats)
+        db.flush()
+        seat_ids = [seat.seat_id for seat in seats]
         db.commit()
-        return seats
+        # Reload in one query rather than refreshing each expired seat
+        return db.query(Seat).filter(Seat.seat_id.in_(seat_ids)).order_by(Seat.seat_id).all()
+    
+    def count_by_event(self, db: Session, *, event_id: int) -> int:
+        return db.query(func.count(Seat.seat_id)).filter(Seat.event_id == event_id).scalar()
+    
+    def insert_missing(self, db: Session, *, rows: List[dict]) -> None:
+        """Insert seat rows in one executemany, skipping seats that already exist"""
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect == "mysql":
+            # A no-op update skips duplicates without INSERT IGNORE, which would also turn errors such as
+            # truncated values into warnings
+            stmt = mysql.insert(Seat.__table__)
+            stmt = stmt.on_duplicate_key_update(seat_id=Seat.__table__.c.seat_id)
+        elif dialect in ("sqlite", "postgresql"):
+            stmt = (sqlite.insert if dialect == "sqlite" else postgresql.insert)(Seat.__table__).on_conflict_do_nothing(
+                index_elements=["event_id", "section", "row_label", "seat_number"]
+            )
+        else:
+            raise NotImplementedError(f"insert_missing is not supported on {dialect}")
+        db.execute(stmt, rows)
+    
+    def hold(
+        self, db: Session, *, event_id: int, seat_ids: Iterable[int], holder_id: str, expires_at: datetime
+    ) -> int:
+        """Move seats to RESERVED for a holder; returns how many seats were taken"""
+        now = datetime.utcnow()
+        return db.query(Seat).filter(
+            Seat.event_id == event_id,
+            Seat.seat_id.in_(list(seat_ids)),
+            or_(
+                Seat.status == SeatStatus.AVAILABLE,
+                and_(
+                    Seat.status == SeatStatus.RESERVED,
+                    or_(Seat.held_by == holder_id, Seat.hold_expires_at < now)
+                )
+            )
+        ).update(
+            {
+                Seat.status: SeatStatus.RESERVED,
+                Seat.held_by: holder_id,
+                Seat.hold_expires_at: expires_at
+            },
+            synchronize_session=False
+        )
+    
+    def release_hold(self, db: Session, *, event_id: int, holder_id: str) -> int:
+        """Give a holder's reserved seats back"""
+        return db.query(Seat).filter(
+            Seat.event_id == event_id,
+            Seat.status == SeatStatus.RESERVED,
+            Seat.held_by == holder_id
+        ).update(
+            {
+                Seat.status: SeatStatus.AVAILABLE,
+                Seat.held_by: None,
+                Seat.hold_expires_at: None
+            },
+            synchronize_session=False
+        )
+    
+    def expire_holds(self, db: Session, *, now: Optional[datetime] = None) -> int:
+        """Release every hold past its expiry with one bulk UPDATE on idx_hold_expiry"""
+        return db.query(Seat).filter(
+            Seat.status == SeatStatus.RESERVED,
+            Seat.hold_expires_at < (now or datetime.utcnow())
+        ).update(
+            {
+                Seat.status: SeatStatus.AVAILABLE,
+                Seat.held_by: None,
+                Seat.hold_expires_at: None
+            },
+            synchronize_session=False
+        )
 
 seat = CRUDSeat(Seat)
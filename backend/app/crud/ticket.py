@@ -1,18 +1,13 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import case
 from sqlalchemy.orm import Session
 from datetime import datetime
-import random
-import string
 from app.crud.base import CRUDBase
 from app.models.ticket import Ticket, TicketStatus
 from app.schemas.ticket import TicketResponse
+from app.services.sales_stats import SalesStatsService
 
 class CRUDTicket(CRUDBase[Ticket, dict, dict]):
-    def generate_ticket_code(self) -> str:
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-        return f"TKT-{timestamp}-{random_str}"
-    
     def get_by_code(self, db: Session, *, ticket_code: str) -> Optional[Ticket]:
         return db.query(Ticket).filter(Ticket.ticket_code == ticket_code).first()
     
@@ -25,15 +20,67 @@ class CRUDTicket(CRUDBase[Ticket, dict, dict]):
     def get_by_event(self, db: Session, *, event_id: int) -> List[Ticket]:
         return db.query(Ticket).filter(Ticket.event_id == event_id).all()
     
-    def check_in(self, db: Session, *, ticket_code: str) -> Optional[Ticket]:
+    def check_in(
+        self,
+        db: Session,
+        *,
+        ticket_code: str,
+        event_id: Optional[int] = None,
+        checked_in_at: Optional[datetime] = None
+    ) -> Optional[Ticket]:
+        """Admit an active ticket with one conditional UPDATE, so a concurrent double scan admits only once"""
+        query = db.query(Ticket).filter(
+            Ticket.ticket_code == ticket_code,
+            Ticket.status == TicketStatus.ACTIVE
+        )
+        if event_id is not None:
+            query = query.filter(Ticket.event_id == event_id)
+        admitted = query.update(
+            {Ticket.status: TicketStatus.USED, Ticket.checked_in_at: checked_in_at or datetime.utcnow()},
+            synchronize_session=False
+        )
+        if not admitted:
+            db.rollback()
+            return None
+        
         ticket = self.get_by_code(db, ticket_code=ticket_code)
-        if ticket and ticket.status == TicketStatus.ACTIVE:
-            ticket.status = TicketStatus.USED
-            ticket.checked_in_at = datetime.utcnow()
-            db.commit()
-            db.refresh(ticket)
-            return ticket
-        return None
+        SalesStatsService.on_tickets_checked_in(db, ticket.event_id)
+        db.commit()
+        db.refresh(ticket)
+        return ticket
+    
+    def get_by_codes(self, db: Session, *, ticket_codes: Iterable[str], for_update: bool = False) -> List[Ticket]:
+        query = db.query(Ticket).filter(Ticket.ticket_code.in_(list(ticket_codes)))
+        if for_update:
+            query = query.with_for_update()
+        return query.all()
+    
+    def check_in_many(self, db: Session, *, checkins: Dict[int, datetime]) -> int:
+        """Admit active tickets {ticket_id: checked_in_at} in one UPDATE; returns the number admitted"""
+        if not checkins:
+            return 0
+        return db.query(Ticket).filter(
+            Ticket.ticket_id.in_(list(checkins)),
+            Ticket.status == TicketStatus.ACTIVE
+        ).update(
+            {
+                Ticket.status: TicketStatus.USED,
+                Ticket.checked_in_at: case(checkins, value=Ticket.ticket_id)
+            },
+            synchronize_session=False
+        )
+    
+    def backdate_check_ins(self, db: Session, *, checkins: Dict[int, datetime]) -> int:
+        """Move checked_in_at of used tickets back to earlier scan times, in one UPDATE"""
+        if not checkins:
+            return 0
+        return db.query(Ticket).filter(
+            Ticket.ticket_id.in_(list(checkins)),
+            Ticket.status == TicketStatus.USED
+        ).update(
+            {Ticket.checked_in_at: case(checkins, value=Ticket.ticket_id)},
+            synchronize_session=False
+        )
     
     def cancel_tickets_by_order(self, db: Session, *, order_id: int) -> int:
         tickets = self.get_by_order(db, order_id=order_id)
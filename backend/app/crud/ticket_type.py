@@ -1,10 +1,64 @@
-from typing import List
+from typing import Any, Dict, List, Optional, Union
+from datetime import datetime
+from sqlalchemy import and_, case, func, literal, or_, select
 from sqlalchemy.orm import Session
+from app.core.availability import availability
+from app.core.cache import invalidate_ticket_types
 from app.crud.base import CRUDBase
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
 from app.models.ticket_type import TicketType, TicketTypeStatus
 from app.schemas.ticket_type import TicketTypeCreate, TicketTypeUpdate
 
+def _status_literal(value: TicketTypeStatus):
+    # Bind with the column's Enum type so CASE stores what the ORM stores
+    return literal(value, TicketType.__table__.c.status.type)
+
 class CRUDTicketType(CRUDBase[TicketType, TicketTypeCreate, TicketTypeUpdate]):
+    def create(self, db: Session, *, obj_in: TicketTypeCreate) -> TicketType:
+        db_obj = super().create(db, obj_in=obj_in)
+        invalidate_ticket_types(db_obj.event_id)
+        return db_obj
+    
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: TicketType,
+        obj_in: Union[TicketTypeUpdate, Dict[str, Any]]
+    ) -> TicketType:
+        fields = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        if fields.get("quantity_available") is not None and fields.get("status") is None:
+            # New capacity reopens a sold-out tier (or closes one that is now full), against the live quantity_sold
+            db.query(TicketType).filter(
+                TicketType.ticket_type_id == db_obj.ticket_type_id,
+                TicketType.status.in_([TicketTypeStatus.ACTIVE, TicketTypeStatus.SOLD_OUT])
+            ).update(
+                {
+                    TicketType.status: case(
+                        (
+                            TicketType.quantity_sold >= TicketType.quantity_available,
+                            _status_literal(TicketTypeStatus.SOLD_OUT)
+                        ),
+                        else_=_status_literal(TicketTypeStatus.ACTIVE)
+                    )
+                },
+                synchronize_session=False
+            )
+            db.commit()
+            db.refresh(db_obj)
+        invalidate_ticket_types(db_obj.event_id)
+        availability.invalidate([db_obj.ticket_type_id])
+        return db_obj
+    
+    def delete(self, db: Session, *, id: int) -> Optional[TicketType]:
+        obj = super().delete(db, id=id)
+        if obj:
+            invalidate_ticket_types(obj.event_id)
+            availability.invalidate([obj.ticket_type_id])
+        return obj
+    
     def get_by_event(self, db: Session, *, event_id: int) -> List[TicketType]:
         return db.query(TicketType).filter(TicketType.event_id == event_id).all()
     
@@ -23,6 +77,112 @@ class CRUDTicketType(CRUDBase[TicketType, TicketTypeCreate, TicketTypeUpdate]):
                 ticket_type.status = TicketTypeStatus.SOLD_OUT
             db.commit()
             db.refresh(ticket_type)
+            invalidate_ticket_types(ticket_type.event_id)
         return ticket_type
-
+    
+    def purchased_by_user(self, user_id: int):
+        """Tickets of the tier in the user's orders that are not cancelled, correlated to the row being updated"""
+        return select(func.coalesce(func.sum(OrderItem.quantity), 0)).join(
+            Order, Order.order_id == OrderItem.order_id
+        ).where(
+            OrderItem.ticket_type_id == TicketType.ticket_type_id,
+            Order.user_id == user_id,
+            Order.order_status != OrderStatus.CANCELLED
+        ).scalar_subquery()
+    
+    def reserve(
+        self,
+        db: Session,
+        *,
+        ticket_type_id: int,
+        quantity: int,
+        now: Optional[datetime] = None,
+        user_id: Optional[int] = None
+    ) -> bool:
+        """Atomically take `quantity` tickets from a tier if every sales rule allows it; False otherwise.
+        
+        The tier must be active and inside its sales window, `quantity` within its per-order limits
+        and, when `user_id` is given, the user's total within max_per_user. The tier flips to SOLD_OUT
+        in the same statement when the last ticket goes.
+        """
+        now = now or datetime.utcnow()
+        conditions = [
+            TicketType.ticket_type_id == ticket_type_id,
+            TicketType.status == TicketTypeStatus.ACTIVE,
+            or_(TicketType.sale_start_date.is_(None), TicketType.sale_start_date <= now),
+            or_(TicketType.sale_end_date.is_(None), TicketType.sale_end_date > now),
+            func.coalesce(TicketType.min_purchase, 1) <= quantity,
+            or_(TicketType.max_purchase.is_(None), TicketType.max_purchase >= quantity),
+            TicketType.quantity_sold + quantity <= TicketType.quantity_available
+        ]
+        if user_id is not None:
+            # The tier's row lock serializes a user's concurrent orders; MySQL evaluates this with locking reads
+            conditions.append(or_(
+                TicketType.max_per_user.is_(None),
+                self.purchased_by_user(user_id) + quantity <= TicketType.max_per_user
+            ))
+        # status is assigned first so it sees the old quantity_sold on every backend (MySQL assigns left to right)
+        reserved = db.query(TicketType).filter(*conditions).update(
+            {
+                TicketType.status: case(
+                    (TicketType.quantity_sold + quantity >= TicketType.quantity_available, _status_literal(TicketTypeStatus.SOLD_OUT)),
+                    else_=TicketType.status
+                ),
+                TicketType.quantity_sold: TicketType.quantity_sold + quantity
+            },
+            synchronize_session=False
+        )
+        return reserved == 1
+    
+    def release(self, db: Session, *, ticket_type_id: int, quantity: int) -> bool:
+        """Atomically give `quantity` tickets back to a tier, reopening it if it was sold out"""
+        released = db.query(TicketType).filter(
+            TicketType.ticket_type_id == ticket_type_id,
+            TicketType.quantity_sold >= quantity
+        ).update(
+            {
+                TicketType.status: case(
+                    (
+                        and_(
+                            TicketType.status == TicketTypeStatus.SOLD_OUT,
+                            TicketType.quantity_sold - quantity < TicketType.quantity_available
+                        ),
+                        _status_literal(TicketTypeStatus.ACTIVE)
+                    ),
+                    else_=TicketType.status
+                ),
+                TicketType.quantity_sold: TicketType.quantity_sold - quantity
+            },
+            synchronize_session=False
+        )
+        return released == 1
+    
+    def rejection_reason(
+        self,
+        db: Session,
+        *,
+        ticket_type: TicketType,
+        quantity: int,
+        now: datetime,
+        user_id: Optional[int] = None
+    ) -> str:
+        """Why `reserve` refused a tier; only called after a refusal, so the fast path pays nothing"""
+        db.refresh(ticket_type)
+        name = ticket_type.name
+        if ticket_type.status == TicketTypeStatus.INACTIVE:
+            return f"{name} is not on sale"
+        if ticket_type.sale_start_date and ticket_type.sale_start_date > now:
+            return f"Sales for {name} have not started"
+        if ticket_type.sale_end_date and ticket_type.sale_end_date <= now:
+            return f"Sales for {name} have ended"
+        if quantity < (ticket_type.min_purchase or 1):
+            return f"At least {ticket_type.min_purchase} tickets must be bought for {name}"
+        if ticket_type.max_purchase and quantity > ticket_type.max_purchase:
+            return f"At most {ticket_type.max_purchase} tickets can be bought for {name} per order"
+        if ticket_type.quantity_sold + quantity > ticket_type.quantity_available:
+            return f"Not enough tickets available for {name}"
+        if user_id is not None and ticket_type.max_per_user is not None:
+            return f"{name} is limited to {ticket_type.max_per_user} tickets per customer"
+        return f"Not enough tickets available for {name}"
+    
 ticket_type = CRUDTicketType(TicketType)
\ No newline at end of file
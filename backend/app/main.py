@@ -1,19 +1,52 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.availability import run_reconciler
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, async_engine, Base
+from app.core.metrics import metrics
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.read_after_write import ReadAfterWriteMiddleware
 from app.api.v1.api import api_router
+from app.services.code_node import CodeNodeService
+from app.services.idempotency import IdempotencyService
+from app.services.search import EventSearch
+from app.services.seat_hold import SeatHoldService
+from app.utils.ticket_code import code_generator
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+EventSearch.ensure_index(engine)
+# Each worker leases its own ticket code node id (again after fork)
+code_generator.use_lease(CodeNodeService.lease, settings.CODE_NODE_LEASE_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background jobs
+    tasks = [
+        asyncio.create_task(SeatHoldService.run_sweeper()),
+        asyncio.create_task(IdempotencyService.run_sweeper()),
+        asyncio.create_task(run_reconciler()),
+        asyncio.create_task(CodeNodeService.run_renewer()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description="Event Ticketing System API",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
+if settings.RATE_LIMIT_ENABLED:
+    # Added before CORS so 429 responses still carry CORS headers
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware - Configure for development
 # Note: allow_credentials=True requires explicit origins, not "*"
 # Allow all origins for development (use specific origins in production)
@@ -26,6 +59,10 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+if settings.SQLALCHEMY_REPLICA_URIS:
+    # Keep a client's reads on the primary right after its own writes
+    app.add_middleware(ReadAfterWriteMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -41,6 +78,10 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
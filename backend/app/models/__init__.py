@@ -5,6 +5,10 @@ from app.models.seat import Seat
 from app.models.order import Order
 from app.models.order_item import OrderItem
 from app.models.ticket import Ticket
+from app.models.sales_rollup import DailySalesRollup
+from app.models.event_stats import EventSalesStats
+from app.models.idempotency_key import IdempotencyKey
+from app.models.code_node_lease import CodeNodeLease
 
 __all__ = [
     "User",
@@ -13,5 +17,9 @@ __all__ = [
     "Seat",
     "Order",
     "OrderItem",
-    "Ticket"
+    "Ticket",
+    "DailySalesRollup",
+    "EventSalesStats",
+    "IdempotencyKey",
+    "CodeNodeLease"
 ]
\ No newline at end of file
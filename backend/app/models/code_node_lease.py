@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, TIMESTAMP
+from app.core.database import Base
+
+class CodeNodeLease(Base):
+    """Ticket code node id held by one running process until expires_at"""
+    __tablename__ = "code_node_leases"
+    
+    node_id = Column(Integer, primary_key=True, autoincrement=False)
+    # Random per process; only the holder can renew its lease
+    holder = Column(String(32), nullable=False)
+    expires_at = Column(TIMESTAMP, nullable=False)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Date, Time, Enum, Boolean, TIMESTAMP, JSON
+from sqlalchemy import Column, Integer, String, Text, Date, Time, Enum, Boolean, TIMESTAMP, JSON, Index
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -48,6 +48,18 @@ class Event(Base):
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
     updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
     
+    __table_args__ = (
+        # MySQL-only FULLTEXT key used by EventSearch; SQLite uses the events_fts shadow table instead
+        Index('idx_search', 'title', 'description', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+    
+    @validates("category", "status")
+    def normalize_enum_columns(self, key, value):
+        """Store category/status in canonical lowercase so filters can use plain equality"""
+        if isinstance(value, enum.Enum):
+            return value.value
+        return value.lower() if isinstance(value, str) else value
+    
     @hybrid_property
     def category_enum(self):
         """Get category as EventCategory enum"""
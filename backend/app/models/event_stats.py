@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, DECIMAL, TIMESTAMP, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class EventSalesStats(Base):
+    """Running per-event ticket and revenue counters, updated in the same transaction as the change"""
+    __tablename__ = "event_sales_stats"
+    
+    event_id = Column(Integer, ForeignKey("events.event_id", ondelete="CASCADE"), primary_key=True)
+    # Tickets by status
+    tickets_active = Column(Integer, nullable=False, default=0, server_default="0")
+    tickets_used = Column(Integer, nullable=False, default=0, server_default="0")
+    tickets_cancelled = Column(Integer, nullable=False, default=0, server_default="0")
+    tickets_refunded = Column(Integer, nullable=False, default=0, server_default="0")
+    # Order totals by payment status
+    revenue_pending = Column(DECIMAL(12, 2), nullable=False, default=0, server_default="0")
+    revenue_completed = Column(DECIMAL(12, 2), nullable=False, default=0, server_default="0")
+    revenue_failed = Column(DECIMAL(12, 2), nullable=False, default=0, server_default="0")
+    revenue_refunded = Column(DECIMAL(12, 2), nullable=False, default=0, server_default="0")
+    revenue_cancelled = Column(DECIMAL(12, 2), nullable=False, default=0, server_default="0")
+    updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, Enum, TIMESTAMP, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class IdempotencyStatus(str, enum.Enum):
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+class IdempotencyKey(Base):
+    """Client-supplied Idempotency-Key and the stored response of the request that first used it"""
+    __tablename__ = "idempotency_keys"
+    
+    scope = Column(String(50), primary_key=True)
+    idempotency_key = Column(String(255), primary_key=True)
+    # SHA-256 of the request, so a key reused with a different payload is rejected
+    request_hash = Column(String(64), nullable=False)
+    status = Column(Enum(IdempotencyStatus), nullable=False, default=IdempotencyStatus.IN_PROGRESS)
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    # In-flight lease: past this time a crashed execution may be taken over
+    locked_until = Column(TIMESTAMP, nullable=False)
+    # Changes with every claim or take-over; only the current holder can complete or release the record
+    lease_token = Column(String(32), nullable=False)
+    expires_at = Column(TIMESTAMP, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    
+    __table_args__ = (
+        Index("idx_expires_at", "expires_at"),
+    )
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, Enum, TIMESTAMP, ForeignKey, Text, CheckConstraint
+from sqlalchemy import Column, Integer, String, DECIMAL, Enum, TIMESTAMP, ForeignKey, Text, CheckConstraint, Index
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -44,6 +44,13 @@ class Order(Base):
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp(), index=True)
     updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
     
+    @validates("payment_method", "payment_status", "order_status")
+    def normalize_enum_columns(self, key, value):
+        """Store payment/order enums in canonical lowercase so filters can use plain equality"""
+        if isinstance(value, enum.Enum):
+            return value.value
+        return value.lower() if isinstance(value, str) else value
+    
     @hybrid_property
     def payment_method_enum(self):
         """Get payment_method as PaymentMethod enum"""
@@ -113,6 +120,7 @@ class Order(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint('total_amount >= 0', name='chk_total_amount'),
+        Index('idx_user_created', 'user_id', 'created_at'),
     )
     
     # Relationships
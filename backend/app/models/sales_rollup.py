@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Date, DECIMAL, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class DailySalesRollup(Base):
+    """Per event and day sales counters, incremented as orders are created, paid and cancelled"""
+    __tablename__ = "daily_sales_rollups"
+    
+    # Day the order was placed (orders.created_at)
+    sales_date = Column(Date, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.event_id", ondelete="CASCADE"), primary_key=True)
+    orders_count = Column(Integer, nullable=False, default=0, server_default="0")
+    cancelled_orders = Column(Integer, nullable=False, default=0, server_default="0")
+    # Active and used tickets
+    tickets_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Completed payments
+    revenue = Column(DECIMAL(12, 2), nullable=False, default=0, server_default="0")
+    updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
+    
+    __table_args__ = (
+        Index('idx_event_date', 'event_id', 'sales_date'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, Enum, TIMESTAMP, ForeignKey, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DECIMAL, Enum, TIMESTAMP, ForeignKey, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -22,6 +22,8 @@ class Seat(Base):
     status = Column(Enum(SeatStatus), default=SeatStatus.AVAILABLE)
     order_id = Column(Integer, nullable=True)
     booked_at = Column(TIMESTAMP, nullable=True)
+    held_by = Column(String(64), nullable=True)
+    hold_expires_at = Column(TIMESTAMP, nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
     updated_at = Column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
     
@@ -29,6 +31,7 @@ class Seat(Base):
     __table_args__ = (
         UniqueConstraint('event_id', 'section', 'row_label', 'seat_number', name='unique_seat'),
         CheckConstraint('price >= 0', name='chk_seat_price'),
+        Index('idx_hold_expiry', 'status', 'hold_expires_at'),
     )
     
     # Relationships
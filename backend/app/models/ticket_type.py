@@ -21,6 +21,8 @@ class TicketType(Base):
     quantity_sold = Column(Integer, default=0)
     min_purchase = Column(Integer, default=1)
     max_purchase = Column(Integer, default=10)
+    # Tickets one customer may hold across all of their orders; NULL means no cap
+    max_per_user = Column(Integer, nullable=True)
     sale_start_date = Column(TIMESTAMP, nullable=True)
     sale_end_date = Column(TIMESTAMP, nullable=True)
     status = Column(Enum(TicketTypeStatus), default=TicketTypeStatus.ACTIVE, index=True)
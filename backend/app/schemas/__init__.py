@@ -8,22 +8,30 @@ from app.schemas.ticket_type import (
     TicketTypeBase, TicketTypeCreate, TicketTypeUpdate, TicketTypeResponse
 )
 from app.schemas.seat import (
-    SeatBase, SeatCreate, SeatUpdate, SeatResponse
+    SeatBase, SeatCreate, SeatUpdate, SeatResponse, SeatHoldCreate, SeatHoldResponse,
+    SeatMapRow, SeatMapResponse, SeatMapDeltaResponse, SeatRowRange, SeatPriceZone, SeatSectionLayout,
+    SeatMapLayout
 )
 from app.schemas.order import (
     OrderCreate, OrderResponse, OrderItemCreate, OrderItemResponse
 )
 from app.schemas.ticket import (
-    TicketResponse, TicketCheckIn
+    TicketResponse, TicketCheckIn, TicketScan, TicketCheckInBatch, TicketScanResult,
+    TicketCheckInBatchResponse
 )
+from app.schemas.queue import QueueStatus
 from app.schemas.token import Token, TokenData
 
 __all__ = [
     "UserBase", "UserCreate", "UserUpdate", "UserResponse", "UserLogin",
     "EventBase", "EventCreate", "EventUpdate", "EventResponse", "EventList",
     "TicketTypeBase", "TicketTypeCreate", "TicketTypeUpdate", "TicketTypeResponse",
-    "SeatBase", "SeatCreate", "SeatUpdate", "SeatResponse",
+    "SeatBase", "SeatCreate", "SeatUpdate", "SeatResponse", "SeatHoldCreate", "SeatHoldResponse",
+    "SeatMapRow", "SeatMapResponse", "SeatMapDeltaResponse", "SeatRowRange", "SeatPriceZone",
+    "SeatSectionLayout", "SeatMapLayout",
     "OrderCreate", "OrderResponse", "OrderItemCreate", "OrderItemResponse",
-    "TicketResponse", "TicketCheckIn",
+    "TicketResponse", "TicketCheckIn", "TicketScan", "TicketCheckInBatch", "TicketScanResult",
+    "TicketCheckInBatchResponse",
+    "QueueStatus",
     "Token", "TokenData"
 ]
\ No newline at end of file
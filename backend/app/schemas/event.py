@@ -38,6 +38,7 @@ class EventUpdate(BaseModel):
     event_end_time: Optional[time] = None
     image_url: Optional[str] = Field(None, max_length=500)
     banner_url: Optional[str] = Field(None, max_length=500)
+    seat_map_config: Optional[dict] = None
     status: Optional[EventStatus] = None
     is_featured: Optional[bool] = None
 
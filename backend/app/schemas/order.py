@@ -28,6 +28,7 @@ class OrderCreate(BaseModel):
     customer_phone: Optional[str] = Field(None, max_length=20)
     payment_method: PaymentMethod
     notes: Optional[str] = None
+    hold_id: Optional[str] = Field(None, max_length=64)
     items: List[OrderItemCreate]
 
     @model_validator(mode="after")
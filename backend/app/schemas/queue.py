@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class QueueStatus(BaseModel):
+    event_id: int
+    queue_token: str
+    # Buyers admitted before this one, and seconds until admission
+    position: int
+    eta_seconds: float
+    admitted: bool
+    admission_token: Optional[str] = None
+    # Admission must be used by this time, after which the buyer has to rejoin
+    expires_at: datetime
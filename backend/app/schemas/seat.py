@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, List, Optional, Union
 from datetime import datetime
 from decimal import Decimal
 from app.models.seat import SeatStatus
@@ -27,4 +27,88 @@ class SeatResponse(SeatBase):
     updated_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SeatHoldCreate(BaseModel):
+    seat_ids: List[int] = Field(..., min_length=1)
+    ttl_seconds: Optional[int] = Field(None, gt=0)
+
+class SeatHoldResponse(BaseModel):
+    holder_id: str
+    event_id: int
+    seat_ids: List[int]
+    expires_at: datetime
+
+class SeatMapRow(BaseModel):
+    section: str
+    row: str
+    seats: List[List[int]]
+
+class SeatMapResponse(BaseModel):
+    event_id: int
+    epoch: str
+    version: int
+    layout_id: int
+    seat_count: int
+    states: str
+    layout: Optional[List[SeatMapRow]] = None
+
+class SeatMapDeltaResponse(BaseModel):
+    event_id: int
+    epoch: str
+    version: int
+    layout_id: int
+    full: bool
+    changes: List[List[int]] = []
+    states: Optional[str] = None
+
+class SeatRowRange(BaseModel):
+    """Inclusive run of row labels: letters ("A" to "Z") or numbers ("1" to "40")"""
+    first: str = Field(..., min_length=1, max_length=10)
+    last: str = Field(..., min_length=1, max_length=10)
+
+    @model_validator(mode="after")
+    def validate_range(cls, data):
+        numeric = data.first.isdigit() and data.last.isdigit()
+        letters = len(data.first) == 1 and len(data.last) == 1 and data.first.isalpha() and data.last.isalpha()
+        if not numeric and not letters:
+            raise ValueError("Row ranges must be single letters or numbers; list other labels explicitly")
+        if (int(data.first) > int(data.last)) if numeric else (data.first > data.last):
+            raise ValueError("Row range must not end before it starts")
+        return data
+
+    def count(self) -> int:
+        """Number of rows in the range, without listing them"""
+        if self.first.isdigit():
+            return int(self.last) - int(self.first) + 1
+        return ord(self.last) - ord(self.first) + 1
+
+    def __contains__(self, label: str) -> bool:
+        if self.first.isdigit():
+            return label.isdigit() and str(int(label)) == label and int(self.first) <= int(label) <= int(self.last)
+        return len(label) == 1 and self.first <= label <= self.last
+
+    def labels(self) -> List[str]:
+        if self.first.isdigit():
+            return [str(n) for n in range(int(self.first), int(self.last) + 1)]
+        return [chr(c) for c in range(ord(self.first), ord(self.last) + 1)]
+
+RowLabel = Annotated[str, Field(min_length=1, max_length=10)]
+
+class SeatPriceZone(BaseModel):
+    rows: Union[SeatRowRange, List[RowLabel]]
+    price: Decimal = Field(..., ge=0, decimal_places=2)
+
+class SeatSectionLayout(BaseModel):
+    name: str = Field(..., min_length=1, max_length=50)
+    rows: Union[SeatRowRange, List[RowLabel]]
+    seats_per_row: int = Field(..., gt=0, le=1000)
+    first_seat: int = Field(1, gt=0)
+    price: Decimal = Field(..., ge=0, decimal_places=2)
+    # First matching zone sets the price of a row; other rows use the section price
+    price_zones: List[SeatPriceZone] = []
+
+class SeatMapLayout(BaseModel):
+    """Compact venue layout read from Event.seat_map_config"""
+    sections: List[SeatSectionLayout] = Field(..., min_length=1)
+
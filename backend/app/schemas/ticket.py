@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 from app.models.ticket import TicketStatus
@@ -22,4 +22,34 @@ class TicketResponse(BaseModel):
         from_attributes = True
 
 class TicketCheckIn(BaseModel):
-    ticket_code: str
\ No newline at end of file
+    ticket_code: str
+    # Scanners that send their event get unknown codes rejected from memory
+    event_id: Optional[int] = None
+    gate_id: Optional[str] = None
+
+class TicketScan(BaseModel):
+    ticket_code: str
+    scanned_at: datetime
+    gate_id: Optional[str] = None
+
+class TicketCheckInBatch(BaseModel):
+    """Scans queued by an offline scanner; each scan's gate_id defaults to the batch's"""
+    event_id: Optional[int] = None
+    gate_id: Optional[str] = None
+    scans: List[TicketScan] = Field(..., min_length=1, max_length=1000)
+
+class TicketScanResult(BaseModel):
+    ticket_code: str
+    scanned_at: datetime
+    gate_id: Optional[str]
+    result: str
+    # When the ticket counts as checked in after this batch
+    checked_in_at: Optional[datetime] = None
+
+class TicketCheckInBatchResponse(BaseModel):
+    admitted: int
+    duplicate: int
+    unknown: int
+    cancelled: int
+    results: List[TicketScanResult]
+
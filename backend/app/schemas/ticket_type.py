@@ -11,6 +11,7 @@ class TicketTypeBase(BaseModel):
     quantity_available: int = Field(..., gt=0)
     min_purchase: int = Field(1, ge=1)
     max_purchase: int = Field(10, ge=1)
+    max_per_user: Optional[int] = Field(None, ge=1)
     sale_start_date: Optional[datetime] = None
     sale_end_date: Optional[datetime] = None
 
@@ -24,6 +25,7 @@ class TicketTypeUpdate(BaseModel):
     quantity_available: Optional[int] = Field(None, gt=0)
     min_purchase: Optional[int] = Field(None, ge=1)
     max_purchase: Optional[int] = Field(None, ge=1)
+    max_per_user: Optional[int] = Field(None, ge=1)
     sale_start_date: Optional[datetime] = None
     sale_end_date: Optional[datetime] = None
     status: Optional[TicketTypeStatus] = None
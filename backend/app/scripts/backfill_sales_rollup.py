@@ -0,0 +1,62 @@
+"""Rebuild the daily sales rollups from orders and tickets.
+
+Run from the backend directory after deploying the rollup table, or to repair drift:
+    python -m app.scripts.backfill_sales_rollup
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.core.database import Base, SessionLocal, engine
+from app.models.order import Order, OrderStatus, PaymentStatus
+from app.models.sales_rollup import DailySalesRollup
+from app.models.ticket import Ticket, TicketStatus
+
+def _as_date(value) -> date:
+    # SQLite returns DATE() as text
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+def backfill_sales_rollup(db: Session) -> int:
+    """Replace every rollup row with counters recomputed from raw rows; returns rows written"""
+    rows = defaultdict(lambda: {
+        "orders_count": 0, "cancelled_orders": 0, "tickets_count": 0, "revenue": Decimal(0)
+    })
+    
+    order_day = func.date(Order.created_at)
+    for day, event_id, orders, cancelled, revenue in db.query(
+        order_day,
+        Order.event_id,
+        func.count(Order.order_id),
+        func.sum(case((Order.order_status == OrderStatus.CANCELLED.value, 1), else_=0)),
+        func.sum(case((Order.payment_status == PaymentStatus.COMPLETED.value, Order.total_amount), else_=0))
+    ).group_by(order_day, Order.event_id):
+        row = rows[(_as_date(day), event_id)]
+        row["orders_count"] = int(orders or 0)
+        row["cancelled_orders"] = int(cancelled or 0)
+        row["revenue"] = Decimal(revenue or 0)
+    
+    for day, event_id, tickets in db.query(
+        order_day,
+        Order.event_id,
+        func.count(Ticket.ticket_id)
+    ).join(Ticket, Ticket.order_id == Order.order_id).filter(
+        Ticket.status.in_([TicketStatus.ACTIVE, TicketStatus.USED])
+    ).group_by(order_day, Order.event_id):
+        rows[(_as_date(day), event_id)]["tickets_count"] = int(tickets or 0)
+    
+    db.query(DailySalesRollup).delete(synchronize_session=False)
+    db.bulk_insert_mappings(DailySalesRollup, [
+        {"sales_date": day, "event_id": event_id, **counters}
+        for (day, event_id), counters in rows.items()
+    ])
+    db.commit()
+    return len(rows)
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine, tables=[DailySalesRollup.__table__])
+    db = SessionLocal()
+    try:
+        print(f"{backfill_sales_rollup(db)} rollup rows written")
+    finally:
+        db.close()
@@ -0,0 +1,65 @@
+"""Consistency check for the per-event sales stats: recompute counters from tickets and orders and report drift.
+
+Run from the backend directory:
+    python -m app.scripts.check_event_stats            # report only
+    python -m app.scripts.check_event_stats --fix      # also overwrite drifted rows
+    python -m app.scripts.check_event_stats --event 42
+"""
+import argparse
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from app.core.database import Base, SessionLocal, engine
+from app.crud.event_stats import event_stats
+from app.models.event_stats import EventSalesStats
+
+def find_drift(db: Session, event_id: Optional[int] = None) -> Dict[int, Dict[str, tuple]]:
+    """{event_id: {counter: (stored, expected)}} for every counter that disagrees with the raw rows"""
+    expected = event_stats.recompute(db, event_id=event_id)
+    stored_rows = db.query(EventSalesStats)
+    if event_id is not None:
+        stored_rows = stored_rows.filter(EventSalesStats.event_id == event_id)
+    stored = {row.event_id: row for row in stored_rows}
+    
+    drift = {}
+    for stats_event_id in set(expected) | set(stored):
+        row = stored.get(stats_event_id)
+        counters = expected.get(stats_event_id, {})
+        diffs = {}
+        for name in event_stats.COUNTERS:
+            have = getattr(row, name) if row else 0
+            want = counters.get(name, 0)
+            if have != want:
+                diffs[name] = (have, want)
+        if diffs:
+            drift[stats_event_id] = diffs
+    return drift
+
+def fix_drift(db: Session, drift: Dict[int, Dict[str, tuple]]) -> None:
+    """Add the difference to each drifted counter, so concurrent increments are preserved"""
+    for stats_event_id, diffs in drift.items():
+        event_stats.increment(
+            db,
+            event_id=stats_event_id,
+            deltas={name: want - have for name, (have, want) in diffs.items()}
+        )
+    db.commit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--event", type=int, default=None, help="check a single event")
+    parser.add_argument("--fix", action="store_true", help="correct drifted counters")
+    args = parser.parse_args()
+    
+    Base.metadata.create_all(bind=engine, tables=[EventSalesStats.__table__])
+    db = SessionLocal()
+    try:
+        drift = find_drift(db, event_id=args.event)
+        for stats_event_id, diffs in sorted(drift.items()):
+            for name, (have, want) in sorted(diffs.items()):
+                print(f"event {stats_event_id} {name}: stored {have}, expected {want}")
+        print(f"{len(drift)} event(s) with drift")
+        if drift and args.fix:
+            fix_drift(db, drift)
+            print("drift corrected")
+    finally:
+        db.close()
@@ -0,0 +1,39 @@
+"""One-off migration: lowercase event/order enum columns written before values were normalized on write.
+
+Run from the backend directory:
+    python -m app.scripts.normalize_enum_case
+"""
+from sqlalchemy import LargeBinary, cast, func, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models.event import Event
+from app.models.order import Order
+
+ENUM_COLUMNS = [
+    (Event.__table__, ["category", "status"]),
+    (Order.__table__, ["payment_method", "payment_status", "order_status"]),
+]
+
+def normalize_enum_case(db: Session) -> dict:
+    """Lowercase mixed-case values in place; returns rows changed per column"""
+    changed = {}
+    for table, columns in ENUM_COLUMNS:
+        for name in columns:
+            column = table.c[name]
+            # Compare as bytes so case-insensitive collations still see 'Published' != 'published'
+            result = db.execute(
+                update(table)
+                .where(cast(column, LargeBinary) != cast(func.lower(column), LargeBinary))
+                .values({name: func.lower(column), "updated_at": table.c.updated_at})
+            )
+            changed[f"{table.name}.{name}"] = result.rowcount
+    db.commit()
+    return changed
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        for column, count in normalize_enum_case(db).items():
+            print(f"{column}: {count} rows normalized")
+    finally:
+        db.close()
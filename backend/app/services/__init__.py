@@ -1,4 +1,10 @@
 from app.services.booking import BookingService
+from app.services.checkin import CheckInService
 from app.services.email import EmailService
+from app.services.idempotency import IdempotencyService
+from app.services.sales_stats import SalesStatsService
+from app.services.seat_hold import SeatHoldService
+from app.services.seat_layout import SeatLayoutService
+from app.services.waiting_room import WaitingRoomService
 
-__all__ = ["BookingService", "EmailService"]
\ No newline at end of file
+__all__ = ["BookingService", "CheckInService", "EmailService", "IdempotencyService", "SalesStatsService", "SeatHoldService", "SeatLayoutService", "WaitingRoomService"]
\ No newline at end of file
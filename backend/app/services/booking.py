@@ -1,7 +1,10 @@
-from typing import List
+from collections import Counter
+from typing import Callable, List, Optional
+from sqlalchemy import or_, and_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from decimal import Decimal
+from datetime import datetime
 from app.models.order import Order, OrderStatus, PaymentStatus
 from app.models.order_item import OrderItem
 from app.models.ticket import Ticket, TicketStatus
@@ -9,9 +12,14 @@ from app.models.event import Event
 from app.models.ticket_type import TicketType
 from app.models.seat import Seat, SeatStatus
 from app.schemas.order import OrderCreate, OrderItemCreate
+from app.core.availability import availability
+from app.core.cache import invalidate_ticket_types
 from app.crud.ticket import ticket as ticket_crud
 from app.crud.ticket_type import ticket_type as ticket_type_crud
 from app.crud.seat import seat as seat_crud
+from app.services.checkin import ticket_code_index
+from app.services.sales_stats import SalesStatsService
+from app.services.seat_map import seat_map_cache
 from app.utils.ticket_code import generate_order_number, generate_ticket_code
 
 class BookingService:
@@ -19,9 +27,10 @@ class BookingService:
     def create_order(
         db: Session,
         user_id: int,
-        order_in: OrderCreate
+        order_in: OrderCreate,
+        before_commit: Optional[Callable[[Order], None]] = None
     ) -> Order:
-        """Create order with items and tickets"""
+        """Create order with items and tickets; `before_commit` may add its own writes to the order's transaction"""
         
         # Validate event exists
         event = db.query(Event).filter(Event.event_id == order_in.event_id).first()
@@ -31,65 +40,118 @@ class BookingService:
                 detail="Event not found"
             )
         
+        # Load every referenced ticket type and seat in one query each; ids from other events count as not found
+        ticket_type_ids = {item.ticket_type_id for item in order_in.items if item.ticket_type_id}
+        seat_ids = {item.seat_id for item in order_in.items if item.seat_id}
+        
+        ticket_types = {}
+        if ticket_type_ids:
+            ticket_types = {
+                tt.ticket_type_id: tt
+                for tt in db.query(TicketType).filter(
+                    TicketType.ticket_type_id.in_(ticket_type_ids),
+                    TicketType.event_id == order_in.event_id
+                ).all()
+            }
+        seats = {}
+        if seat_ids:
+            seats = {
+                seat.seat_id: seat
+                for seat in db.query(Seat).filter(
+                    Seat.seat_id.in_(seat_ids),
+                    Seat.event_id == order_in.event_id
+                ).all()
+            }
+        
+        # Merge repeated ticket types so each tier is validated and counted once
+        tier_quantities = {}
+        for item in order_in.items:
+            if item.ticket_type_id:
+                tier_quantities[item.ticket_type_id] = tier_quantities.get(item.ticket_type_id, 0) + item.quantity
+        
         # Calculate totals and validate items
+        now = datetime.utcnow()
         subtotal = Decimal(0)
         order_items_data = []
         
-        for item in order_in.items:
-            if item.ticket_type_id:
-                # Validate ticket type
-                ticket_type = db.query(TicketType).filter(
-                    TicketType.ticket_type_id == item.ticket_type_id
-                ).first()
-                
-                if not ticket_type:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Ticket type {item.ticket_type_id} not found"
-                    )
-                
-                # Check availability
-                available = ticket_type.quantity_available - ticket_type.quantity_sold
-                if available < item.quantity:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Not enough tickets available for {ticket_type.name}"
-                    )
-                
-                item_total = ticket_type.price * item.quantity
-                order_items_data.append({
-                    'ticket_type_id': item.ticket_type_id,
-                    'seat_id': None,
-                    'quantity': item.quantity,
-                    'unit_price': ticket_type.price,
-                    'subtotal': item_total
-                })
-                subtotal += item_total
-                
-            elif item.seat_id:
-                # Validate seat
-                seat = db.query(Seat).filter(Seat.seat_id == item.seat_id).first()
-                
-                if not seat:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Seat {item.seat_id} not found"
-                    )
-                
-                if seat.status != SeatStatus.AVAILABLE:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Seat {item.seat_id} is not available"
-                    )
-                
-                order_items_data.append({
-                    'ticket_type_id': None,
-                    'seat_id': item.seat_id,
-                    'quantity': 1,
-                    'unit_price': seat.price,
-                    'subtotal': seat.price
-                })
-                subtotal += seat.price
+        for ticket_type_id, quantity in tier_quantities.items():
+            ticket_type = ticket_types.get(ticket_type_id)
+            if not ticket_type:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Ticket type {ticket_type_id} not found"
+                )
+            
+            item_total = ticket_type.price * quantity
+            order_items_data.append({
+                'ticket_type_id': ticket_type_id,
+                'seat_id': None,
+                'quantity': quantity,
+                'unit_price': ticket_type.price,
+                'subtotal': item_total
+            })
+            subtotal += item_total
+        
+        for seat_id in seat_ids:
+            seat = seats.get(seat_id)
+            if not seat:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Seat {seat_id} not found"
+                )
+            
+            # A seat can be bought if it is free or held for this order and the hold has not expired
+            held_for_order = (
+                seat.status == SeatStatus.RESERVED
+                and order_in.hold_id is not None
+                and seat.held_by == order_in.hold_id
+                and seat.hold_expires_at is not None
+                and seat.hold_expires_at >= now
+            )
+            if seat.status != SeatStatus.AVAILABLE and not held_for_order:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Seat {seat_id} is not available"
+                )
+            
+            order_items_data.append({
+                'ticket_type_id': None,
+                'seat_id': seat_id,
+                'quantity': 1,
+                'unit_price': seat.price,
+                'subtotal': seat.price
+            })
+            subtotal += seat.price
+        
+        # Reserve inventory with one conditional UPDATE per tier, in id order to keep lock order stable.
+        # The row count is the answer, so concurrent buyers can never oversell a tier.
+        # Sales window, per-order limits, the per-customer cap and the SOLD_OUT flip are all in the same statement.
+        for ticket_type_id in sorted(tier_quantities):
+            ticket_type = ticket_types[ticket_type_id]
+            # Only capped tiers pay for counting the customer's earlier purchases
+            capped_user_id = user_id if ticket_type.max_per_user is not None else None
+            reserved = ticket_type_crud.reserve(
+                db,
+                ticket_type_id=ticket_type_id,
+                quantity=tier_quantities[ticket_type_id],
+                now=now,
+                user_id=capped_user_id
+            )
+            if not reserved:
+                db.rollback()
+                reason = ticket_type_crud.rejection_reason(
+                    db,
+                    ticket_type=ticket_type,
+                    quantity=tier_quantities[ticket_type_id],
+                    now=now,
+                    user_id=capped_user_id
+                )
+                # The reason check reloaded the tier, so the snapshot learns about tiers gone elsewhere
+                availability.record(ticket_type)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=reason
+                )
         
         # Create order
         order = Order(
@@ -107,54 +169,90 @@ class BookingService:
             notes=order_in.notes
         )
         db.add(order)
-        db.flush()  # Get order_id without committing
+        db.flush()
         
-        # Create order items and tickets
+        # Insert the items with a single executemany and read their ids back with one SELECT.
+        # Flushed OrderItem objects would each need their own INSERT to learn the generated id.
         for item_data in order_items_data:
-            order_item = OrderItem(
-                order_id=order.order_id,
-                **item_data
-            )
-            db.add(order_item)
-            db.flush()
+            item_data['order_id'] = order.order_id
+        db.bulk_insert_mappings(OrderItem, order_items_data)
+        order_item_ids = {
+            (ticket_type_id, seat_id): order_item_id
+            for order_item_id, ticket_type_id, seat_id in db.query(
+                OrderItem.order_item_id, OrderItem.ticket_type_id, OrderItem.seat_id
+            ).filter(OrderItem.order_id == order.order_id)
+        }
+        
+        # Create tickets with a single executemany
+        ticket_rows = []
+        for item_data in order_items_data:
+            if item_data['ticket_type_id']:
+                ticket_type_name = ticket_types[item_data['ticket_type_id']].name
+                seat_info = None
+            else:
+                seat = seats[item_data['seat_id']]
+                ticket_type_name = None
+                seat_info = f"{seat.section}-{seat.row_label}-{seat.seat_number}"
             
-            # Create tickets
-            quantity = item_data['quantity']
-            for _ in range(quantity):
-                ticket = Ticket(
-                    ticket_code=generate_ticket_code(),
-                    order_id=order.order_id,
-                    order_item_id=order_item.order_item_id,
-                    user_id=user_id,
-                    event_id=order_in.event_id,
-                    price=item_data['unit_price'],
-                    status=TicketStatus.ACTIVE
+            for _ in range(item_data['quantity']):
+                ticket_rows.append({
+                    'ticket_code': generate_ticket_code(),
+                    'order_id': order.order_id,
+                    'order_item_id': order_item_ids[(item_data['ticket_type_id'], item_data['seat_id'])],
+                    'user_id': user_id,
+                    'event_id': order_in.event_id,
+                    'ticket_type_name': ticket_type_name,
+                    'seat_info': seat_info,
+                    'price': item_data['unit_price'],
+                    'status': TicketStatus.ACTIVE
+                })
+        db.bulk_insert_mappings(Ticket, ticket_rows)
+        
+        # Book all seats with a single conditional UPDATE that also consumes the buyer's hold
+        if seat_ids:
+            seat_filter = Seat.status == SeatStatus.AVAILABLE
+            if order_in.hold_id:
+                seat_filter = or_(
+                    seat_filter,
+                    and_(
+                        Seat.status == SeatStatus.RESERVED,
+                        Seat.held_by == order_in.hold_id,
+                        Seat.hold_expires_at >= now
+                    )
+                )
+            booked = db.query(Seat).filter(Seat.seat_id.in_(seat_ids), seat_filter).update(
+                {
+                    Seat.status: SeatStatus.BOOKED,
+                    Seat.order_id: order.order_id,
+                    Seat.booked_at: now,
+                    Seat.held_by: None,
+                    Seat.hold_expires_at: None
+                },
+                synchronize_session=False
+            )
+            if booked != len(seat_ids):
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="One or more seats are no longer available"
                 )
-                
-                # Set ticket details
-                if item_data['ticket_type_id']:
-                    ticket_type = db.query(TicketType).filter(
-                        TicketType.ticket_type_id == item_data['ticket_type_id']
-                    ).first()
-                    ticket.ticket_type_name = ticket_type.name
-                    
-                    # Update ticket type sold quantity
-                    ticket_type.quantity_sold += 1
-                    
-                elif item_data['seat_id']:
-                    seat = db.query(Seat).filter(Seat.seat_id == item_data['seat_id']).first()
-                    ticket.seat_info = f"{seat.section}-{seat.row_label}-{seat.seat_number}"
-                    
-                    # Update seat status
-                    seat.status = SeatStatus.BOOKED
-                    seat.order_id = order.order_id
-                
-                db.add(ticket)
         
         # Update event tickets sold
-        event.tickets_sold += sum(item['quantity'] for item in order_items_data)
+        db.query(Event).filter(Event.event_id == event.event_id).update(
+            {Event.tickets_sold: Event.tickets_sold + len(ticket_rows)},
+            synchronize_session=False
+        )
+        SalesStatsService.on_order_created(db, order, tickets=len(ticket_rows))
+        if before_commit is not None:
+            before_commit(order)
         
         db.commit()
+        ticket_code_index.add(order_in.event_id, [row['ticket_code'] for row in ticket_rows])
+        if tier_quantities:
+            invalidate_ticket_types(order_in.event_id)
+            availability.apply(tier_quantities)
+        if seat_ids:
+            seat_map_cache.apply(order_in.event_id, {seat_id: SeatStatus.BOOKED for seat_id in seat_ids})
         db.refresh(order)
         
         return order
@@ -170,8 +268,21 @@ class BookingService:
                 detail="Order not found"
             )
         
-        order_status_val = order.order_status if isinstance(order.order_status, str) else (order.order_status.value if hasattr(order.order_status, 'value') else str(order.order_status))
-        if order_status_val.lower() == OrderStatus.CANCELLED.value.lower():
+        # Claim the cancellation in one conditional UPDATE: of two concurrent cancels only one gets the row,
+        # so inventory is released once
+        old_payment_status = order.payment_status
+        claimed = db.query(Order).filter(
+            Order.order_id == order_id,
+            Order.order_status != OrderStatus.CANCELLED.value
+        ).update(
+            {
+                Order.order_status: OrderStatus.CANCELLED.value,
+                Order.payment_status: PaymentStatus.CANCELLED.value
+            },
+            synchronize_session="evaluate"
+        )
+        if claimed != 1:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Order already cancelled"
@@ -179,6 +290,7 @@ class BookingService:
         
         # Cancel tickets
         tickets = db.query(Ticket).filter(Ticket.order_id == order_id).all()
+        ticket_statuses = Counter(ticket.status for ticket in tickets)
         for ticket in tickets:
             ticket.status = TicketStatus.CANCELLED
         
@@ -188,28 +300,35 @@ class BookingService:
             seat.status = SeatStatus.AVAILABLE
             seat.order_id = None
             seat.booked_at = None
+            seat.held_by = None
+            seat.hold_expires_at = None
         
         # Update ticket type quantities
         order_items = db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
         for item in order_items:
             if item.ticket_type_id:
-                ticket_type = db.query(TicketType).filter(
-                    TicketType.ticket_type_id == item.ticket_type_id
-                ).first()
-                if ticket_type:
-                    ticket_type.quantity_sold -= item.quantity
+                ticket_type_crud.release(db, ticket_type_id=item.ticket_type_id, quantity=item.quantity)
         
         # Update event tickets sold
-        event = db.query(Event).filter(Event.event_id == order.event_id).first()
-        if event:
-            total_quantity = sum(item.quantity for item in order_items)
-            event.tickets_sold -= total_quantity
+        db.query(Event).filter(Event.event_id == order.event_id).update(
+            {Event.tickets_sold: Event.tickets_sold - sum(item.quantity for item in order_items)},
+            synchronize_session=False
+        )
         
-        # Update order status
-        order.order_status = OrderStatus.CANCELLED.value
-        order.payment_status = PaymentStatus.CANCELLED.value
+        SalesStatsService.on_order_cancelled(
+            db, order, ticket_statuses=ticket_statuses, old_payment_status=old_payment_status
+        )
         
         db.commit()
+        released = Counter()
+        for item in order_items:
+            if item.ticket_type_id:
+                released[item.ticket_type_id] -= item.quantity
+        if released:
+            invalidate_ticket_types(order.event_id)
+            availability.apply(released)
+        if seats:
+            seat_map_cache.apply(order.event_id, {seat.seat_id: SeatStatus.AVAILABLE for seat in seats})
         db.refresh(order)
         
         return order
\ No newline at end of file
@@ -0,0 +1,260 @@
+import enum
+import hashlib
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from app.core.metrics import metrics
+from app.crud.ticket import ticket as ticket_crud
+from app.models.ticket import Ticket, TicketStatus
+from app.schemas.ticket import TicketScan
+from app.services.sales_stats import SalesStatsService
+from app.utils.ticket_code import has_valid_check_character, is_generated_code
+
+class CheckInResult(str, enum.Enum):
+    ADMITTED = "admitted"
+    DUPLICATE = "duplicate"
+    UNKNOWN = "unknown"
+    CANCELLED = "cancelled"
+
+def _code_hash(ticket_code: str) -> int:
+    return int.from_bytes(hashlib.blake2b(ticket_code.encode(), digest_size=8).digest(), "big")
+
+class EventCodeIndex:
+    """Every ticket code issued for one event, as a sorted array of 64-bit hashes (8 bytes per ticket)"""
+
+    def __init__(self, codes: Iterable[str]):
+        self.hashes = array("Q", sorted(_code_hash(code) for code in codes))
+        # Codes sold or confirmed in the database after the load
+        self.added = set()
+
+    def __contains__(self, ticket_code: str) -> bool:
+        h = _code_hash(ticket_code)
+        i = bisect_left(self.hashes, h)
+        return (i < len(self.hashes) and self.hashes[i] == h) or h in self.added
+
+    def __len__(self) -> int:
+        return len(self.hashes) + len(self.added)
+
+class TicketCodeIndex:
+    """Per-event code indexes that answer "issued for this event" without touching the database.
+
+    Only a hit is trusted, and only as "possibly valid": admission is still decided by the conditional UPDATE.
+    Codes sold by other workers never reach this process's index, so a miss is confirmed against the database.
+    """
+
+    def __init__(self):
+        self._events: Dict[int, EventCodeIndex] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, event_id: int) -> EventCodeIndex:
+        codes = db.query(Ticket.ticket_code).filter(Ticket.event_id == event_id)
+        index = EventCodeIndex(code for (code,) in codes)
+        with self._lock:
+            self._events[event_id] = index
+        return index
+
+    def might_contain(self, db: Session, event_id: int, ticket_code: str) -> bool:
+        index = self._events.get(event_id)
+        if index is None:
+            index = self._load(db, event_id)
+        if ticket_code in index:
+            return True
+        found = db.query(Ticket.ticket_id).filter(
+            Ticket.event_id == event_id,
+            Ticket.ticket_code == ticket_code
+        ).first() is not None
+        if found:
+            index.added.add(_code_hash(ticket_code))
+        return found
+
+    def add(self, event_id: int, ticket_codes: Iterable[str]) -> None:
+        """Record newly issued codes for an event whose index is loaded"""
+        index = self._events.get(event_id)
+        if index is not None:
+            index.added.update(_code_hash(code) for code in ticket_codes)
+
+    def stats(self) -> Dict[int, int]:
+        return {event_id: len(index) for event_id, index in self._events.items()}
+
+class GateMetrics:
+    """Scan counts by result and admission latency, per gate"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gates = defaultdict(lambda: {
+            "scans": 0,
+            **{result.value: 0 for result in CheckInResult},
+            "latency_ms_total": 0.0,
+            "latency_ms_max": 0.0,
+            "first_scan": None,
+            "last_scan": None,
+        })
+
+    def record(self, gate_id: Optional[str], result: CheckInResult, seconds: float, scans: int = 1) -> None:
+        now = time.time()
+        elapsed_ms = seconds * 1000
+        with self._lock:
+            gate = self._gates[gate_id or "default"]
+            gate["scans"] += scans
+            gate[result.value] += scans
+            gate["latency_ms_total"] += elapsed_ms
+            gate["latency_ms_max"] = max(gate["latency_ms_max"], elapsed_ms)
+            gate["first_scan"] = gate["first_scan"] or now
+            gate["last_scan"] = now
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            gates = {}
+            for gate_id, gate in self._gates.items():
+                elapsed = gate["last_scan"] - gate["first_scan"]
+                gates[gate_id] = {
+                    "scans": gate["scans"],
+                    **{result.value: gate[result.value] for result in CheckInResult},
+                    "latency_ms_avg": round(gate["latency_ms_total"] / gate["scans"], 3) if gate["scans"] else 0.0,
+                    "latency_ms_max": round(gate["latency_ms_max"], 3),
+                    "scans_per_second": round(gate["scans"] / elapsed, 2) if elapsed > 0 else None,
+                }
+            return gates
+
+ticket_code_index = TicketCodeIndex()
+gate_metrics = GateMetrics()
+metrics.register("checkin", lambda: {"gates": gate_metrics.snapshot(), "indexed_codes": ticket_code_index.stats()})
+
+def _is_plausible(ticket_code: str) -> bool:
+    # Mistyped or misread codes fail the check character without a lookup; older codes have none
+    return not is_generated_code(ticket_code) or has_valid_check_character(ticket_code)
+
+def _as_utc_naive(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+class CheckInService:
+    @staticmethod
+    def _rejection(db: Session, ticket_code: str, event_id: Optional[int]) -> CheckInResult:
+        """Why a ticket was not admitted"""
+        ticket = ticket_crud.get_by_code(db, ticket_code=ticket_code)
+        if not ticket or (event_id is not None and ticket.event_id != event_id):
+            return CheckInResult.UNKNOWN
+        if ticket.status == TicketStatus.USED:
+            return CheckInResult.DUPLICATE
+        return CheckInResult.CANCELLED
+
+    @staticmethod
+    def check_in(
+        db: Session,
+        ticket_code: str,
+        event_id: Optional[int] = None,
+        gate_id: Optional[str] = None,
+        scanned_at: Optional[datetime] = None
+    ) -> Tuple[CheckInResult, Optional[Ticket]]:
+        """Admit one scanned ticket; the ticket is returned only when admitted"""
+        start = time.perf_counter()
+        ticket = None
+        if not _is_plausible(ticket_code) or (
+            event_id is not None and not ticket_code_index.might_contain(db, event_id, ticket_code)
+        ):
+            result = CheckInResult.UNKNOWN
+        else:
+            ticket = ticket_crud.check_in(db, ticket_code=ticket_code, event_id=event_id, checked_in_at=scanned_at)
+            result = CheckInResult.ADMITTED if ticket else CheckInService._rejection(db, ticket_code, event_id)
+        gate_metrics.record(gate_id, result, time.perf_counter() - start)
+        return result, ticket
+
+    @staticmethod
+    def check_in_batch(
+        db: Session,
+        scans: List[TicketScan],
+        event_id: Optional[int] = None,
+        gate_id: Optional[str] = None
+    ) -> List[dict]:
+        """Apply queued scans in one transaction, earliest scan of each ticket first.
+
+        Ties on scan time are broken by gate id and then by position in the batch, so replaying the
+        same batch always picks the same winner. A scan of a ticket that is already checked in is a
+        duplicate, even when it happened earlier (e.g. an offline gate syncing late): someone walked in
+        on that ticket twice. The earlier time still becomes the recorded check-in time.
+        """
+        start = time.perf_counter()
+        ordered = sorted(
+            (
+                (_as_utc_naive(scan.scanned_at), scan.gate_id or gate_id or "", position, scan)
+                for position, scan in enumerate(scans)
+            ),
+            key=lambda entry: entry[:3]
+        )
+        
+        # First scan per code is the candidate; later ones are duplicates within the batch
+        first_scans = {}
+        for scanned_at, _, position, scan in ordered:
+            first_scans.setdefault(scan.ticket_code, (scanned_at, position))
+        # The row lock below is one query for the whole batch, so index misses need no lookup of their own
+        candidates = [code for code in first_scans if _is_plausible(code)]
+        tickets = {
+            ticket.ticket_code: ticket
+            for ticket in ticket_crud.get_by_codes(db, ticket_codes=candidates, for_update=True)
+        } if candidates else {}
+        
+        # Outcome of the winning scan per code
+        outcomes = {}
+        admit, backdate = {}, {}
+        for code, (scanned_at, _) in first_scans.items():
+            ticket = tickets.get(code)
+            if not ticket or (event_id is not None and ticket.event_id != event_id):
+                outcomes[code] = (CheckInResult.UNKNOWN, None)
+            elif ticket.status == TicketStatus.ACTIVE:
+                admit[ticket.ticket_id] = scanned_at
+                outcomes[code] = (CheckInResult.ADMITTED, scanned_at)
+            elif ticket.status == TicketStatus.USED:
+                # Keep the earliest entry time, but a second entry is never reported as an admission
+                if ticket.checked_in_at is None or scanned_at < ticket.checked_in_at:
+                    backdate[ticket.ticket_id] = scanned_at
+                    outcomes[code] = (CheckInResult.DUPLICATE, scanned_at)
+                else:
+                    outcomes[code] = (CheckInResult.DUPLICATE, ticket.checked_in_at)
+            else:
+                outcomes[code] = (CheckInResult.CANCELLED, None)
+        
+        if ticket_crud.check_in_many(db, checkins=admit) != len(admit):
+            # Rows are locked above; only a database without row locks can get here
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Tickets changed during check-in; retry the batch"
+            )
+        ticket_crud.backdate_check_ins(db, checkins=backdate)
+        admitted_by_event = defaultdict(int)
+        for ticket in tickets.values():
+            if ticket.ticket_id in admit:
+                admitted_by_event[ticket.event_id] += 1
+        for admitted_event_id, count in admitted_by_event.items():
+            SalesStatsService.on_tickets_checked_in(db, admitted_event_id, count)
+        db.commit()
+        
+        # Results in the order the scans were sent; losing scans of an admitted ticket are duplicates
+        by_position = {entry[2]: entry for entry in ordered}
+        results = []
+        for position, scan in enumerate(scans):
+            result, checked_in_at = outcomes[scan.ticket_code]
+            if position != first_scans[scan.ticket_code][1] and result == CheckInResult.ADMITTED:
+                result = CheckInResult.DUPLICATE
+            results.append({
+                "ticket_code": scan.ticket_code,
+                "scanned_at": scan.scanned_at,
+                "gate_id": by_position[position][1] or None,
+                "result": result.value,
+                "checked_in_at": checked_in_at
+            })
+        
+        elapsed = (time.perf_counter() - start) / max(len(results), 1)
+        for entry in results:
+            gate_metrics.record(entry["gate_id"], CheckInResult(entry["result"]), elapsed)
+        return results
+
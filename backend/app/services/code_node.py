@@ -0,0 +1,47 @@
+import asyncio
+import logging
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.code_node_lease import code_node_lease as lease_crud
+from app.utils.ticket_code import MAX_NODE_ID, code_generator
+
+logger = logging.getLogger(__name__)
+
+class CodeNodeService:
+    """Leases each process its own ticket code node id, so workers sharing a config never mint the same code"""
+
+    @staticmethod
+    def lease(node_id: Optional[int], holder: str) -> int:
+        """Renew the holder's lease on `node_id`, or lease a free node id if it has none or lost it"""
+        db = SessionLocal()
+        try:
+            if node_id is not None and lease_crud.renew(
+                db, node_id=node_id, holder=holder, lease_seconds=settings.CODE_NODE_LEASE_SECONDS
+            ):
+                return node_id
+            leased = lease_crud.acquire(
+                db,
+                holder=holder,
+                node_count=MAX_NODE_ID + 1,
+                lease_seconds=settings.CODE_NODE_LEASE_SECONDS,
+                preferred=settings.CODE_NODE_ID
+            )
+        finally:
+            db.close()
+        if leased is None:
+            raise RuntimeError("Every ticket code node id is leased by a live process")
+        if node_id is not None:
+            logger.warning("Ticket code node %s was lost; now using node %s", node_id, leased)
+        return leased
+
+    @staticmethod
+    async def run_renewer() -> None:
+        """Background loop that leases this process's node id at startup and renews it every third of the lease"""
+        while True:
+            try:
+                await run_in_threadpool(code_generator.renew)
+            except Exception:
+                logger.exception("Error renewing the ticket code node lease")
+            await asyncio.sleep(settings.CODE_NODE_LEASE_SECONDS / 3)
@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.crud.idempotency_key import idempotency_key as idempotency_crud
+from app.models.idempotency_key import IdempotencyStatus
+
+# Requests executing in this process, so local duplicates wait without polling the database
+_inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+_counts = Counter()
+metrics.register("idempotency", lambda: {"in_flight": len(_inflight), **_counts})
+logger = logging.getLogger(__name__)
+
+# Stores the response inside the caller's transaction: (session, result)
+Complete = Callable[[Session, Any], None]
+
+class LeaseLost(Exception):
+    """The idempotency key was taken over while the request was still running; its work must be rolled back"""
+
+class IdempotencyService:
+    @staticmethod
+    def request_hash(payload: Any) -> str:
+        return hashlib.sha256(
+            json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+
+    @staticmethod
+    def _replay(record) -> JSONResponse:
+        _counts["replayed"] += 1
+        return JSONResponse(
+            content=json.loads(record.response_body),
+            status_code=record.response_status,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    @staticmethod
+    def _in_progress() -> HTTPException:
+        _counts["conflicts"] += 1
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress",
+            headers={"Retry-After": "1"}
+        )
+
+    @staticmethod
+    async def _wait_inflight(future: asyncio.Future, deadline: float) -> None:
+        _counts["waited"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    async def run(
+        db: AsyncSession,
+        *,
+        scope: str,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        execute: Callable[[Optional[Complete]], Awaitable[Any]]
+    ) -> Any:
+        """Run `execute` once per key; retries get the stored response, concurrent duplicates wait for the first run.
+
+        `execute` is handed a `complete(session, result)` to call in the transaction that commits its work, so
+        the stored response commits with it. It raises LeaseLost if the key was taken over meanwhile.
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        while True:
+            inflight = _inflight.get((scope, key))
+            if inflight is not None:
+                await IdempotencyService._wait_inflight(inflight, deadline)
+
+            lease_token = await db.run_sync(
+                lambda s: idempotency_crud.claim(
+                    s,
+                    scope=scope,
+                    key=key,
+                    request_hash=request_hash,
+                    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+                    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS
+                )
+            )
+            if lease_token:
+                break
+            record = await db.run_sync(lambda s: idempotency_crud.get_by_key(s, scope=scope, key=key))
+            if record is None:
+                # The first run failed and released the key
+                continue
+            if record.request_hash != request_hash:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was already used with a different request"
+                )
+            if record.status == IdempotencyStatus.COMPLETED:
+                return IdempotencyService._replay(record)
+            if record.locked_until <= datetime.utcnow():
+                lease_token = await db.run_sync(
+                    lambda s: idempotency_crud.take_over(s, record=record, lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+                )
+                if lease_token:
+                    # The first run died without finishing (or is too slow to finish: its completion will now fail)
+                    _counts["taken_over"] += 1
+                    break
+            if time.monotonic() >= deadline:
+                raise IdempotencyService._in_progress()
+            # In flight on another process
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+        completed = False
+
+        def complete(sync_db: Session, result: Any) -> None:
+            nonlocal completed
+            if not idempotency_crud.complete(
+                sync_db,
+                scope=scope,
+                key=key,
+                lease_token=lease_token,
+                response_status=status_code,
+                response_body=json.dumps(jsonable_encoder(result)),
+                commit=False
+            ):
+                raise LeaseLost()
+            completed = True
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[(scope, key)] = future
+        try:
+            try:
+                result = await execute(complete)
+            except LeaseLost:
+                # The run that took over owns the key now; its response is the one to replay
+                _counts["lease_lost"] += 1
+                raise IdempotencyService._in_progress()
+            except BaseException:
+                # Cancellation included: a key left in progress would block retries until its lease lapsed
+                await db.run_sync(lambda s: idempotency_crud.release(s, scope=scope, key=key, lease_token=lease_token))
+                raise
+            body = jsonable_encoder(result)
+            if not completed:
+                stored = await db.run_sync(
+                    lambda s: idempotency_crud.complete(
+                        s,
+                        scope=scope,
+                        key=key,
+                        lease_token=lease_token,
+                        response_status=status_code,
+                        response_body=json.dumps(body)
+                    )
+                )
+                if not stored:
+                    _counts["lease_lost"] += 1
+            _counts["executed"] += 1
+            return JSONResponse(content=body, status_code=status_code)
+        finally:
+            del _inflight[(scope, key)]
+            future.set_result(None)
+
+    @staticmethod
+    def sweep_expired_keys() -> int:
+        """Delete idempotency records past their TTL"""
+        db = SessionLocal()
+        try:
+            return idempotency_crud.delete_expired(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def run_sweeper() -> None:
+        """Background loop that evicts expired idempotency keys every IDEMPOTENCY_SWEEP_INTERVAL_SECONDS"""
+        while True:
+            await asyncio.sleep(settings.IDEMPOTENCY_SWEEP_INTERVAL_SECONDS)
+            try:
+                await run_in_threadpool(IdempotencyService.sweep_expired_keys)
+            except Exception:
+                logger.exception("Error sweeping idempotency keys")
@@ -0,0 +1,88 @@
+import enum
+from decimal import Decimal
+from typing import Any, Dict, Optional
+from sqlalchemy.orm import Session
+from app.crud.event_stats import event_stats, revenue_counter, ticket_counter
+from app.crud.sales_rollup import sales_rollup
+from app.models.order import Order, PaymentStatus
+from app.models.ticket import TicketStatus
+
+def _is_paid(payment_status) -> bool:
+    value = payment_status.value if isinstance(payment_status, enum.Enum) else str(payment_status or "")
+    return value.lower() == PaymentStatus.COMPLETED.value
+
+def _revenue_delta(order: Order, old_payment_status) -> Decimal:
+    was_paid, is_paid = _is_paid(old_payment_status), _is_paid(order.payment_status)
+    if was_paid == is_paid:
+        return Decimal(0)
+    return order.total_amount if is_paid else -order.total_amount
+
+def _add(deltas: Dict[str, Any], counter: Optional[str], value) -> None:
+    if counter:
+        deltas[counter] = deltas.get(counter, 0) + value
+
+def _revenue_moves(order: Order, old_payment_status) -> Dict[str, Any]:
+    """Move the order total between revenue-by-payment-status counters"""
+    deltas = {}
+    _add(deltas, revenue_counter(old_payment_status), -order.total_amount)
+    _add(deltas, revenue_counter(order.payment_status), order.total_amount)
+    return deltas
+
+class SalesStatsService:
+    """Keeps the sales rollups and per-event stats in step with orders and tickets.
+
+    Call inside the transaction that makes the change so counters commit or roll back with it.
+    """
+    
+    @staticmethod
+    def on_order_created(db: Session, order: Order, tickets: int) -> None:
+        sales_rollup.increment(
+            db,
+            sales_date=order.created_at.date(),
+            event_id=order.event_id,
+            orders_count=1,
+            tickets_count=tickets,
+            revenue=order.total_amount if _is_paid(order.payment_status) else 0
+        )
+        deltas = {"tickets_active": tickets}
+        _add(deltas, revenue_counter(order.payment_status), order.total_amount)
+        event_stats.increment(db, event_id=order.event_id, deltas=deltas)
+    
+    @staticmethod
+    def on_payment_status_changed(db: Session, order: Order, old_payment_status) -> None:
+        sales_rollup.increment(
+            db,
+            sales_date=order.created_at.date(),
+            event_id=order.event_id,
+            revenue=_revenue_delta(order, old_payment_status)
+        )
+        event_stats.increment(db, event_id=order.event_id, deltas=_revenue_moves(order, old_payment_status))
+    
+    @staticmethod
+    def on_order_cancelled(
+        db: Session, order: Order, ticket_statuses: Dict[TicketStatus, int], old_payment_status
+    ) -> None:
+        """`ticket_statuses` counts the order's tickets by their status before cancellation"""
+        voided = sum(
+            count for ticket_status, count in ticket_statuses.items()
+            if ticket_status in (TicketStatus.ACTIVE, TicketStatus.USED)
+        )
+        sales_rollup.increment(
+            db,
+            sales_date=order.created_at.date(),
+            event_id=order.event_id,
+            cancelled_orders=1,
+            tickets_count=-voided,
+            revenue=_revenue_delta(order, old_payment_status)
+        )
+        
+        deltas = _revenue_moves(order, old_payment_status)
+        for ticket_status, count in ticket_statuses.items():
+            if ticket_status != TicketStatus.CANCELLED:
+                _add(deltas, ticket_counter(ticket_status), -count)
+                _add(deltas, "tickets_cancelled", count)
+        event_stats.increment(db, event_id=order.event_id, deltas=deltas)
+    
+    @staticmethod
+    def on_tickets_checked_in(db: Session, event_id: int, count: int = 1) -> None:
+        event_stats.increment(db, event_id=event_id, deltas={"tickets_active": -count, "tickets_used": count})
@@ -0,0 +1,119 @@
+import logging
+import re
+from typing import List, Optional
+from sqlalchemy import Float, Integer, or_, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+from app.models.event import Event
+
+# InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default)
+MIN_FULLTEXT_LENGTH = 3
+# Everything but letters and digits is a separator to both full-text parsers, and most of it is query syntax
+_NON_WORD = re.compile(r"[\W_]+")
+
+logger = logging.getLogger(__name__)
+
+class EventSearch:
+    """Relevance-ranked event search: MATCH ... AGAINST on MySQL, an FTS5 shadow table on SQLite"""
+
+    FTS_TABLE = "events_fts"
+    _fts_engines = set()
+
+    @staticmethod
+    def ensure_index(engine: Engine) -> None:
+        """Create the SQLite FTS5 shadow table and its sync triggers; MySQL uses the idx_search FULLTEXT key"""
+        if engine.dialect.name != "sqlite":
+            return
+        try:
+            with engine.begin() as conn:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts'"
+                )).first()
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+                    "title, description, content='events', content_rowid='event_id')"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN "
+                    "INSERT INTO events_fts(rowid, title, description) "
+                    "VALUES (new.event_id, new.title, new.description); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN "
+                    "INSERT INTO events_fts(events_fts, rowid, title, description) "
+                    "VALUES ('delete', old.event_id, old.title, old.description); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF title, description ON events BEGIN "
+                    "INSERT INTO events_fts(events_fts, rowid, title, description) "
+                    "VALUES ('delete', old.event_id, old.title, old.description); "
+                    "INSERT INTO events_fts(rowid, title, description) "
+                    "VALUES (new.event_id, new.title, new.description); END"
+                ))
+                if not exists:
+                    # Index events that existed before the shadow table
+                    conn.execute(text("INSERT INTO events_fts(events_fts) VALUES ('rebuild')"))
+            EventSearch._fts_engines.add(engine.url.database)
+        except Exception as e:
+            # SQLite builds without FTS5 fall back to LIKE search
+            logger.warning("Full-text search unavailable, using LIKE: %s", e)
+
+    @staticmethod
+    def _terms(search: str) -> List[str]:
+        # Reduced to words so user input cannot inject full-text syntax on either backend
+        return [term for term in _NON_WORD.split(search) if term]
+
+    @staticmethod
+    def _mode(db: Session, search: str) -> str:
+        bind = db.get_bind()
+        if len(search.strip()) < MIN_FULLTEXT_LENGTH or not EventSearch._terms(search):
+            return "like"
+        if bind.dialect.name == "mysql":
+            return "mysql"
+        # Keyed by database file so the sync and async engines share the index
+        if bind.dialect.name == "sqlite" and bind.url.database in EventSearch._fts_engines:
+            return "fts5"
+        return "like"
+
+    @staticmethod
+    def _fts5_query(search: str) -> str:
+        # Any term may match, as a whole word or as the start of one ("sax" finds "saxophone")
+        return " OR ".join(f'"{term}"*' for term in EventSearch._terms(search))
+
+    @staticmethod
+    def _match(search: str):
+        # Boolean mode is the one that takes prefix terms; without operators any term may match
+        against = " ".join(f"{term}*" for term in EventSearch._terms(search))
+        return match(Event.title, Event.description, against=against).in_boolean_mode()
+
+    @staticmethod
+    def filter(db: Session, search: str) -> ColumnElement:
+        """WHERE clause selecting events that match the search text"""
+        mode = EventSearch._mode(db, search)
+        if mode == "mysql":
+            return EventSearch._match(search)
+        if mode == "fts5":
+            matches = text(
+                "SELECT rowid FROM events_fts WHERE events_fts MATCH :fts_query"
+            ).bindparams(fts_query=EventSearch._fts5_query(search)).columns(rowid=Integer)
+            return Event.event_id.in_(matches)
+        return or_(
+            Event.title.contains(search),
+            Event.description.contains(search)
+        )
+
+    @staticmethod
+    def rank(db: Session, search: str) -> Optional[ColumnElement]:
+        """ORDER BY expression putting the most relevant events first, or None without full-text support"""
+        mode = EventSearch._mode(db, search)
+        if mode == "mysql":
+            return EventSearch._match(search).desc()
+        if mode == "fts5":
+            # bm25() is lower for better matches
+            return text(
+                "SELECT bm25(events_fts) FROM events_fts "
+                "WHERE events_fts MATCH :fts_rank_query AND events_fts.rowid = events.event_id"
+            ).bindparams(fts_rank_query=EventSearch._fts5_query(search)).columns(rank=Float).scalar_subquery().asc()
+        return None
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.seat import seat as seat_crud
+from app.models.seat import SeatStatus
+from app.schemas.seat import SeatHoldCreate
+from app.services.seat_map import seat_map_cache
+
+logger = logging.getLogger(__name__)
+
+class SeatHoldService:
+    @staticmethod
+    def hold_seats(db: Session, event_id: int, hold_in: SeatHoldCreate) -> dict:
+        """Reserve a batch of seats for a holder, all or nothing"""
+        # Always minted here: the holder id is what releases the seats and pays for them, so it must be unguessable.
+        # Bind holds to the signed-in user once authentication is re-enabled.
+        holder_id = uuid.uuid4().hex
+        ttl_seconds = min(
+            hold_in.ttl_seconds or settings.SEAT_HOLD_TTL_SECONDS,
+            settings.SEAT_HOLD_MAX_TTL_SECONDS
+        )
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        seat_ids = sorted(set(hold_in.seat_ids))
+
+        held = seat_crud.hold(
+            db,
+            event_id=event_id,
+            seat_ids=seat_ids,
+            holder_id=holder_id,
+            expires_at=expires_at
+        )
+        if held != len(seat_ids):
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="One or more seats are not available"
+            )
+        db.commit()
+        seat_map_cache.apply(event_id, {seat_id: SeatStatus.RESERVED for seat_id in seat_ids})
+
+        return {
+            "holder_id": holder_id,
+            "event_id": event_id,
+            "seat_ids": seat_ids,
+            "expires_at": expires_at
+        }
+
+    @staticmethod
+    def release_hold(db: Session, event_id: int, holder_id: str) -> int:
+        """Release all seats held by a holder"""
+        released = seat_crud.release_hold(db, event_id=event_id, holder_id=holder_id)
+        db.commit()
+        if released:
+            seat_map_cache.invalidate(event_id)
+        return released
+
+    @staticmethod
+    def sweep_expired_holds() -> int:
+        """Release expired holds across all events"""
+        db = SessionLocal()
+        try:
+            expired = seat_crud.expire_holds(db)
+            db.commit()
+            if expired:
+                seat_map_cache.invalidate()
+            return expired
+        finally:
+            db.close()
+
+    @staticmethod
+    async def run_sweeper() -> None:
+        """Background loop that expires seat holds every SEAT_HOLD_SWEEP_INTERVAL_SECONDS"""
+        while True:
+            await asyncio.sleep(settings.SEAT_HOLD_SWEEP_INTERVAL_SECONDS)
+            try:
+                await run_in_threadpool(SeatHoldService.sweep_expired_holds)
+            except Exception:
+                logger.exception("Error sweeping seat holds")
@@ -0,0 +1,102 @@
+import json
+from itertools import islice
+from typing import Iterator, List, Set, Union
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.seat import seat as seat_crud
+from app.schemas.seat import SeatMapLayout, SeatRowRange
+from app.services.seat_map import seat_map_cache
+
+def _row_labels(rows) -> List[str]:
+    return rows.labels() if isinstance(rows, SeatRowRange) else list(rows)
+
+def _row_count(rows) -> int:
+    return rows.count() if isinstance(rows, SeatRowRange) else len(rows)
+
+def _row_matcher(rows) -> Union[SeatRowRange, Set[str]]:
+    # Zones may span rows the section does not have, so test membership instead of listing the zone
+    return rows if isinstance(rows, SeatRowRange) else set(rows)
+
+class SeatLayoutService:
+    """Expands Event.seat_map_config into seat rows and inserts the ones that do not exist yet"""
+
+    @staticmethod
+    def parse(seat_map_config: dict) -> SeatMapLayout:
+        if not seat_map_config:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Event has no seat_map_config"
+            )
+        try:
+            layout = SeatMapLayout.model_validate(seat_map_config)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid seat_map_config: " + "; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                )
+            )
+        total = SeatLayoutService.count(layout)
+        if total > settings.SEAT_GENERATION_MAX_SEATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"seat_map_config describes {total} seats; the limit is {settings.SEAT_GENERATION_MAX_SEATS}"
+            )
+        return layout
+
+    @staticmethod
+    def count(layout: SeatMapLayout) -> int:
+        """Seats the layout describes, computed without expanding any row range"""
+        return sum(_row_count(section.rows) * section.seats_per_row for section in layout.sections)
+
+    @staticmethod
+    def expand(event_id: int, layout: SeatMapLayout) -> Iterator[dict]:
+        """Seat rows in section, row and seat order"""
+        for section in layout.sections:
+            zones = [(_row_matcher(zone.rows), zone.price) for zone in section.price_zones]
+            for row_label in _row_labels(section.rows):
+                price = next((zone_price for rows, zone_price in zones if row_label in rows), section.price)
+                for seat_number in range(section.first_seat, section.first_seat + section.seats_per_row):
+                    yield {
+                        "event_id": event_id,
+                        "section": section.name,
+                        "row_label": row_label,
+                        "seat_number": seat_number,
+                        "price": price
+                    }
+
+    @staticmethod
+    def generate(event_id: int, layout: SeatMapLayout) -> Iterator[str]:
+        """Insert the layout's seats in chunks, yielding one NDJSON progress line per committed chunk.
+
+        Runs with its own session because the response streams after the request's session is closed.
+        Existing seats are left untouched, so a re-run only fills in what is missing.
+        """
+        total = SeatLayoutService.count(layout)
+        processed = inserted = 0
+        db = SessionLocal()
+        rows = SeatLayoutService.expand(event_id, layout)
+        try:
+            # Counted rather than taken from rowcount, which MySQL reports as 1 for duplicates under CLIENT_FOUND_ROWS
+            existing = seat_crud.count_by_event(db, event_id=event_id)
+            while True:
+                chunk = list(islice(rows, settings.SEAT_GENERATION_CHUNK_SIZE))
+                if not chunk:
+                    break
+                seat_crud.insert_missing(db, rows=chunk)
+                db.commit()
+                inserted = seat_crud.count_by_event(db, event_id=event_id) - existing
+                processed += len(chunk)
+                yield json.dumps({
+                    "processed": processed, "total": total, "inserted": inserted, "skipped": processed - inserted
+                }) + "\n"
+        except Exception as e:
+            db.rollback()
+            yield json.dumps({"error": str(e), "processed": processed, "inserted": inserted}) + "\n"
+            return
+        finally:
+            db.close()
+            seat_map_cache.invalidate(event_id)
+        yield json.dumps({"done": True, "total": total, "inserted": inserted, "skipped": total - inserted}) + "\n"
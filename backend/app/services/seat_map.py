@@ -0,0 +1,154 @@
+import base64
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.seat import Seat, SeatStatus
+
+# Two bits per seat, four seats per byte
+STATE_CODES = {
+    SeatStatus.AVAILABLE: 0,
+    SeatStatus.RESERVED: 1,
+    SeatStatus.BOOKED: 2,
+    SeatStatus.BLOCKED: 3,
+}
+
+def _state_code(status) -> int:
+    if isinstance(status, SeatStatus):
+        return STATE_CODES[status]
+    try:
+        return STATE_CODES[SeatStatus(str(status).lower())]
+    except ValueError:
+        return STATE_CODES[SeatStatus.BLOCKED]
+
+class EventSeatMap:
+    """Packed availability for one event's seats, ordered by section, row and seat number"""
+
+    def __init__(self, event_id: int, rows: List[Tuple]):
+        self.event_id = event_id
+        self.seat_ids = [row[0] for row in rows]
+        self.index = {seat_id: i for i, seat_id in enumerate(self.seat_ids)}
+        self.layout = self._build_layout(rows)
+        self.layout_id = zlib.crc32(",".join(map(str, self.seat_ids)).encode())
+        self.states = bytearray((len(rows) + 3) // 4)
+        for i, row in enumerate(rows):
+            self._set(i, _state_code(row[4]))
+        self.version = 1
+        # Change log for delta requests: (version, seat index, state code)
+        self.changes = deque(maxlen=settings.SEAT_MAP_MAX_CHANGES)
+        self.min_version = self.version
+        self.loaded_at = time.monotonic()
+
+    @property
+    def seat_count(self) -> int:
+        return len(self.seat_ids)
+
+    @staticmethod
+    def _build_layout(rows: List[Tuple]) -> List[dict]:
+        """Rows as runs of consecutive seat numbers: {section, row, seats: [[first, last], ...]}"""
+        layout = []
+        for _, section, row_label, seat_number, _ in rows:
+            if not layout or layout[-1]["section"] != section or layout[-1]["row"] != row_label:
+                layout.append({"section": section, "row": row_label, "seats": []})
+            runs = layout[-1]["seats"]
+            if runs and runs[-1][1] == seat_number - 1:
+                runs[-1][1] = seat_number
+            else:
+                runs.append([seat_number, seat_number])
+        return layout
+
+    def _get(self, i: int) -> int:
+        return (self.states[i >> 2] >> ((i & 3) * 2)) & 3
+
+    def _set(self, i: int, code: int) -> None:
+        shift = (i & 3) * 2
+        self.states[i >> 2] = (self.states[i >> 2] & ~(3 << shift)) | (code << shift)
+
+    def apply(self, seat_codes: Dict[int, int]) -> None:
+        """Record new state codes for seats and bump the version if anything changed"""
+        changed = [
+            (self.index[seat_id], code)
+            for seat_id, code in seat_codes.items()
+            if seat_id in self.index and self._get(self.index[seat_id]) != code
+        ]
+        if not changed:
+            return
+        self.version += 1
+        if len(self.changes) + len(changed) > self.changes.maxlen:
+            # Older deltas fall off the log; clients behind this point get the full map
+            self.changes.clear()
+            self.min_version = self.version - 1 if len(changed) <= self.changes.maxlen else self.version
+        for i, code in changed:
+            self._set(i, code)
+            self.changes.append((self.version, i, code))
+
+    def packed_states(self) -> str:
+        return base64.b64encode(bytes(self.states)).decode("ascii")
+
+    def changes_since(self, version: int) -> Optional[List[List[int]]]:
+        """Changes after `version`, or None when the log cannot answer and a full map is needed"""
+        if version > self.version or version < self.min_version:
+            return None
+        return [[i, code] for v, i, code in self.changes if v > version]
+
+class SeatMapCache:
+    """In-process seat maps per event, patched by bookings and holds and refreshed periodically"""
+
+    def __init__(self):
+        self._maps: Dict[int, EventSeatMap] = {}
+        self._stale = set()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, event_id: int) -> EventSeatMap:
+        seat_map = self._maps.get(event_id)
+        if (
+            seat_map is None
+            or event_id in self._stale
+            or time.monotonic() - seat_map.loaded_at > settings.SEAT_MAP_REFRESH_SECONDS
+        ):
+            seat_map = self._load(db, event_id)
+        return seat_map
+
+    def _load(self, db: Session, event_id: int) -> EventSeatMap:
+        rows = db.query(
+            Seat.seat_id, Seat.section, Seat.row_label, Seat.seat_number, Seat.status
+        ).filter(
+            Seat.event_id == event_id
+        ).order_by(
+            Seat.section, Seat.row_label, Seat.seat_number
+        ).all()
+        fresh = EventSeatMap(event_id, rows)
+
+        with self._lock:
+            self._stale.discard(event_id)
+            current = self._maps.get(event_id)
+            if current is not None and current.layout_id == fresh.layout_id:
+                # Same seats: keep the version history and log the differences as a new version
+                current.apply({row[0]: _state_code(row[4]) for row in rows})
+                current.loaded_at = fresh.loaded_at
+                return current
+            if current is not None:
+                fresh.version = current.version + 1
+                fresh.min_version = fresh.version
+            self._maps[event_id] = fresh
+            return fresh
+
+    def apply(self, event_id: int, seat_states: Dict[int, SeatStatus]) -> None:
+        """Patch a loaded map after seats change state"""
+        with self._lock:
+            seat_map = self._maps.get(event_id)
+            if seat_map is not None:
+                seat_map.apply({seat_id: _state_code(s) for seat_id, s in seat_states.items()})
+
+    def invalidate(self, event_id: Optional[int] = None) -> None:
+        """Force a reload on next read, for one event or all of them"""
+        with self._lock:
+            if event_id is None:
+                self._stale.update(self._maps)
+            else:
+                self._stale.add(event_id)
+
+seat_map_cache = SeatMapCache()
@@ -0,0 +1,203 @@
+import math
+import secrets
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_redis
+
+class WaitingRoomStore:
+    """Per-event admission schedule (GCRA): each join reserves the next slot, `interval` seconds after the last"""
+
+    def schedule(self, event_id: int, now: float, interval: float, burst: int) -> float:
+        """Reserve the next admission slot for an event and return its time"""
+        raise NotImplementedError
+
+    def consume(self, token_id: str, expires_at: float) -> bool:
+        """Mark a single-use admission as spent until it expires; False if it already was"""
+        raise NotImplementedError
+
+    def restore(self, token_id: str) -> None:
+        """Make a spent admission usable again after the order it was spent on failed"""
+        raise NotImplementedError
+
+class MemoryWaitingRoomStore(WaitingRoomStore):
+    """Schedule kept in this process; use the Redis store when running several workers"""
+
+    def __init__(self, max_spent: int = 100000):
+        self.max_spent = max_spent
+        self._next_slot: Dict[int, float] = {}
+        self._spent: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, event_id: int, now: float, interval: float, burst: int) -> float:
+        with self._lock:
+            # An idle queue banks at most `burst` slots
+            slot = max(self._next_slot.get(event_id, 0.0), now - burst * interval)
+            self._next_slot[event_id] = slot + interval
+        return max(slot, now)
+
+    def consume(self, token_id: str, expires_at: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._spent.get(token_id, 0.0) > now:
+                return False
+            self._spent[token_id] = expires_at
+            if len(self._spent) > self.max_spent:
+                # Expired admissions are rejected by their signature anyway
+                self._spent = {k: t for k, t in self._spent.items() if t > now}
+        return True
+
+    def restore(self, token_id: str) -> None:
+        with self._lock:
+            self._spent.pop(token_id, None)
+
+class RedisWaitingRoomStore(WaitingRoomStore):
+    """Schedule shared through Redis; the slot is reserved atomically by a Lua script"""
+
+    SCRIPT = """
+local slot = math.max(tonumber(redis.call('GET', KEYS[1]) or '0'), ARGV[1] - ARGV[3] * ARGV[2])
+redis.call('SET', KEYS[1], tostring(slot + ARGV[2]), 'EX', ARGV[4])
+return tostring(slot)
+"""
+
+    def __init__(self, client: Any = None, prefix: str = ""):
+        self.client = client if client is not None else get_redis()
+        self.prefix = prefix
+        self._script = self.client.register_script(self.SCRIPT)
+
+    def schedule(self, event_id: int, now: float, interval: float, burst: int) -> float:
+        slot = float(self._script(
+            keys=[f"{self.prefix}waiting_room:{event_id}"],
+            args=[now, interval, burst, settings.WAITING_ROOM_ADMISSION_TTL_SECONDS + 86400]
+        ))
+        return max(slot, now)
+
+    def consume(self, token_id: str, expires_at: float) -> bool:
+        ttl = max(math.ceil(expires_at - time.time()), 1)
+        return bool(self.client.set(f"{self.prefix}waiting_room:spent:{token_id}", 1, nx=True, ex=ttl))
+
+    def restore(self, token_id: str) -> None:
+        self.client.delete(f"{self.prefix}waiting_room:spent:{token_id}")
+
+def build_waiting_room_store() -> WaitingRoomStore:
+    if settings.WAITING_ROOM_BACKEND == "redis":
+        return RedisWaitingRoomStore(prefix=settings.CACHE_KEY_PREFIX)
+    return MemoryWaitingRoomStore()
+
+waiting_room_store = build_waiting_room_store()
+_counts = Counter()
+metrics.register("waiting_room", lambda: {"enabled": settings.WAITING_ROOM_ENABLED, **_counts})
+
+class WaitingRoomService:
+    """Virtual queue in front of POST /orders; queue and admission tokens are signed, so no per-buyer state is kept"""
+
+    @staticmethod
+    def _interval(event_id: int) -> float:
+        rate = settings.WAITING_ROOM_EVENT_RATES.get(str(event_id), settings.WAITING_ROOM_ADMIT_PER_SECOND)
+        return 1.0 / rate
+
+    @staticmethod
+    def _encode(claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, settings.WAITING_ROOM_SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    @staticmethod
+    def _decode(token: Optional[str], token_type: str, event_id: int) -> Optional[Dict[str, Any]]:
+        if not token:
+            return None
+        try:
+            claims = jwt.decode(token, settings.WAITING_ROOM_SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        if claims.get("type") != token_type or claims.get("evt") != event_id:
+            return None
+        return claims
+
+    @staticmethod
+    def _status(event_id: int, queue_token: str, claims: Dict[str, Any]) -> dict:
+        now = time.time()
+        wait = max(claims["admit_at"] - now, 0.0)
+        admission_token = None
+        if wait == 0:
+            _counts["admitted"] += 1
+            # One queue slot, one order: every admission token issued for a slot shares its id
+            admission_token = WaitingRoomService._encode({
+                "type": "admission", "evt": event_id, "sub": claims["sub"], "jti": claims["sub"], "exp": claims["exp"]
+            })
+        return {
+            "event_id": event_id,
+            "queue_token": queue_token,
+            "position": math.ceil(wait / WaitingRoomService._interval(event_id)),
+            "eta_seconds": round(wait, 1),
+            "admitted": admission_token is not None,
+            "admission_token": admission_token,
+            "expires_at": datetime.utcfromtimestamp(claims["exp"])
+        }
+
+    @staticmethod
+    def join(event_id: int) -> dict:
+        """Take the next admission slot for an event"""
+        now = time.time()
+        admit_at = waiting_room_store.schedule(
+            event_id, now, WaitingRoomService._interval(event_id), settings.WAITING_ROOM_BURST
+        )
+        claims = {
+            "type": "queue",
+            "evt": event_id,
+            "sub": secrets.token_urlsafe(12),
+            "admit_at": admit_at,
+            "exp": math.ceil(admit_at) + settings.WAITING_ROOM_ADMISSION_TTL_SECONDS
+        }
+        _counts["joined"] += 1
+        return WaitingRoomService._status(event_id, WaitingRoomService._encode(claims), claims)
+
+    @staticmethod
+    def status(event_id: int, queue_token: str) -> dict:
+        """Position and ETA for a queue token, with an admission token once its slot has opened"""
+        claims = WaitingRoomService._decode(queue_token, "queue", event_id)
+        if claims is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired queue token; join the queue again"
+            )
+        return WaitingRoomService._status(event_id, queue_token, claims)
+
+    @staticmethod
+    def require_admission(event_id: int, admission_token: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Reject order requests without a valid admission token for the event while the waiting room is on.
+
+        Returns the admission's claims (None while the waiting room is off) for `consume_admission`.
+        """
+        if not settings.WAITING_ROOM_ENABLED:
+            return None
+        claims = WaitingRoomService._decode(admission_token, "admission", event_id)
+        if claims is None or not claims.get("jti"):
+            _counts["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="A valid admission token from the waiting room is required"
+            )
+        return claims
+
+    @staticmethod
+    def consume_admission(admission: Optional[Dict[str, Any]]) -> None:
+        """Spend a single-use admission; a token that was already used (or shared) gets 403"""
+        if admission is None:
+            return
+        if not waiting_room_store.consume(admission["jti"], admission["exp"]):
+            _counts["reused"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="This admission token has already been used; join the queue again"
+            )
+
+    @staticmethod
+    def restore_admission(admission: Optional[Dict[str, Any]]) -> None:
+        """Give back an admission whose order was not created, so the buyer can retry with it"""
+        if admission is not None:
+            waiting_room_store.restore(admission["jti"])
@@ -1,9 +1,20 @@
+import base64
+import binascii
+import json
 import math
-from typing import Any, Iterable
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional, Sequence
 
+from fastapi import HTTPException, status
+from sqlalchemy import String, and_, literal, or_
+from sqlalchemy.orm import Query
 
-def paginate(items: Iterable[Any], total: int, page: int, size: int) -> dict:
-    pages = math.ceil(total / size) if size else 0
+
+def paginate(items: Iterable[Any], total: Optional[int], page: int, size: int) -> dict:
+    if total is None:
+        pages = None
+    else:
+        pages = math.ceil(total / size) if size else 0
     return {
         "items": list(items),
         "total": total,
@@ -11,3 +22,74 @@ def paginate(items: Iterable[Any], total: int, page: int, size: int) -> dict:
         "size": size,
         "pages": pages,
     }
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last row on a page"""
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor back into typed values for the given sort columns"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort key")
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def _coerce(column: Any, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        # Bind timestamps in the "YYYY-MM-DD HH:MM:SS" form CURRENT_TIMESTAMP writes, so SQLite's
+        # text comparison agrees with MySQL's
+        return literal(datetime.fromisoformat(value).isoformat(sep=" "), String)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def _seek(columns: Sequence[Any], values: Sequence[Any], descending: bool):
+    # (a, b) < (x, y) spelled out as a < x OR (a = x AND b < y) so every branch can use the index
+    clauses = []
+    for i, column in enumerate(columns):
+        compare = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[columns[j] == values[j] for j in range(i)], compare))
+    return or_(*clauses)
+
+
+def keyset_paginate(
+    query: Query,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    size: int,
+    descending: bool = True,
+    with_total: bool = False,
+) -> dict:
+    """Seek-based page of `query` ordered by `columns`; the last column must be unique"""
+    total = query.order_by(None).count() if with_total else None
+    if cursor:
+        query = query.filter(_seek(columns, decode_cursor(cursor, columns), descending))
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    items = query.order_by(*order_by).limit(size + 1).all()
+
+    next_cursor = None
+    if len(items) > size:
+        items = items[:size]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in columns])
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "size": size,
+        "total": total,
+    }
@@ -1,15 +1,121 @@
-from datetime import datetime
-import random
-import string
+import os
+import secrets
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+from app.core.config import settings
+
+# Crockford base32: no I, L, O or U, so codes survive being read aloud or typed from paper
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_VALUES = {char: value for value, char in enumerate(ALPHABET)}
+
+# Snowflake layout: 41 bits of milliseconds since EPOCH_MS, 10 bits of node id, 12 bits of sequence
+EPOCH_MS = 1735689600000  # 2025-01-01T00:00:00Z
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE_ID = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+ID_LENGTH = 13  # 63 bits in base32
+
+# (current node id or None, holder) -> a node id leased to that holder
+NodeLease = Callable[[Optional[int], str], int]
+
+def check_character(payload: str) -> str:
+    """Luhn mod 32 check character; catches every single-character error and every adjacent swap except 0 <-> Z"""
+    factor = 2
+    total = 0
+    for char in reversed(payload):
+        addend = factor * _VALUES[char]
+        total += addend // 32 + addend % 32
+        factor = 3 - factor
+    return ALPHABET[(32 - total % 32) % 32]
+
+def has_valid_check_character(code: str) -> bool:
+    """Whether the part after the prefix is a well-formed id with a matching check character"""
+    body = code.rpartition("-")[2].upper()
+    if len(body) != ID_LENGTH + 1 or any(char not in _VALUES for char in body):
+        return False
+    return check_character(body[:-1]) == body[-1]
+
+def is_generated_code(code: str) -> bool:
+    """Codes from CodeGenerator, as opposed to the older TKT-<timestamp>-<random> format"""
+    return code.count("-") == 1
+
+class CodeGenerator:
+    """Compact, time-ordered, collision-free ids: one node id per process, a sequence per millisecond.
+
+    Ids are only unique while no two processes share a node id, so the app hands the generator a lease
+    (see use_lease); without one it uses the given node id, or a random one, which suits a single process.
+    """
+
+    def __init__(self, node_id: Optional[int] = None):
+        self._configured_node_id = node_id
+        self._lease: Optional[NodeLease] = None
+        self._lease_seconds = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        # Also runs in a forked child, which must not reuse its parent's node id, holder or (possibly held) lock
+        self._lock = threading.Lock()
+        self.holder = uuid.uuid4().hex
+        self._lease_deadline = 0.0
+        if self._lease is not None:
+            self.node_id = None
+        elif self._configured_node_id is None:
+            self.node_id = secrets.randbelow(MAX_NODE_ID + 1)
+        else:
+            self.node_id = self._configured_node_id & MAX_NODE_ID
+        self._last_ms = -1
+        self._sequence = 0
+
+    def use_lease(self, lease: NodeLease, lease_seconds: int) -> None:
+        """Take node ids from `lease`, leased for `lease_seconds` and renewed before half of that has passed"""
+        self._lease = lease
+        self._lease_seconds = lease_seconds
+        self._reset()
+
+    def _renew(self) -> None:
+        started = time.monotonic()
+        self.node_id = self._lease(self.node_id, self.holder)
+        self._lease_deadline = started + self._lease_seconds / 2
+
+    def renew(self) -> Optional[int]:
+        """Renew (or first take) the lease ahead of minting; returns the node id"""
+        with self._lock:
+            if self._lease is not None:
+                self._renew()
+            return self.node_id
+
+    def next_id(self) -> int:
+        with self._lock:
+            if self._lease is not None and time.monotonic() >= self._lease_deadline:
+                # The background renewal fell behind: never mint on a lease that may have lapsed
+                self._renew()
+            now_ms = max(int(time.time() * 1000) - EPOCH_MS, self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted: borrow the next millisecond instead of sleeping
+                    now_ms += 1
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return (now_ms << (NODE_BITS + SEQUENCE_BITS)) | (self.node_id << SEQUENCE_BITS) | self._sequence
+
+    def next_code(self, prefix: str) -> str:
+        value = self.next_id()
+        payload = "".join(ALPHABET[(value >> shift) & 31] for shift in range(5 * (ID_LENGTH - 1), -1, -5))
+        return f"{prefix}-{payload}{check_character(payload)}"
+
+code_generator = CodeGenerator(settings.CODE_NODE_ID)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=code_generator._reset)
 
 def generate_ticket_code() -> str:
     """Generate unique ticket code"""
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-    return f"TKT-{timestamp}-{random_str}"
+    return code_generator.next_code("TKT")
 
 def generate_order_number() -> str:
     """Generate unique order number"""
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"ORD-{timestamp}-{random_str}"
+    return code_generator.next_code("ORD")
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import anyio.to_thread
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.crud.async_crud import async_event
+from app.crud.event import event as event_crud
+
+REQUESTS = 300
+CONCURRENCY = 50
+
+
+def list_events_sync():
+    db = SessionLocal()
+    try:
+        events, total = event_crud.get_page_with_total(db, limit=20)
+        return tuple(e.event_id for e in events), total
+    finally:
+        db.close()
+
+
+async def list_events_async():
+    async with AsyncSessionLocal() as db:
+        events, total = await async_event.get_page_with_total(db, limit=20)
+        return tuple(e.event_id for e in events), total
+
+
+async def benchmark(handler):
+    """Requests per second for `handler` at CONCURRENCY, plus the most threadpool workers it held at once"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    busy = 0
+    done = asyncio.Event()
+
+    async def sample():
+        nonlocal busy
+        while not done.is_set():
+            busy = max(busy, limiter.borrowed_tokens)
+            await asyncio.sleep(0)
+
+    gate = asyncio.Semaphore(CONCURRENCY)
+
+    async def request():
+        async with gate:
+            return await handler()
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    results = await asyncio.gather(*(request() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    return results, REQUESTS / elapsed, busy
+
+
+def test_async_listing_runs_without_threadpool_workers(client, make_event, record_property):
+    """Requests-per-second benchmark of the event listing through the sync session (threadpool) and the async one"""
+    for _ in range(3):
+        make_event()
+
+    async def run():
+        sync = await benchmark(lambda: run_in_threadpool(list_events_sync))
+        async_ = await benchmark(list_events_async)
+        return sync, async_
+
+    (sync_results, sync_rps, sync_busy), (async_results, async_rps, async_busy) = asyncio.run(run())
+
+    assert set(sync_results) == set(async_results) and len(set(async_results)) == 1
+    assert sync_busy > 0
+    # The async driver does its I/O off the event loop without borrowing a threadpool worker, so sync endpoints keep them all
+    assert async_busy == 0
+    record_property("sync_requests_per_second", round(sync_rps))
+    record_property("async_requests_per_second", round(async_rps))
+    record_property("sync_threadpool_workers", sync_busy)
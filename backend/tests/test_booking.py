@@ -0,0 +1,79 @@
+import threading
+
+from fastapi import HTTPException
+
+from app.core.database import SessionLocal
+from app.models.event import Event
+from app.models.order import Order
+from app.models.ticket_type import TicketType
+from app.services.booking import BookingService
+from conftest import order_payload
+
+
+def test_ticket_types_and_seats_of_another_event_are_not_found(client, make_event, make_seats, db):
+    event_id, _ = make_event({"GA": 10})
+    other_event_id, other_tiers = make_event({"VIP": 10})
+    (other_seat,) = make_seats(other_event_id, 1)
+
+    for item in ({"ticket_type_id": other_tiers["VIP"], "quantity": 1}, {"seat_id": other_seat}):
+        response = client.post("/api/v1/orders/", json=order_payload(event_id, [item]))
+        assert response.status_code == 404
+    assert db.query(Order).filter(Order.event_id == event_id).count() == 0
+
+
+def test_admin_cancellation_releases_inventory(client, make_event, make_seats):
+    event_id, tiers = make_event({"GA": 2})
+    (seat_id,) = make_seats(event_id, 1)
+    response = client.post("/api/v1/orders/", json=order_payload(
+        event_id, [{"ticket_type_id": tiers["GA"], "quantity": 2}, {"seat_id": seat_id}]
+    ))
+    order_id = response.json()["order_id"]
+
+    response = client.put(f"/api/v1/admin/orders/{order_id}/status", params={"order_status": "cancelled"})
+    assert response.status_code == 200
+    assert response.json()["order_status"] == "cancelled"
+    (tier,) = client.get(f"/api/v1/events/{event_id}/ticket-types").json()
+    assert tier["quantity_sold"] == 0
+    (seat,) = client.get(f"/api/v1/events/{event_id}/seats").json()
+    assert seat["status"] == "available"
+    stats = client.get(f"/api/v1/admin/events/stats/{event_id}").json()
+    assert stats["tickets_sold"] == 0
+
+    response = client.put(f"/api/v1/admin/orders/{order_id}/status", params={"order_status": "confirmed"})
+    assert response.status_code == 400
+
+
+def test_concurrent_cancellations_release_inventory_once(client, make_event, db):
+    event_id, tiers = make_event({"GA": 10})
+    order_ids = []
+    for _ in range(2):
+        response = client.post("/api/v1/orders/", json=order_payload(
+            event_id, [{"ticket_type_id": tiers["GA"], "quantity": 2}]
+        ))
+        order_ids.append(response.json()["order_id"])
+
+    # A customer and an admin cancel the first order at the same moment, and then once more
+    start = threading.Barrier(4)
+    outcomes = []
+
+    def cancel():
+        session = SessionLocal()
+        try:
+            start.wait()
+            BookingService.cancel_order(db=session, order_id=order_ids[0])
+            outcomes.append("cancelled")
+        except HTTPException as e:
+            outcomes.append(e.status_code)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=cancel) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes, key=str) == [400, 400, 400, "cancelled"]
+    # Only the first order's two tickets come back; the second order keeps its two
+    assert db.get(TicketType, tiers["GA"]).quantity_sold == 2
+    assert db.get(Event, event_id).tickets_sold == 2
@@ -0,0 +1,81 @@
+from app.core.cache import MemoryCache, RedisCache
+from app.core.config import settings
+
+
+class FakeRedis:
+    """Just enough of a Redis client for RedisCache, shared between caches like one server"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def pipeline(self):
+        client = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def set(self, *args, **kwargs):
+                self.calls.append((args, kwargs))
+
+            def execute(self):
+                for args, kwargs in self.calls:
+                    client.set(*args, **kwargs)
+
+        return Pipeline()
+
+
+class DownRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis is down")
+        return fail
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+
+
+def test_invalidation_on_one_worker_is_seen_by_all():
+    server = FakeRedis()
+    worker_a, worker_b = RedisCache(client=server, prefix="t:"), RedisCache(client=server, prefix="t:")
+    worker_a.set("event:1", "old")
+    assert worker_b.get("event:1") == "old"
+    worker_b.delete("event:1")
+    assert worker_a.get("event:1") is None
+
+
+def test_stale_reload_after_invalidation_is_not_cached_with_replicas(monkeypatch):
+    monkeypatch.setattr(settings, "SQLALCHEMY_REPLICA_URIS", ["sqlite:///replica.db"])
+    server = FakeRedis()
+    writer, reader = RedisCache(client=server), RedisCache(client=server)
+    writer.delete("event:1")
+    # The other worker reloads from a replica that may not have the write yet
+    reader.set("event:1", "possibly stale")
+    assert reader.get("event:1") is None
+
+
+def test_redis_outage_degrades_to_misses():
+    cache = RedisCache(client=DownRedis())
+    cache.set("event:1", "body")
+    cache.delete("event:1")
+    assert cache.get("event:1") is None
+    assert cache.stats()["errors"] == 3
@@ -0,0 +1,102 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.core.database import SessionLocal
+from app.models.ticket import Ticket, TicketStatus
+from app.services.checkin import CheckInResult, CheckInService, gate_metrics
+
+
+def test_earlier_offline_scan_of_a_used_ticket_is_a_duplicate(client, make_event, buy_tickets, db):
+    event_id, tiers = make_event({"GA": 10})
+    (code,) = buy_tickets(event_id, tiers["GA"])
+    online = client.post("/api/v1/tickets/checkin", json={"ticket_code": code, "event_id": event_id})
+    assert online.status_code == 200
+
+    # An offline gate syncs a scan from an hour before the online admission
+    earlier = (datetime.utcnow() - timedelta(hours=1)).replace(microsecond=0)
+    response = client.post("/api/v1/tickets/checkin/batch", json={
+        "event_id": event_id,
+        "gate_id": "offline",
+        "scans": [{"ticket_code": code, "scanned_at": earlier.isoformat()}],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["admitted"], body["duplicate"]) == (0, 1)
+    assert body["results"][0]["result"] == "duplicate"
+
+    # The earliest entry is still the recorded one
+    ticket = db.query(Ticket).filter(Ticket.ticket_code == code).one()
+    assert ticket.status == TicketStatus.USED and ticket.checked_in_at == earlier
+
+
+def test_codes_issued_by_another_worker_are_admitted(client, make_event, buy_tickets):
+    from app.services.checkin import _code_hash, ticket_code_index
+
+    event_id, tiers = make_event({"GA": 10})
+    (first,) = buy_tickets(event_id, tiers["GA"])
+    assert client.post("/api/v1/tickets/checkin", json={"ticket_code": first, "event_id": event_id}).status_code == 200
+
+    # Sold elsewhere after this worker loaded the event's index, so the index has never seen it
+    (second,) = buy_tickets(event_id, tiers["GA"])
+    ticket_code_index._events[event_id].added.discard(_code_hash(second))
+
+    response = client.post("/api/v1/tickets/checkin", json={"ticket_code": second, "event_id": event_id})
+    assert response.status_code == 200, response.text
+    assert _code_hash(second) in ticket_code_index._events[event_id].added
+
+
+def test_double_scan_admits_once(client, make_event, buy_tickets, db):
+    event_id, tiers = make_event({"GA": 10})
+    first, second = buy_tickets(event_id, tiers["GA"], quantity=2)
+
+    # One after the other: the second scan finds the ticket no longer active
+    scan = {"ticket_code": first, "event_id": event_id}
+    assert client.post("/api/v1/tickets/checkin", json=scan).status_code == 200
+    assert client.post("/api/v1/tickets/checkin", json=scan).status_code == 400
+
+    # Eight gates scan the same ticket at the same moment: the conditional UPDATE admits exactly one
+    start = threading.Barrier(8)
+    results = []
+
+    def scan_at_gate():
+        session = SessionLocal()
+        try:
+            start.wait()
+            results.append(CheckInService.check_in(session, second, event_id=event_id)[0])
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=scan_at_gate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [CheckInResult.ADMITTED] + [CheckInResult.DUPLICATE] * 7
+    ticket = db.query(Ticket).filter(Ticket.ticket_code == second).one()
+    assert ticket.status == TicketStatus.USED
+
+
+def test_scans_are_counted_per_gate(client, make_event, buy_tickets):
+    event_id, tiers = make_event({"GA": 10})
+    first, second, third = buy_tickets(event_id, tiers["GA"], quantity=3)
+    north, south = f"north-{event_id}", f"south-{event_id}"
+
+    for code in (first, first, "NOT-A-CODE"):
+        client.post("/api/v1/tickets/checkin", json={"ticket_code": code, "event_id": event_id, "gate_id": north})
+    now = datetime.utcnow().isoformat()
+    response = client.post("/api/v1/tickets/checkin/batch", json={
+        "event_id": event_id,
+        "gate_id": south,
+        "scans": [{"ticket_code": code, "scanned_at": now} for code in (second, third, second)],
+    })
+    assert response.status_code == 200
+
+    gates = gate_metrics.snapshot()
+    assert {key: gates[north][key] for key in ("scans", "admitted", "duplicate", "unknown")} == {
+        "scans": 3, "admitted": 1, "duplicate": 1, "unknown": 1
+    }
+    assert {key: gates[south][key] for key in ("scans", "admitted", "duplicate", "unknown")} == {
+        "scans": 3, "admitted": 2, "duplicate": 1, "unknown": 0
+    }
+    assert gates[north]["latency_ms_max"] >= gates[north]["latency_ms_avg"] > 0
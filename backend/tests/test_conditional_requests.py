@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app.crud.seat import seat as seat_crud
+from app.models.seat import Seat, SeatStatus
+
+
+def test_missing_event_is_404_even_when_revalidating(client):
+    response = client.get("/api/v1/events/987654/seats", headers={"If-None-Match": 'W/"0000000000000000"'})
+    assert response.status_code == 404
+
+
+def test_seat_list_revalidates_with_304(client, make_event, make_seats):
+    event_id, _ = make_event()
+    make_seats(event_id, 3)
+    first = client.get(f"/api/v1/events/{event_id}/seats")
+    etag = first.headers["ETag"]
+    assert client.get(f"/api/v1/events/{event_id}/seats", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_checksum_tells_apart_changes_within_one_second(client, make_event, make_seats, db):
+    event_id, _ = make_event()
+    first, middle, last = make_seats(event_id, 3)
+    stamp = datetime(2030, 1, 1, 12, 0, 0)
+
+    def version(states):
+        for seat_id, state in states.items():
+            db.query(Seat).filter(Seat.seat_id == seat_id).update({Seat.status: state, Seat.updated_at: stamp})
+        db.commit()
+        return seat_crud.get_version(db, event_id=event_id)
+
+    # Same count and timestamp, and the same sum of seat_id * state code (reserved = 1, booked = 2)
+    before = version({first: SeatStatus.RESERVED, middle: SeatStatus.AVAILABLE, last: SeatStatus.RESERVED})
+    after = version({first: SeatStatus.AVAILABLE, middle: SeatStatus.BOOKED, last: SeatStatus.AVAILABLE})
+    assert before[:2] == after[:2]
+    assert before != after
@@ -0,0 +1,111 @@
+import time
+from contextlib import contextmanager
+from datetime import date, time as clock, timedelta
+
+from sqlalchemy import event, insert
+
+from app.core.database import engine
+from app.crud.event import event as event_crud
+from app.models.event import Event
+
+CITY = "Benchmark City"
+EVENTS = 5000
+PAGE = 20
+ROUNDS = 20
+
+
+@contextmanager
+def database_time():
+    """Statements run on the sync engine in the block and the seconds spent executing them"""
+    stats = {"statements": 0, "seconds": 0.0}
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        stats["statements"] += 1
+        stats["seconds"] += time.perf_counter() - conn.info.pop("query_started")
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    try:
+        yield stats
+    finally:
+        event.remove(engine, "before_cursor_execute", before)
+        event.remove(engine, "after_cursor_execute", after)
+
+
+def seed(db):
+    if db.query(Event).filter(Event.city == CITY).count():
+        return
+    first = date(2030, 1, 1)
+    db.execute(insert(Event.__table__), [
+        {
+            "organizer": "Organizer",
+            "title": f"Benchmark {n}",
+            "slug": f"benchmark-{n}",
+            "category": ("concert", "sports", "theater")[n % 3],
+            "venue_name": "Hall",
+            "city": CITY,
+            "event_date": first + timedelta(days=n),
+            "event_time": clock(20),
+            "status": "published",
+        }
+        for n in range(EVENTS)
+    ])
+    db.commit()
+
+
+def page_then_count(db, skip, **filters):
+    """The listing before any change: the page query followed by a COUNT query"""
+    return event_crud.get_multi_with_filters(db, skip=skip, limit=PAGE, **filters), event_crud.count_with_filters(db, **filters)
+
+
+def listing(db, skip, **filters):
+    return event_crud.get_page_with_total(db, skip=skip, limit=PAGE, **filters)
+
+
+def window_count(db, skip, **filters):
+    return event_crud.get_page_with_total(db, skip=skip, limit=PAGE, window_count=True, **filters)
+
+
+def test_listing_database_time(db, record_property):
+    """Listing benchmark over a first page, a deep filtered page and the short last page.
+
+    The default listing must cost less database time than the COUNT(*) OVER() variant, which sorts every matching
+    row, and on the last page less than the old page-then-COUNT listing, since a short page needs no COUNT.
+    """
+    seed(db)
+    cases = {
+        "first": ({"city": CITY}, 0),
+        "deep": ({"city": CITY, "category": "sports"}, 40 * PAGE),
+        "last": ({"city": CITY}, EVENTS - 5),
+    }
+    seconds = {}
+    statements = {}
+    results = {}
+    for strategy in (page_then_count, listing, window_count):
+        for case, (filters, skip) in cases.items():
+            with database_time() as stats:
+                for _ in range(ROUNDS):
+                    events, total = strategy(db, skip, **filters)
+            seconds[strategy.__name__, case] = stats["seconds"]
+            statements[strategy.__name__, case] = stats["statements"] // ROUNDS
+            results[strategy.__name__, case] = ([e.event_id for e in events], total)
+        total_seconds = sum(seconds[strategy.__name__, case] for case in cases)
+        record_property(f"{strategy.__name__}_db_ms_per_page", round(1000 * total_seconds / (len(cases) * ROUNDS), 3))
+
+    for case in cases:
+        assert results["listing", case] == results["window_count", case] == results["page_then_count", case]
+    assert [results["listing", case][1] for case in cases] == [EVENTS, EVENTS // 3 + (EVENTS % 3 > 1), EVENTS]
+    assert [statements["listing", case] for case in cases] == [2, 2, 1]
+    assert all(statements["window_count", case] == 1 for case in cases)
+    assert seconds["listing", "last"] < seconds["page_then_count", "last"]
+    assert sum(seconds["listing", case] for case in cases) < sum(seconds["window_count", case] for case in cases)
+
+
+def test_past_the_last_page_still_reports_the_total(db):
+    seed(db)
+    for strategy in (listing, window_count):
+        events, total = strategy(db, EVENTS + PAGE, city=CITY)
+        assert events == [] and total == EVENTS
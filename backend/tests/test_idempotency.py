@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal
+from app.crud.idempotency_key import idempotency_key as idempotency_crud
+from app.main import app
+from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+from app.models.order import Order
+from app.services.idempotency import IdempotencyService, LeaseLost
+from conftest import order_payload
+
+
+def claim(db, key):
+    return idempotency_crud.claim(
+        db, scope="test", key=key, request_hash="hash", ttl_seconds=60, lease_seconds=30
+    )
+
+
+def expire_lease(db, key):
+    db.query(IdempotencyKey).filter(IdempotencyKey.idempotency_key == key).update(
+        {IdempotencyKey.locked_until: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+
+
+def test_concurrent_duplicates_create_one_order(client, make_event, db):
+    event_id, tiers = make_event({"GA": 100})
+    payload = order_payload(event_id, [{"ticket_type_id": tiers["GA"], "quantity": 1}])
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*[
+                ac.post("/api/v1/orders/", json=payload, headers={"Idempotency-Key": f"burst-{event_id}"})
+                for _ in range(8)
+            ])
+
+    responses = asyncio.run(burst())
+    assert {response.status_code for response in responses} == {201}
+    assert len({response.json()["order_id"] for response in responses}) == 1
+    assert db.query(Order).filter(Order.event_id == event_id).count() == 1
+
+
+def test_only_the_current_lease_holder_can_complete(db):
+    first = claim(db, "fenced")
+    assert first and claim(db, "fenced") is None
+    expire_lease(db, "fenced")
+    record = idempotency_crud.get_by_key(db, scope="test", key="fenced")
+    second = idempotency_crud.take_over(db, record=record, lease_seconds=30)
+    assert second and second != first
+
+    # The overrunning first run neither stores its response nor frees the key
+    assert not idempotency_crud.complete(
+        db, scope="test", key="fenced", lease_token=first, response_status=201, response_body="{}"
+    )
+    idempotency_crud.release(db, scope="test", key="fenced", lease_token=first)
+    record = idempotency_crud.get_by_key(db, scope="test", key="fenced")
+    assert record.status == IdempotencyStatus.IN_PROGRESS and record.lease_token == second
+
+    assert idempotency_crud.complete(
+        db, scope="test", key="fenced", lease_token=second, response_status=201, response_body="{}"
+    )
+
+
+def test_work_of_a_run_that_lost_its_lease_is_rolled_back(db):
+    async def run():
+        async with AsyncSessionLocal() as session:
+
+            def work(sync_db, complete):
+                # The lease lapses and a retry takes the key over while this run is still working
+                with sync_db.get_bind().connect() as other:
+                    other.execute(
+                        IdempotencyKey.__table__.update()
+                        .where(IdempotencyKey.idempotency_key == "overrun")
+                        .values(lease_token="taken-over")
+                    )
+                    other.commit()
+                # Stands in for the order insert
+                sync_db.execute(insert(IdempotencyKey).values(
+                    scope="test",
+                    idempotency_key="side-effect",
+                    request_hash="hash",
+                    status=IdempotencyStatus.IN_PROGRESS,
+                    locked_until=datetime.utcnow(),
+                    lease_token="side-effect",
+                    expires_at=datetime.utcnow() + timedelta(seconds=60)
+                ))
+                try:
+                    complete(sync_db, {"ok": True})
+                except LeaseLost:
+                    sync_db.rollback()
+                    raise
+                sync_db.commit()
+
+            async def execute(complete):
+                return await session.run_sync(work, complete)
+
+            return await IdempotencyService.run(
+                session, scope="test", key="overrun", request_hash="hash", status_code=201, execute=execute
+            )
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(run())
+    assert exc_info.value.status_code == 409
+    assert idempotency_crud.get_by_key(db, scope="test", key="side-effect") is None
+    assert idempotency_crud.get_by_key(db, scope="test", key="overrun").lease_token == "taken-over"
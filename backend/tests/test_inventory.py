@@ -0,0 +1,106 @@
+import statistics
+import threading
+import time
+
+from sqlalchemy import event
+
+from app.core.database import SessionLocal, engine
+from app.crud.ticket_type import ticket_type as ticket_type_crud
+from app.models.ticket_type import TicketType, TicketTypeStatus
+
+
+BUYERS = 2000
+CAPACITY = 500
+
+
+def run_concurrently(workers, action, latencies=None):
+    """Start `workers` threads at once, each calling action(session, index) on its own session and committing.
+
+    When `latencies` is given, each call's time from getting a pooled connection to its commit is appended to it:
+    the time spent contending for the tier's row, not queueing for one of the pool's connections.
+    """
+    start = threading.Barrier(workers)
+    results = []
+
+    def work(index):
+        session = SessionLocal()
+        try:
+            start.wait()
+            session.connection()
+            started = time.perf_counter()
+            results.append(action(session, index))
+            session.commit()
+            if latencies is not None:
+                latencies.append(time.perf_counter() - started)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_flash_sale_reservations_take_exactly_the_capacity(client, make_event, db, record_property):
+    """Thousands of buyers race for a tier four times smaller; the latency spread under that contention is recorded"""
+    _, tiers = make_event({"GA": CAPACITY})
+    ticket_type_id = tiers["GA"]
+    latencies = []
+
+    results = run_concurrently(
+        BUYERS, lambda s, _: ticket_type_crud.reserve(s, ticket_type_id=ticket_type_id, quantity=1), latencies
+    )
+
+    tier = db.get(TicketType, ticket_type_id)
+    assert len(results) == len(latencies) == BUYERS
+    assert results.count(True) == tier.quantity_sold == CAPACITY
+    assert tier.status == TicketTypeStatus.SOLD_OUT
+    cut_points = statistics.quantiles(latencies, n=100)
+    record_property("reserve_p50_ms", round(1000 * cut_points[49], 2))
+    record_property("reserve_p99_ms", round(1000 * cut_points[98], 2))
+
+
+def test_reservations_and_releases_keep_the_counter_exact(client, make_event, db):
+    _, tiers = make_event({"GA": 30}, max_purchase=30)
+    ticket_type_id = tiers["GA"]
+    assert ticket_type_crud.reserve(db, ticket_type_id=ticket_type_id, quantity=30)
+    db.commit()
+
+    def churn(session, index):
+        # Every release frees a ticket that one of the competing reservations may take
+        if index % 2:
+            return "release", ticket_type_crud.release(session, ticket_type_id=ticket_type_id, quantity=1)
+        return "reserve", ticket_type_crud.reserve(session, ticket_type_id=ticket_type_id, quantity=1)
+
+    results = run_concurrently(80, churn)
+
+    released = results.count(("release", True))
+    reserved = results.count(("reserve", True))
+    db.expire_all()
+    tier = db.get(TicketType, ticket_type_id)
+    assert reserved <= released
+    assert tier.quantity_sold == 30 - released + reserved
+    assert (tier.status == TicketTypeStatus.SOLD_OUT) == (tier.quantity_sold == 30)
+
+
+def test_reserve_and_release_hold_the_row_for_one_statement(client, make_event, db):
+    """No read-then-write: each call is a single conditional UPDATE, so the tier's row lock is never held across a round trip"""
+    _, tiers = make_event({"GA": 5})
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert ticket_type_crud.reserve(db, ticket_type_id=tiers["GA"], quantity=5)
+        assert not ticket_type_crud.reserve(db, ticket_type_id=tiers["GA"], quantity=1)
+        assert ticket_type_crud.release(db, ticket_type_id=tiers["GA"], quantity=2)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    db.commit()
+
+    assert len(statements) == 3
+    assert all(statement.lstrip().upper().startswith("UPDATE") for statement in statements)
@@ -0,0 +1,9 @@
+from app.core.config import settings
+from app.core.database import async_engine, engine
+
+
+def test_sync_and_async_pools_are_sized_separately():
+    assert engine.pool.size() == settings.DB_POOL_SIZE
+    assert engine.pool._max_overflow == settings.DB_MAX_OVERFLOW
+    assert async_engine.pool.size() == settings.DB_ASYNC_POOL_SIZE
+    assert async_engine.pool._max_overflow == settings.DB_ASYNC_MAX_OVERFLOW
@@ -0,0 +1,97 @@
+import statistics
+import time
+
+from app.models.user import User
+from app.schemas.order import OrderCreate
+from app.services.booking import BookingService
+from conftest import count_queries, order_payload
+
+
+def place_orders(client, event_id, ticket_type_id, count):
+    orders = []
+    for _ in range(count):
+        response = client.post("/api/v1/orders/", json=order_payload(
+            event_id, [{"ticket_type_id": ticket_type_id, "quantity": 2}]
+        ))
+        assert response.status_code == 201, response.text
+        orders.append(response.json())
+    return orders
+
+
+def listing_queries(client, path, **params):
+    with count_queries() as statements:
+        response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+def test_order_listings_do_not_grow_with_the_page(client, make_event):
+    event_id, tiers = make_event({"GA": 100})
+    place_orders(client, event_id, tiers["GA"], 1)
+    paths = [("/api/v1/orders/", {}), ("/api/v1/orders/", {"cursor": ""}), ("/api/v1/admin/orders", {})]
+    before = [listing_queries(client, path, size=20, **params) for path, params in paths]
+
+    place_orders(client, event_id, tiers["GA"], 5)
+    after = [listing_queries(client, path, size=20, **params) for path, params in paths]
+
+    assert after == before
+
+
+def test_single_order_reads_load_items_in_one_query(client, make_event):
+    event_id, tiers = make_event({"GA": 10})
+    order = place_orders(client, event_id, tiers["GA"], 1)[0]
+
+    for path in (f"/api/v1/orders/{order['order_id']}", f"/api/v1/orders/number/{order['order_number']}"):
+        with count_queries() as statements:
+            response = client.get(path)
+        assert response.status_code == 200, response.text
+        assert len(response.json()["order_items"]) == 1
+        # The order, then its items
+        assert len(statements) == 2, statements
+
+
+def book(db, event_id, items):
+    """Create an order through BookingService on the sync engine; returns the statements it ran"""
+    user_id = db.query(User.user_id).order_by(User.user_id).first()[0]
+    order_in = OrderCreate(**order_payload(event_id, items))
+    with count_queries() as statements:
+        BookingService.create_order(db=db, user_id=user_id, order_in=order_in)
+    return statements
+
+
+def test_order_creation_does_not_grow_with_the_basket(client, make_event, make_seats, db):
+    event_id, tiers = make_event({"GA": 100, "VIP": 100})
+    seat_ids = make_seats(event_id, 11)
+
+    one_ticket = book(db, event_id, [{"ticket_type_id": tiers["GA"], "quantity": 1}])
+    ten_tickets = book(db, event_id, [{"ticket_type_id": tiers["GA"], "quantity": 10}])
+    ten_items = book(db, event_id, [{"ticket_type_id": tiers["GA"], "quantity": 1}] * 10)
+    assert len(one_ticket) == len(ten_tickets) == len(ten_items), (one_ticket, ten_tickets)
+
+    one_seat = book(db, event_id, [{"seat_id": seat_ids[0]}])
+    ten_seats = book(db, event_id, [{"seat_id": seat_id} for seat_id in seat_ids[1:]])
+    assert len(one_seat) == len(ten_seats), (one_seat, ten_seats)
+
+    # Each further tier costs its one reservation UPDATE
+    two_tiers = book(db, event_id, [{"ticket_type_id": tier_id, "quantity": 1} for tier_id in tiers.values()])
+    assert len(two_tiers) == len(one_ticket) + 1
+
+
+def test_order_latency_stays_flat_as_the_basket_grows(client, make_event, db, record_property):
+    """Orders of 1, 10 and 50 tickets, 30 each; p50 and p99 per basket size are recorded"""
+    sizes, orders = (1, 10, 50), 30
+    event_id, tiers = make_event({"GA": sum(sizes) * orders}, max_purchase=max(sizes))
+    medians = {}
+    for size in sizes:
+        latencies = []
+        for _ in range(orders):
+            started = time.perf_counter()
+            book(db, event_id, [{"ticket_type_id": tiers["GA"], "quantity": size}])
+            latencies.append(time.perf_counter() - started)
+        cut_points = statistics.quantiles(latencies, n=100)
+        medians[size] = cut_points[49]
+        record_property(f"order_{size}_p50_ms", round(cut_points[49] * 1000, 2))
+        record_property(f"order_{size}_p99_ms", round(cut_points[98] * 1000, 2))
+
+    # The statement count is fixed, so a fifty-ticket basket only adds the rows' own cost
+    assert medians[50] < 3 * medians[1]
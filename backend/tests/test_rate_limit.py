@@ -0,0 +1,72 @@
+import asyncio
+import ipaddress
+
+import pytest
+
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimitStore, RateLimitMiddleware, client_address
+from app.core.security import create_access_token
+
+PROXIES = [ipaddress.ip_network("10.0.0.0/8")]
+
+
+def scope_for(peer, forwarded=None, token=None):
+    headers = []
+    if forwarded:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": f"{settings.API_V1_STR}/events/1/seats",
+        "client": (peer, 12345),
+        "headers": headers,
+    }
+
+
+@pytest.mark.parametrize("peer, forwarded, expected", [
+    # Direct callers cannot pick their own address
+    ("203.0.113.7", "198.51.100.1", "203.0.113.7"),
+    ("10.0.0.2", "198.51.100.1", "198.51.100.1"),
+    # A spoofed leading hop is ignored: the proxy appended the real one
+    ("10.0.0.2", "1.2.3.4, 198.51.100.1", "198.51.100.1"),
+    ("10.0.0.2", "198.51.100.1, 10.0.0.9", "198.51.100.1"),
+    ("10.0.0.2", None, "10.0.0.2"),
+])
+def test_client_address_trusts_forwarded_for_only_from_proxies(peer, forwarded, expected):
+    assert client_address(scope_for(peer, forwarded), PROXIES) == expected
+
+
+def statuses(scopes, monkeypatch):
+    """Status codes for requests sent one after another through a fresh middleware"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_RULES", {"seats": [1, 2]})
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", ["10.0.0.0/8"])
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent.append(message["status"])
+
+    async def run():
+        middleware = RateLimitMiddleware(app, MemoryRateLimitStore())
+        for scope in scopes:
+            await middleware(scope, None, send)
+
+    asyncio.run(run())
+    return sent
+
+
+def test_clients_behind_a_proxy_get_their_own_buckets(monkeypatch):
+    first = [scope_for("10.0.0.2", "198.51.100.1")] * 4
+    second = [scope_for("10.0.0.2", "198.51.100.2")] * 4
+    assert statuses(first + second, monkeypatch) == [200, 200, 429, 429] * 2
+
+
+def test_signed_in_user_is_limited_across_addresses(monkeypatch):
+    token = create_access_token({"sub": "42"})
+    scopes = [scope_for("10.0.0.2", f"198.51.100.{i}", token) for i in range(1, 5)]
+    assert statuses(scopes, monkeypatch) == [200, 200, 429, 429]
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from sqlalchemy import create_engine, text
+from starlette.requests import Request
+
+from app.core import database
+from app.core.config import settings
+from app.core.read_after_write import ReadAfterWriteMiddleware, TOKEN_HEADER, recent_writers, wrote_recently
+
+
+def scope_with(headers=(), method="GET"):
+    return {"type": "http", "method": method, "path": "/", "client": ("198.51.100.1", 1234), "headers": list(headers)}
+
+
+def write_through_middleware():
+    """Send one successful POST through the middleware; returns the response headers"""
+    sent = {}
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+
+    async def send(message):
+        sent.update(message)
+
+    asyncio.run(ReadAfterWriteMiddleware(app)(scope_with(method="POST"), None, send))
+    return dict(sent["headers"])
+
+
+def test_reads_follow_the_replica_and_writes_the_primary(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path}/primary.db")
+    replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE origin (name TEXT)"))
+            connection.execute(text("INSERT INTO origin VALUES (:name)"), {"name": name})
+
+    class Routing(database.RoutingSession):
+        pass
+
+    Routing.primary, Routing.replicas = primary, [replica]
+    with Routing(info={"read_only": True}) as session:
+        assert session.execute(text("SELECT name FROM origin")).scalar() == "replica"
+    with Routing() as session:
+        assert session.execute(text("SELECT name FROM origin")).scalar() == "primary"
+
+
+def test_write_token_keeps_reads_on_the_primary_on_any_worker():
+    headers = write_through_middleware()
+    token = headers[TOKEN_HEADER.lower().encode()]
+    assert b"read_after_write=" + token in headers[b"set-cookie"]
+
+    # Another worker has no local mark, only what the client sends back
+    recent_writers._marked.clear()
+    assert not wrote_recently(scope_with())
+    assert wrote_recently(scope_with([(b"read-after-write", token)]))
+    assert wrote_recently(scope_with([(b"cookie", b"theme=dark; read_after_write=" + token)]))
+
+    request = Request(scope_with([(b"read-after-write", token)]))
+    session = next(database.get_read_db(request))
+    assert not session.info.get("read_only")
+
+
+def test_expired_or_forged_tokens_are_ignored():
+    now = time.time()
+    for until in (now - 1, now + settings.READ_AFTER_WRITE_SECONDS + 60):
+        assert not wrote_recently(scope_with([(b"read-after-write", f"{until:.3f}".encode())]))
+    assert not wrote_recently(scope_with([(b"read-after-write", b"soon")]))
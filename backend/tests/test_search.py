@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.fixture
+def make_searchable_event(client):
+    """Create a published event with the given title and description; returns its id"""
+
+    def make(title, description):
+        response = client.post("/api/v1/events/", json={
+            "organizer": "Organizer",
+            "title": title,
+            "description": description,
+            "category": "concert",
+            "venue_name": "Hall",
+            "event_date": "2030-01-01",
+            "event_time": "20:00:00",
+            "city": "Hanoi",
+        })
+        assert response.status_code == 201, response.text
+        event_id = response.json()["event_id"]
+        client.put(f"/api/v1/events/{event_id}", json={"status": "published"})
+        return event_id
+
+    return make
+
+
+def search(client, text):
+    response = client.get("/api/v1/events/", params={"search": text, "size": 100})
+    assert response.status_code == 200, response.text
+    return [event["event_id"] for event in response.json()["items"]]
+
+
+def test_better_matches_rank_first(client, make_searchable_event):
+    passing = make_searchable_event("Evening show", "A quokka appears once")
+    devoted = make_searchable_event("Quokka Quokka Gala", "A quokka parade, quokka songs and quokka dances")
+    assert search(client, "quokka") == [devoted, passing]
+
+
+def test_partial_words_match_as_prefixes(client, make_searchable_event):
+    event_id = make_searchable_event("Late set", "Smooth xylosaxophone and brushed drums")
+    assert search(client, "xylosax") == [event_id]
+    assert search(client, "smooth xylosax")[:1] == [event_id]
+
+
+def test_index_follows_updates_and_deletes(client, make_searchable_event):
+    event_id = make_searchable_event("Wombat Waltz", "An evening of waltzes")
+    assert search(client, "wombat") == [event_id]
+
+    client.put(f"/api/v1/events/{event_id}", json={"title": "Numbat Nocturne"})
+    assert search(client, "numbat") == [event_id]
+    assert search(client, "wombat") == []
+
+    assert client.delete(f"/api/v1/events/{event_id}").status_code == 204
+    assert search(client, "numbat") == []
+
+
+@pytest.mark.parametrize("text", ['pangolin" OR *', "NEAR(pangolin", "-pangolin", "pangolin AND", "pangolin:title", "^pangolin*"])
+def test_query_syntax_in_user_input_is_treated_as_words(client, make_searchable_event, text):
+    event_id = make_searchable_event("Pangolin Parade", "Scales and more scales")
+    assert event_id in search(client, text)
+
+
+def test_input_without_words_falls_back_to_like(client):
+    assert search(client, '"*"()') == []
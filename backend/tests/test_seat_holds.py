@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from app.crud.seat import seat as seat_crud
+from conftest import count_queries, order_payload
+
+
+def seat_states(client, event_id):
+    return {seat["seat_id"]: seat["status"] for seat in client.get(f"/api/v1/events/{event_id}/seats").json()}
+
+
+def test_holder_id_is_minted_by_the_server(client, make_event, make_seats):
+    event_id, _ = make_event()
+    seat_ids = make_seats(event_id, 2)
+    url = f"/api/v1/events/{event_id}/seats/hold"
+
+    first = client.post(url, json={"seat_ids": seat_ids[:1], "holder_id": "mine"})
+    assert first.status_code == 201
+    holder_id = first.json()["holder_id"]
+    assert holder_id != "mine" and len(holder_id) == 32
+
+    # Knowing (or guessing) a holder id in the body no longer extends or takes over the hold
+    second = client.post(url, json={"seat_ids": seat_ids, "holder_id": holder_id})
+    assert second.status_code == 409
+    assert client.delete(f"{url}/mine").status_code == 204
+    assert seat_states(client, event_id) == {seat_ids[0]: "reserved", seat_ids[1]: "available"}
+
+    assert client.delete(f"{url}/{holder_id}").status_code == 204
+    assert seat_states(client, event_id) == {seat_ids[0]: "available", seat_ids[1]: "available"}
+
+
+def test_order_consumes_its_hold(client, make_event, make_seats):
+    event_id, _ = make_event()
+    seat_ids = make_seats(event_id, 2)
+    url = f"/api/v1/events/{event_id}/seats/hold"
+    holder_id = client.post(url, json={"seat_ids": seat_ids}).json()["holder_id"]
+
+    items = [{"seat_id": seat_id} for seat_id in seat_ids]
+    response = client.post("/api/v1/orders/", json=order_payload(event_id, items, hold_id=holder_id))
+    assert response.status_code == 201, response.text
+    assert seat_states(client, event_id) == {seat_id: "booked" for seat_id in seat_ids}
+
+    # The hold is gone with the order: releasing it or ordering on it again frees and sells nothing
+    assert client.delete(f"{url}/{holder_id}").status_code == 204
+    assert client.post("/api/v1/orders/", json=order_payload(event_id, items, hold_id=holder_id)).status_code == 400
+    assert seat_states(client, event_id) == {seat_id: "booked" for seat_id in seat_ids}
+
+
+def test_seats_held_by_another_holder_are_refused(client, make_event, make_seats):
+    event_id, _ = make_event()
+    seat_ids = make_seats(event_id, 2)
+    url = f"/api/v1/events/{event_id}/seats/hold"
+    holder_id = client.post(url, json={"seat_ids": seat_ids[:1]}).json()["holder_id"]
+    other_holder_id = client.post(url, json={"seat_ids": seat_ids[1:]}).json()["holder_id"]
+
+    items = [{"seat_id": seat_ids[0]}]
+    for hold_id in (None, other_holder_id):
+        response = client.post("/api/v1/orders/", json=order_payload(event_id, items, hold_id=hold_id))
+        assert response.status_code == 400
+    assert client.post(url, json={"seat_ids": seat_ids[:1]}).status_code == 409
+    assert seat_states(client, event_id) == {seat_id: "reserved" for seat_id in seat_ids}
+
+    response = client.post("/api/v1/orders/", json=order_payload(event_id, items, hold_id=holder_id))
+    assert response.status_code == 201, response.text
+
+
+def test_expired_holds_are_freed_in_one_update(client, make_event, make_seats, db):
+    event_id, _ = make_event()
+    seat_ids = make_seats(event_id, 3)
+    url = f"/api/v1/events/{event_id}/seats/hold"
+    client.post(url, json={"seat_ids": seat_ids[:2], "ttl_seconds": 60})
+    live_holder_id = client.post(url, json={"seat_ids": seat_ids[2:], "ttl_seconds": 600}).json()["holder_id"]
+
+    # Two minutes on, the first hold has lapsed and the second has not
+    with count_queries() as statements:
+        expired = seat_crud.expire_holds(db, now=datetime.utcnow() + timedelta(seconds=120))
+        db.commit()
+    assert expired >= 2
+    assert [statement.split()[0] for statement in statements] == ["UPDATE"]
+
+    assert seat_states(client, event_id) == {seat_ids[0]: "available", seat_ids[1]: "available", seat_ids[2]: "reserved"}
+    response = client.post("/api/v1/orders/", json=order_payload(event_id, [{"seat_id": seat_ids[2]}], hold_id=live_holder_id))
+    assert response.status_code == 201, response.text
@@ -0,0 +1,50 @@
+import json
+from decimal import Decimal
+
+from app.models.seat import Seat
+
+
+def generate(client, event_id, seat_map_config):
+    response = client.put(f"/api/v1/events/{event_id}", json={"seat_map_config": seat_map_config})
+    assert response.status_code == 200, response.text
+    return client.post(f"/api/v1/events/{event_id}/seats/generate")
+
+
+def test_generation_prices_zones_and_skips_existing_seats(client, db, make_event):
+    event_id, _ = make_event()
+    layout = {"sections": [{
+        "name": "Floor",
+        "rows": {"first": "A", "last": "D"},
+        "seats_per_row": 5,
+        "price": "50.00",
+        # The first zone wins; the second one spans rows the section does not have
+        "price_zones": [{"rows": ["A"], "price": "90.00"}, {"rows": {"first": "A", "last": "Z"}, "price": "70.00"}],
+    }]}
+
+    response = generate(client, event_id, layout)
+    assert response.status_code == 200, response.text
+    assert json.loads(response.text.splitlines()[-1]) == {"done": True, "total": 20, "inserted": 20, "skipped": 0}
+    prices = dict(db.query(Seat.row_label, Seat.price).filter(Seat.event_id == event_id).distinct())
+    assert prices == {"A": Decimal("90.00"), "B": Decimal("70.00"), "C": Decimal("70.00"), "D": Decimal("70.00")}
+
+    layout["sections"][0]["rows"] = {"first": "A", "last": "E"}
+    response = generate(client, event_id, layout)
+    assert json.loads(response.text.splitlines()[-1]) == {"done": True, "total": 25, "inserted": 5, "skipped": 20}
+
+
+def test_oversized_layouts_are_rejected_before_expansion(client, make_event):
+    event_id, _ = make_event()
+    huge = {"sections": [{"name": "Floor", "rows": {"first": "1", "last": "9999999999"}, "seats_per_row": 1000, "price": "1.00"}]}
+
+    response = generate(client, event_id, huge)
+    assert response.status_code == 400
+    assert "9999999999000 seats" in response.json()["detail"]
+
+
+def test_listed_row_labels_must_fit_the_column(client, make_event):
+    event_id, _ = make_event()
+    layout = {"sections": [{"name": "Floor", "rows": ["A", "X" * 11], "seats_per_row": 1, "price": "1.00"}]}
+
+    response = generate(client, event_id, layout)
+    assert response.status_code == 400
+    assert "sections.0.rows" in response.json()["detail"]
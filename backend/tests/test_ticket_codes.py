@@ -0,0 +1,72 @@
+import multiprocessing
+import random
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.code_node_lease import CodeNodeLease
+from app.utils.ticket_code import ALPHABET, CodeGenerator, code_generator, generate_ticket_code, has_valid_check_character
+
+PROCESSES = 8
+CODES_PER_PROCESS = 125000
+
+
+def worker(results):
+    # A forked worker must not share its parent's pooled connections
+    engine.dispose(close=False)
+    codes = [generate_ticket_code() for _ in range(CODES_PER_PROCESS)]
+    results.put((code_generator.node_id, codes))
+
+
+def fork_workers():
+    """Mint codes in PROCESSES forked workers, as gunicorn or uvicorn --workers would run them"""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(results,)) for _ in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    batches = [results.get(timeout=120) for _ in processes]
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    return batches
+
+
+@pytest.mark.parametrize("configured_node_id", [None, 7])
+def test_forked_workers_never_collide(client, monkeypatch, configured_node_id):
+    """A million codes from eight workers sharing one configuration, with CODE_NODE_ID unset or set to one value"""
+    monkeypatch.setattr(settings, "CODE_NODE_ID", configured_node_id)
+    batches = fork_workers()
+
+    node_ids = [node_id for node_id, _ in batches]
+    assert len(set(node_ids)) == PROCESSES
+    codes = [code for _, batch in batches for code in batch]
+    assert len(set(codes)) == PROCESSES * CODES_PER_PROCESS
+    for _, batch in batches:
+        # Time-ordered within a node, so inserts land at the end of the unique index
+        assert all(a < b for a, b in zip(batch, batch[1:]))
+        assert all(len(code) == len(batch[0]) for code in batch)
+
+
+def test_a_lost_lease_moves_the_generator_to_a_free_node(client, db):
+    node_id = code_generator.renew()
+    # Another process took the node over, e.g. after this one stalled past its lease
+    db.query(CodeNodeLease).filter(CodeNodeLease.node_id == node_id).update({CodeNodeLease.holder: "someone-else"})
+    db.commit()
+
+    new_node_id = code_generator.renew()
+    assert new_node_id != node_id
+    with SessionLocal() as session:
+        assert session.get(CodeNodeLease, new_node_id).holder == code_generator.holder
+
+
+def test_check_character_catches_single_character_errors():
+    rng = random.Random(19)
+    generator = CodeGenerator(1)
+    codes = [generator.next_code("TKT") for _ in range(500)]
+    assert all(has_valid_check_character(code) for code in codes)
+    for code in codes:
+        position = rng.randrange(len("TKT-"), len(code))
+        wrong = rng.choice([char for char in ALPHABET if char != code[position]])
+        assert not has_valid_check_character(code[:position] + wrong + code[position + 1:])
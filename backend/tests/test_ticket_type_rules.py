@@ -0,0 +1,86 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.core.database import SessionLocal
+from app.models.order import Order
+from app.models.ticket import Ticket
+from app.models.ticket_type import TicketType, TicketTypeStatus
+from app.models.user import User
+from app.schemas.order import OrderCreate
+from app.services.booking import BookingService
+from conftest import order_payload
+
+
+def concurrent_orders(event_id, ticket_type_id, buyers, quantity=1):
+    """Book from `buyers` threads at once, each with its own session; returns how many orders went through"""
+    with SessionLocal() as session:
+        user_id = session.query(User.user_id).order_by(User.user_id).first()[0]
+    order_in = OrderCreate(**order_payload(event_id, [{"ticket_type_id": ticket_type_id, "quantity": quantity}]))
+    start = threading.Barrier(buyers)
+    booked = []
+
+    def buy():
+        session = SessionLocal()
+        try:
+            start.wait()
+            BookingService.create_order(db=session, user_id=user_id, order_in=order_in)
+            booked.append(1)
+        except Exception:
+            session.rollback()
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=buy) for _ in range(buyers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(booked)
+
+
+def test_flash_sale_never_oversells(client, make_event, db):
+    event_id, tiers = make_event({"GA": 20})
+    booked = concurrent_orders(event_id, tiers["GA"], buyers=60)
+
+    tier = db.get(TicketType, tiers["GA"])
+    tickets = db.query(Ticket).filter(Ticket.event_id == event_id).count()
+    assert 0 < booked <= 20
+    assert tier.quantity_sold == tickets == booked
+    if booked == 20:
+        assert tier.status == TicketTypeStatus.SOLD_OUT
+
+
+def test_per_user_cap_holds_under_concurrency(client, make_event, db):
+    event_id, tiers = make_event({"CAPPED": 100}, max_per_user=5)
+    concurrent_orders(event_id, tiers["CAPPED"], buyers=12, quantity=2)
+
+    # Every order comes from the same (first) user, so at most two orders of two fit under the cap of five
+    assert db.get(TicketType, tiers["CAPPED"]).quantity_sold <= 5
+    assert db.query(Order).filter(Order.event_id == event_id).count() <= 2
+
+
+def test_raising_capacity_reopens_a_sold_out_tier(client, make_event):
+    event_id, tiers = make_event({"GA": 2})
+    item = [{"ticket_type_id": tiers["GA"], "quantity": 2}]
+    assert client.post("/api/v1/orders/", json=order_payload(event_id, item)).status_code == 201
+    (tier,) = client.get(f"/api/v1/events/{event_id}/ticket-types").json()
+    assert tier["status"] == "sold_out"
+
+    url = f"/api/v1/events/{event_id}/ticket-types/{tiers['GA']}"
+    assert client.put(url, json={"quantity_available": 4}).json()["status"] == "active"
+    assert client.post("/api/v1/orders/", json=order_payload(event_id, item)).status_code == 201
+    (tier,) = client.get(f"/api/v1/events/{event_id}/ticket-types").json()
+    assert (tier["quantity_sold"], tier["status"]) == (4, "sold_out")
+
+
+def test_sales_window_and_order_limits(client, make_event):
+    event_id, tiers = make_event({"GA": 10}, min_purchase=2, max_purchase=3)
+    url = f"/api/v1/events/{event_id}/ticket-types/{tiers['GA']}"
+    for quantity, expected in ((1, 400), (4, 400), (2, 201)):
+        item = [{"ticket_type_id": tiers["GA"], "quantity": quantity}]
+        assert client.post("/api/v1/orders/", json=order_payload(event_id, item)).status_code == expected
+
+    closed = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    assert client.put(url, json={"sale_end_date": closed}).status_code == 200
+    item = [{"ticket_type_id": tiers["GA"], "quantity": 2}]
+    assert client.post("/api/v1/orders/", json=order_payload(event_id, item)).status_code == 400
@@ -0,0 +1,145 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings, settings
+from app.services import waiting_room
+from app.models.ticket import Ticket
+from app.models.ticket_type import TicketType
+from app.services.waiting_room import MemoryWaitingRoomStore
+from conftest import order_payload
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(settings, "WAITING_ROOM_ENABLED", True)
+    monkeypatch.setattr(waiting_room, "waiting_room_store", MemoryWaitingRoomStore())
+
+
+@pytest.mark.parametrize("overrides", [
+    {"WAITING_ROOM_ADMIT_PER_SECOND": 0},
+    {"WAITING_ROOM_ADMIT_PER_SECOND": -1},
+    {"WAITING_ROOM_EVENT_RATES": {"1": 0}},
+])
+def test_zero_admission_rate_is_rejected(overrides):
+    with pytest.raises(ValidationError):
+        Settings(**overrides)
+
+
+def test_flash_crowd_is_admitted_at_the_configured_rate():
+    """20k buyers joining at the same instant from many threads: burst first, then one slot per interval"""
+    store = MemoryWaitingRoomStore()
+    rate, burst, buyers, start = 100.0, 50, 20000, 1000.0
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        slots = sorted(pool.map(lambda _: store.schedule(1, start, 1.0 / rate, burst), range(buyers)))
+
+    # No slot handed out twice and none lost under contention
+    assert slots[:burst + 1] == [start] * (burst + 1)
+    assert slots[-1] == pytest.approx(start + (buyers - burst - 1) / rate)
+    gaps = [later - earlier for earlier, later in zip(slots[burst:], slots[burst + 1:])]
+    assert min(gaps) == pytest.approx(1.0 / rate)
+    # At most one second's worth plus the burst (and the slot that starts it) in any one-second window
+    j = 0
+    for i, slot in enumerate(slots):
+        while slots[j] <= slot - 1.0:
+            j += 1
+        assert i - j + 1 <= rate + burst + 1
+
+
+def test_admission_token_is_single_use(client, make_event, enabled):
+    event_id, tiers = make_event({"GA": 50})
+    queued = client.post(f"/api/v1/queue/{event_id}/join").json()
+    assert queued["admitted"]
+    headers = {"Admission-Token": queued["admission_token"]}
+    items = [{"ticket_type_id": tiers["GA"], "quantity": 1}]
+
+    assert client.post("/api/v1/orders/", json=order_payload(event_id, items)).status_code == 403
+    # An order refused after the admission was spent (over the per-order limit of 10, which only the
+    # reservation UPDATE checks) gives the admission back
+    too_many = [{"ticket_type_id": tiers["GA"], "quantity": 11}]
+    refused = client.post("/api/v1/orders/", json=order_payload(event_id, too_many), headers=headers)
+    assert refused.status_code == 400
+    assert "At most 10 tickets" in refused.json()["detail"]
+    assert client.post("/api/v1/orders/", json=order_payload(event_id, items), headers=headers).status_code == 201
+    assert client.post("/api/v1/orders/", json=order_payload(event_id, items), headers=headers).status_code == 403
+
+    # Polling the same queue slot again does not mint a second usable admission
+    again = client.get(f"/api/v1/queue/{event_id}/status", headers={"Queue-Token": queued["queue_token"]}).json()
+    retry = {"Admission-Token": again["admission_token"]}
+    assert client.post("/api/v1/orders/", json=order_payload(event_id, items), headers=retry).status_code == 403
+
+
+def test_idempotent_retry_replays_without_a_fresh_admission(client, make_event, enabled):
+    event_id, tiers = make_event({"GA": 10})
+    queued = client.post(f"/api/v1/queue/{event_id}/join").json()
+    headers = {"Admission-Token": queued["admission_token"], "Idempotency-Key": f"wr-{event_id}"}
+    payload = order_payload(event_id, [{"ticket_type_id": tiers["GA"], "quantity": 1}])
+
+    first = client.post("/api/v1/orders/", json=payload, headers=headers)
+    retry = client.post("/api/v1/orders/", json=payload, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["order_id"] == first.json()["order_id"]
+
+
+def test_oversubscribed_on_sale_books_at_the_admission_rate(client, make_event, db, enabled, monkeypatch, record_property):
+    """Ten times the admission rate join at once and order as soon as they are let in, through the HTTP endpoints"""
+    rate, buyers, capacity, give_up_after = 20, 200, 60, 4.0
+    monkeypatch.setattr(settings, "WAITING_ROOM_ADMIT_PER_SECOND", float(rate))
+    monkeypatch.setattr(settings, "WAITING_ROOM_BURST", 1)
+    event_id, tiers = make_event({"GA": capacity})
+    items = [{"ticket_type_id": tiers["GA"], "quantity": 1}]
+    opened = []
+    start = threading.Barrier(buyers, action=lambda: opened.append(time.perf_counter()))
+    booked, outcomes, joined = [], [], []
+
+    def buy():
+        start.wait()
+        queued = client.post(f"/api/v1/queue/{event_id}/join").json()
+        joined.append(time.perf_counter())
+        if queued["eta_seconds"] > give_up_after:
+            outcomes.append("gave up")
+            return
+        while not queued["admitted"]:
+            time.sleep(max(queued["eta_seconds"], 0.01))
+            queued = client.get(
+                f"/api/v1/queue/{event_id}/status", headers={"Queue-Token": queued["queue_token"]}
+            ).json()
+        response = client.post(
+            "/api/v1/orders/",
+            json=order_payload(event_id, items),
+            headers={"Admission-Token": queued["admission_token"]}
+        )
+        if response.status_code == 201:
+            booked.append(time.perf_counter())
+        outcomes.append(response.status_code)
+
+    threads = [threading.Thread(target=buy) for _ in range(buyers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Everyone let in before the tier ran out booked; the rest were refused, and nothing was oversold
+    tier = db.get(TicketType, tiers["GA"])
+    tickets = db.query(Ticket).filter(Ticket.event_id == event_id).count()
+    assert len(booked) == tier.quantity_sold == tickets == capacity
+    assert set(outcomes) == {201, 400, "gave up"}
+
+    # Bookings follow the admission schedule: about `rate` per second overall. Any one second holds at most a
+    # second's worth plus the burst, and the orders admitted while the join rush kept the server busy
+    booked.sort()
+    achieved = len(booked) / (booked[-1] - opened[0])
+    rush = max(joined) - opened[0]
+    record_property("bookings_per_second", round(achieved, 1))
+    record_property("join_rush_seconds", round(rush, 2))
+    assert achieved == pytest.approx(rate, rel=0.2)
+    j = 0
+    for i, at in enumerate(booked):
+        while booked[j] <= at - 1.0:
+            j += 1
+        assert i - j + 1 <= rate * (1 + rush) + 2
@@ -15,6 +15,66 @@
 /*!40101 SET @OLD_SQL_MODE=@@SQL_MODE, SQL_MODE='NO_AUTO_VALUE_ON_ZERO' */;
 /*!40111 SET @OLD_SQL_NOTES=@@SQL_NOTES, SQL_NOTES=0 */;
 
+--
+-- Table structure for table `code_node_leases`
+--
+
+DROP TABLE IF EXISTS `code_node_leases`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `code_node_leases` (
+  `node_id` int NOT NULL,
+  `holder` varchar(32) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `expires_at` timestamp NOT NULL,
+  PRIMARY KEY (`node_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `daily_sales_rollups`
+--
+
+DROP TABLE IF EXISTS `daily_sales_rollups`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `daily_sales_rollups` (
+  `sales_date` date NOT NULL,
+  `event_id` int NOT NULL,
+  `orders_count` int NOT NULL DEFAULT '0',
+  `cancelled_orders` int NOT NULL DEFAULT '0',
+  `tickets_count` int NOT NULL DEFAULT '0',
+  `revenue` decimal(12,2) NOT NULL DEFAULT '0.00',
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`sales_date`,`event_id`),
+  KEY `idx_event_date` (`event_id`,`sales_date`),
+  CONSTRAINT `daily_sales_rollups_ibfk_1` FOREIGN KEY (`event_id`) REFERENCES `events` (`event_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `event_sales_stats`
+--
+
+DROP TABLE IF EXISTS `event_sales_stats`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `event_sales_stats` (
+  `event_id` int NOT NULL,
+  `tickets_active` int NOT NULL DEFAULT '0',
+  `tickets_used` int NOT NULL DEFAULT '0',
+  `tickets_cancelled` int NOT NULL DEFAULT '0',
+  `tickets_refunded` int NOT NULL DEFAULT '0',
+  `revenue_pending` decimal(12,2) NOT NULL DEFAULT '0.00',
+  `revenue_completed` decimal(12,2) NOT NULL DEFAULT '0.00',
+  `revenue_failed` decimal(12,2) NOT NULL DEFAULT '0.00',
+  `revenue_refunded` decimal(12,2) NOT NULL DEFAULT '0.00',
+  `revenue_cancelled` decimal(12,2) NOT NULL DEFAULT '0.00',
+  `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`event_id`),
+  CONSTRAINT `event_sales_stats_ibfk_1` FOREIGN KEY (`event_id`) REFERENCES `events` (`event_id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `events`
 --
@@ -58,6 +118,29 @@ CREATE TABLE `events` (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `idempotency_keys`
+--
+
+DROP TABLE IF EXISTS `idempotency_keys`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `idempotency_keys` (
+  `scope` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `idempotency_key` varchar(255) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `request_hash` varchar(64) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `status` enum('in_progress','completed') COLLATE utf8mb4_unicode_ci NOT NULL,
+  `response_status` int DEFAULT NULL,
+  `response_body` text COLLATE utf8mb4_unicode_ci,
+  `locked_until` timestamp NOT NULL,
+  `lease_token` varchar(32) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `expires_at` timestamp NOT NULL,
+  `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`scope`,`idempotency_key`),
+  KEY `idx_expires_at` (`expires_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `order_items`
 --
@@ -121,6 +204,7 @@ CREATE TABLE `orders` (
   KEY `idx_payment_status` (`payment_status`),
   KEY `idx_order_status` (`order_status`),
   KEY `idx_created_at` (`created_at`),
+  KEY `idx_user_created` (`user_id`,`created_at`),
   CONSTRAINT `orders_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE RESTRICT,
   CONSTRAINT `orders_ibfk_2` FOREIGN KEY (`event_id`) REFERENCES `events` (`event_id`) ON DELETE RESTRICT,
   CONSTRAINT `orders_chk_1` CHECK ((`total_amount` >= 0))
@@ -144,12 +228,15 @@ CREATE TABLE `seats` (
   `status` enum('available','reserved','booked','blocked') COLLATE utf8mb4_unicode_ci DEFAULT 'available',
   `order_id` int DEFAULT NULL,
   `booked_at` timestamp NULL DEFAULT NULL,
+  `held_by` varchar(64) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
+  `hold_expires_at` timestamp NULL DEFAULT NULL,
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (`seat_id`),
   UNIQUE KEY `unique_seat` (`event_id`,`section`,`row_label`,`seat_number`),
   KEY `idx_event_status` (`event_id`,`status`),
   KEY `idx_section` (`event_id`,`section`),
+  KEY `idx_hold_expiry` (`status`,`hold_expires_at`),
   CONSTRAINT `seats_ibfk_1` FOREIGN KEY (`event_id`) REFERENCES `events` (`event_id`) ON DELETE CASCADE,
   CONSTRAINT `seats_chk_1` CHECK ((`price` >= 0))
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -172,6 +259,7 @@ CREATE TABLE `ticket_types` (
   `quantity_sold` int DEFAULT '0',
   `min_purchase` int DEFAULT '1',
   `max_purchase` int DEFAULT '10',
+  `max_per_user` int DEFAULT NULL,
   `sale_start_date` timestamp NULL DEFAULT NULL,
   `sale_end_date` timestamp NULL DEFAULT NULL,
   `status` enum('active','sold_out','inactive') COLLATE utf8mb4_unicode_ci DEFAULT 'active',